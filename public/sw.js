@@ -1,6 +1,10 @@
 // Enhanced service worker: versioned cache, network-first for HTML, update messaging, offline datasets
 const BUILD = '2025-08-24T1'; // bump this (or inject at build) each deploy to force update
 const CACHE = 'brss-cache-' + BUILD;
+// Content-hashed datasets (scripts/asset_pipeline.py) live in their own cache that survives BUILD bumps:
+// a dataset is only downloaded again when its hash in data/asset-manifest.json changes.
+const DATA_CACHE = 'brss-data';
+const MANIFEST_TTL_MS = 60 * 1000;
 // Derive base path from SW scope (works on GitHub Pages subpaths)
 const BASE = (() => {
   try { return new URL(self.registration.scope).pathname; } catch { return '/'; }
@@ -25,7 +29,8 @@ self.addEventListener('install', (event) => {
 self.addEventListener('activate', (event) => {
   event.waitUntil((async () => {
     const keys = await caches.keys();
-    await Promise.all(keys.filter(k => k !== CACHE).map(k => caches.delete(k)));
+    await Promise.all(keys.filter(k => k !== CACHE && k !== DATA_CACHE).map(k => caches.delete(k)));
+    await pruneDataCache();
     self.clients.claim();
     // Inform controlled pages a new SW is active
     const clientsList = await self.clients.matchAll({ type: 'window' });
@@ -42,6 +47,56 @@ self.addEventListener('message', (event) => {
     self.skipWaiting();
   }
 });
+// Asset manifest: source path (relative to BASE) -> hashed file; refreshed at most once per MANIFEST_TTL_MS
+let manifestMemo = null;
+async function assetManifest() {
+  if (manifestMemo && Date.now() - manifestMemo.at < MANIFEST_TTL_MS) return manifestMemo.data;
+  const url = `${BASE}data/asset-manifest.json`;
+  const cache = await caches.open(DATA_CACHE);
+  let data = null;
+  try {
+    const res = await fetch(url, { cache: 'no-cache' });
+    if (res.ok) {
+      data = await res.clone().json();
+      await cache.put(url, res);
+    }
+  } catch {}
+  if (!data) {
+    // Offline or no asset stage deployed: last known manifest, else none
+    try { const cached = await cache.match(url); if (cached) data = await cached.json(); } catch {}
+  }
+  manifestMemo = { at: Date.now(), data };
+  return data;
+}
+async function pruneDataCache() {
+  const manifest = await assetManifest();
+  if (!manifest || !manifest.assets) return;
+  const keep = new Set(Object.values(manifest.assets).map(a => new URL(`${BASE}${manifest.base}${a.file}`, location.origin).href));
+  keep.add(new URL(`${BASE}data/asset-manifest.json`, location.origin).href);
+  const cache = await caches.open(DATA_CACHE);
+  for (const req of await cache.keys()) {
+    if (!keep.has(req.url)) await cache.delete(req);
+  }
+}
+// Serve a logical dataset URL (prophecies.json, bibles/<abbr>.json) from its hashed copy; null if not managed
+async function fromHashedAsset(rel) {
+  const manifest = await assetManifest();
+  const entry = manifest && manifest.assets && manifest.assets[rel];
+  if (!entry) return null;
+  const url = `${BASE}${manifest.base}${entry.file}`;
+  const cache = await caches.open(DATA_CACHE);
+  const cached = await cache.match(url);
+  if (cached) return cached;
+  try {
+    const res = await fetch(url);
+    if (!res.ok) return null;
+    await cache.put(url, res.clone());
+    return res;
+  } catch {
+    return null;
+  }
+}
+
 // Escape helper for building regex from BASE
 const escapeRe = (s) => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
 
@@ -69,10 +124,13 @@ self.addEventListener('fetch', (event) => {
     return;
   }
 
+  const rel = url.pathname.slice(BASE.length);
   const biblesPathRe = new RegExp(`^${escapeRe(BASE)}bibles/`);
-  if (biblesPathRe.test(url.pathname)) {
-    // Network-first for dynamic Bible JSON
+  if (biblesPathRe.test(url.pathname) || rel === 'prophecies.json' || rel === 'prophecies.refs.json') {
+    // Hashed copy when the asset manifest lists this file, else network-first for dynamic Bible JSON
     event.respondWith((async () => {
+      const hashed = await fromHashedAsset(rel);
+      if (hashed) return hashed;
       try {
         const res = await fetch(req, { cache: 'no-store' });
         const cache = await caches.open(CACHE);
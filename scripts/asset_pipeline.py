@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Minified, precompressed, content-hashed copies of the JSON datasets in public/.
+
+The bridge writes prophecies.json with indent=2 and the Bible files are served as they are;
+public/sw.js caches them under a BUILD string that is bumped by hand, so every deploy throws
+away every dataset. This stage writes, for prophecies.json, prophecies.refs.json and every
+public/bibles/*.json:
+
+  public/data/<name>.<hash>.json       minified (same value, no whitespace)
+  public/data/<name>.<hash>.json.gz    gzip -9, mtime 0 (reproducible)
+  public/data/<name>.<hash>.json.br    brotli, when the optional 'brotli' module is installed
+
+<hash> is the first 12 hex digits of the SHA-256 of the minified bytes, so a dataset that did
+not change keeps its URL across deploys. The deploy workflow runs this stage before `vite build`;
+public/data/ is generated and not committed. public/data/asset-manifest.json maps each source path
+(relative to public/) to its hashed file; sw.js reads it to serve the logical URLs from a
+cache that survives BUILD bumps and only fetches datasets whose hash changed. Hashed files no
+longer listed in the manifest are removed. Sources are left untouched.
+
+Usage:
+  python asset_pipeline.py                 # public/ next to this script
+  python asset_pipeline.py --public ../public --no-prune
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+try:  # optional: pip install brotli
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PUBLIC = os.path.join(SCRIPTS_DIR, '..', 'public')
+OUT_DIR = 'data'
+MANIFEST = 'asset-manifest.json'
+ASSET_FORMAT = 1
+HASH_LEN = 12
+ROOT_ASSETS = ('prophecies.json', 'prophecies.refs.json')
+SKIP_BIBLE_FILES = {'report.json', 'split-report.json', 'build-manifest.json', 'build-report.json'}
+
+
+def list_sources(public_dir: str) -> List[str]:
+    """Dataset paths relative to public/, '/'-separated as the client requests them."""
+    out = [name for name in ROOT_ASSETS if os.path.exists(os.path.join(public_dir, name))]
+    bibles = os.path.join(public_dir, 'bibles')
+    if os.path.isdir(bibles):
+        out += [f"bibles/{f}" for f in sorted(os.listdir(bibles)) if f.endswith('.json') and f not in SKIP_BIBLE_FILES]
+    return out
+
+
+def minify(data: bytes) -> bytes:
+    text = data.decode('utf-8-sig')
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def hashed_name(rel: str, digest: str) -> str:
+    stem = os.path.splitext(rel)[0].replace('/', '-')
+    return f"{stem}.{digest[:HASH_LEN]}.json"
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('format') == ASSET_FORMAT else {}
+
+
+def build_assets(public_dir: str, prune: bool = True) -> dict:
+    """Write the hashed variants and the manifest; returns the manifest plus a per-file report."""
+    out_dir = os.path.join(public_dir, OUT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    previous = _load_manifest(manifest_path).get('assets', {})
+    assets: Dict[str, dict] = {}
+    report = []
+    for rel in list_sources(public_dir):
+        t0 = time.perf_counter()
+        src = os.path.join(public_dir, *rel.split('/'))
+        prev = previous.get(rel)
+        with open(src, 'rb') as f:
+            raw = f.read()
+        source_sha = hashlib.sha256(raw).hexdigest()
+        # Same source bytes and all variants present: reuse without minifying / compressing again.
+        # Keyed on content, not mtime: a checkout or restore keeps neither mtime nor the old bytes.
+        if (prev and prev.get('source_sha256') == source_sha
+                and all(os.path.exists(os.path.join(out_dir, prev['file'] + ext)) for ext in prev['encodings'])):
+            assets[rel] = prev
+            report.append({'asset': rel, 'status': 'unchanged', **prev['bytes']})
+            continue
+        try:
+            data = minify(raw)
+        except ValueError as e:
+            report.append({'asset': rel, 'status': 'error', 'error': str(e), 'source': len(raw)})
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        name = hashed_name(rel, digest)
+        variants = {'': data, '.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data, quality=11)
+        status = 'unchanged' if prev and prev.get('sha256') == digest else 'written'
+        for ext, payload in variants.items():
+            path = os.path.join(out_dir, name + ext)
+            if not os.path.exists(path) or os.path.getsize(path) != len(payload):
+                _write_atomic(path, payload)
+        sizes = {'source': len(raw), 'min': len(data), 'gzip': len(variants['.gz'])}
+        if '.br' in variants:
+            sizes['br'] = len(variants['.br'])
+        assets[rel] = {'file': name, 'sha256': digest, 'encodings': list(variants), 'bytes': sizes,
+                       'source_sha256': source_sha}
+        report.append({'asset': rel, 'status': status, 'seconds': round(time.perf_counter() - t0, 4), **sizes})
+    removed = []
+    if prune:
+        keep = {a['file'] + ext for a in assets.values() for ext in a['encodings']} | {MANIFEST}
+        for f in sorted(os.listdir(out_dir)):
+            if f not in keep and not f.endswith('.tmp'):
+                os.remove(os.path.join(out_dir, f))
+                removed.append(f)
+    manifest = {'format': ASSET_FORMAT, 'base': OUT_DIR + '/', 'assets': assets}
+    text = json.dumps(manifest, ensure_ascii=False, indent=2) + '\n'
+    if _load_manifest(manifest_path) != manifest:
+        _write_atomic(manifest_path, text.encode('utf-8'))
+    return {'manifest': manifest, 'report': report, 'removed': removed}
+
+
+def _print_report(result: dict):
+    print(f"{'asset':<28} {'status':<10} {'source':>11} {'minified':>11} {'gzip':>10} {'br':>10}")
+    totals = {'source': 0, 'min': 0, 'gzip': 0, 'br': 0}
+    for r in result['report']:
+        if r['status'] == 'error':
+            print(f"{r['asset']:<28} ERROR      {r['error']}")
+            continue
+        for k in totals:
+            totals[k] += r.get(k, 0)
+        br = f"{r['br']:>10,}" if 'br' in r else f"{'-':>10}"
+        print(f"{r['asset']:<28} {r['status']:<10} {r['source']:>11,} {r['min']:>11,} {r['gzip']:>10,} {br}")
+    br = f"{totals['br']:>10,}" if totals['br'] else f"{'-':>10}"
+    print(f"{'total':<28} {'':<10} {totals['source']:>11,} {totals['min']:>11,} {totals['gzip']:>10,} {br}")
+    if brotli is None:
+        print("brotli module not installed: .br variants skipped (pip install brotli)")
+    if result['removed']:
+        print(f"removed {len(result['removed'])} stale file(s): {', '.join(result['removed'])}")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Minify + precompress + content-hash the public JSON datasets")
+    ap.add_argument('--public', default=DEFAULT_PUBLIC, help='public/ folder (default: next to scripts/)')
+    ap.add_argument('--no-prune', action='store_true', help='Keep hashed files that are no longer in the manifest')
+    ap.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = ap.parse_args(argv)
+    result = build_assets(args.public, prune=not args.no_prune)
+    if args.json:
+        print(json.dumps({'report': result['report'], 'removed': result['removed']}, ensure_ascii=False, indent=2))
+    else:
+        _print_report(result)
+    return 1 if any(r['status'] == 'error' for r in result['report']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Compare bridge backends (COM vs xlsx file) on a synthetic workbook.
+
+Usage:
+  python bench_backends.py                 # 50k rows, COM path simulated with excel_fake
+  python bench_backends.py --rows 5000 --com-call-ms 0.5
+  python bench_backends.py --live          # also time the real Excel COM path (Windows, Excel running)
+  python bench_backends.py --profile       # stage / COM call-site report of import + export on the fake
+
+The COM numbers without --live come from the in-memory stand-in: they measure the
+Python side plus the COM round-trip count, multiplied by --com-call-ms as a rough
+latency model. The xlsx numbers are real file I/O on a temporary workbook.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import prophecies_excel_bridge as bridge
+import prophecies_profile
+from excel_fake import FakeExcel
+
+BOOKS = ['Gen', 'Exod', 'Deut', 'Ps', 'Isa', 'Jer', 'Dan', 'Mic', 'Zech', 'Matt', 'Mark', 'Luke', 'John', 'Acts', 'Rom', 'Heb', 'Rev']
+STATUSES = ['Fulfilled', 'Partial', 'Future', 'Fulfilled / Ongoing']
+
+
+def synthetic_entries(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        ref = f"{rnd.choice(BOOKS)} {i // 40 + 1}:{i % 40 + 1}-{i % 40 + 3} #{i}"
+        out.append({
+            'id': ref,
+            'prophecyRef': ref,
+            'summary': {
+                'prophecy': f"Prophecy summary {i} " + 'lorem ' * rnd.randint(3, 12),
+                'fulfillment': f"Fulfillment summary {i} " + 'ipsum ' * rnd.randint(3, 12),
+                'en': {'prophecy': f"Prophecy summary {i}", 'fulfillment': f"Fulfillment summary {i}"},
+                'de': {'prophecy': f"Prophezeiung {i} " + 'Lorem ' * rnd.randint(2, 8), 'fulfillment': f"Erfüllung {i}"},
+            },
+            'category': {'en': 'Messianic', 'de': 'Messianisch'},
+            'status': rnd.choice(STATUSES),
+            'fulfillment': {'biblicalRef': f"{rnd.choice(BOOKS)} {rnd.randint(1, 28)}:{rnd.randint(1, 30)}; John 6:14; 7:40", 'externalRef': {'en': '', 'de': ''}},
+            'notes': {'en': 'Synthetic row', 'de': ''},
+        })
+    return out
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def bench_fake_com(entries, call_ms: float) -> List[Dict[str, Any]]:
+    excel = FakeExcel()
+    backend = bridge.ComBackend(excel)
+    ws = backend.resolve_sheet(create_if_missing=True)
+    t_imp, _ = _timed(lambda: backend.write_entries(ws, entries))
+    imp_calls = excel.counter.total
+    excel.counter.reset()
+    t_exp, (got, _) = _timed(lambda: backend.read_entries(ws))
+    exp_calls = excel.counter.total
+    assert len(got) == len(entries)
+    return [
+        {'backend': 'com (fake)', 'op': 'import', 'seconds': t_imp + imp_calls * call_ms / 1000, 'com_calls': imp_calls},
+        {'backend': 'com (fake)', 'op': 'export', 'seconds': t_exp + exp_calls * call_ms / 1000, 'com_calls': exp_calls},
+    ]
+
+
+def bench_live_com(entries) -> List[Dict[str, Any]]:
+    backend = bridge.ComBackend()
+    ws = backend.resolve_sheet(create_if_missing=True)
+    t_imp, _ = _timed(lambda: backend.write_entries(ws, entries))
+    t_exp, (got, _) = _timed(lambda: backend.read_entries(ws))
+    assert len(got) == len(entries)
+    return [
+        {'backend': 'com (live)', 'op': 'import', 'seconds': t_imp, 'com_calls': None},
+        {'backend': 'com (live)', 'op': 'export', 'seconds': t_exp, 'com_calls': None},
+    ]
+
+
+def bench_xlsx(entries, template: str) -> List[Dict[str, Any]]:
+    tmp_dir = tempfile.mkdtemp(prefix='bench-xlsx-')
+    try:
+        path = os.path.join(tmp_dir, 'bench.xlsm' if template.endswith('.xlsm') else 'bench.xlsx')
+        shutil.copy2(template, path)
+
+        def _import():
+            backend = bridge.XlsxBackend(path)
+            ws = backend.resolve_sheet(create_if_missing=True)
+            backend.write_entries(ws, entries)
+            backend.save()
+
+        def _export():
+            backend = bridge.XlsxBackend(path)
+            ws = backend.resolve_sheet(create_if_missing=False)
+            try:
+                return backend.read_entries(ws)
+            finally:
+                backend.wb.close()
+
+        t_imp, _ = _timed(_import)
+        t_exp, (got, _) = _timed(_export)
+        assert len(got) == len(entries)
+        size = os.path.getsize(path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return [
+        {'backend': 'xlsx', 'op': 'import', 'seconds': t_imp, 'com_calls': 0, 'file_bytes': size},
+        {'backend': 'xlsx', 'op': 'export', 'seconds': t_exp, 'com_calls': 0, 'file_bytes': size},
+    ]
+
+
+def profile_fake_com(entries) -> Dict[str, Any]:
+    """op_import then op_export through the profiling proxy; call counts are deterministic for a given row count."""
+    tmp_dir = tempfile.mkdtemp(prefix='bench-profile-')
+    try:
+        json_path = os.path.join(tmp_dir, 'prophecies.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        prof = prophecies_profile.enable()
+        try:
+            backend = bridge.ComBackend(FakeExcel())
+            with prophecies_profile.stage('import'):
+                bridge.op_import(json_path, backend=backend)
+            with prophecies_profile.stage('export'):
+                bridge.op_export(json_path, backend=backend)
+        finally:
+            prophecies_profile.disable()
+        return prof.report(mode='import+export', backend='com (fake)', rows=len(entries))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark COM vs xlsx bridge backends")
+    ap.add_argument('--rows', type=int, default=50000)
+    ap.add_argument('--com-call-ms', type=float, default=0.2, help='Assumed latency per COM round trip for the fake COM path')
+    ap.add_argument('--template', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'BibleProphecies.xlsm'), help='Workbook copied as the starting point for the xlsx run')
+    ap.add_argument('--live', action='store_true', help='Also benchmark the real Excel COM backend')
+    ap.add_argument('--profile', nargs='?', const='', metavar='REPORT.json', help='Print (and optionally save) the per-stage / per-call-site profile of the fake COM run')
+    args = ap.parse_args()
+
+    entries = synthetic_entries(args.rows)
+    if args.profile is not None:
+        report = profile_fake_com(entries)
+        for line in prophecies_profile.format_report(report):
+            print(line)
+        if args.profile:
+            prophecies_profile.write_report(args.profile, report)
+        return
+    results = bench_fake_com(entries, args.com_call_ms)
+    if args.live:
+        results += bench_live_com(entries)
+    results += bench_xlsx(entries, args.template)
+    print(f"{'backend':<12} {'op':<7} {'seconds':>9} {'com_calls':>10}  rows={args.rows}")
+    for r in results:
+        calls = '-' if r['com_calls'] is None else r['com_calls']
+        print(f"{r['backend']:<12} {r['op']:<7} {r['seconds']:>9.3f} {calls:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""Benchmark suite for prophecies_excel_bridge.py on synthetic datasets, with a stored baseline.
+
+public/prophecies.json has ~200 entries; the real workbooks are orders of magnitude larger.
+This generates deterministic (seeded) datasets of any size in both JSON shapes the bridge
+accepts, legacy flat rows (prophecyText "A — B", fulfillmentRef, sources, date, stray keys)
+and hierarchical entries (bilingual summaries, multi-ref strings such as
+"Isa 7:14; Matt 1:22-23; Luke 1:26-35"), and times:
+
+  legacy_row_to_new       migrate every legacy row in memory
+  load_and_migrate        stream + migrate a legacy file from disk
+  row_from_entry          flatten every entry to a sheet row
+  entry_from_row_headers  per-row COM read (one Cells().Value per cell; capped by --per-row-cap)
+  transform               op_transform on a legacy file (read, migrate, atomic write)
+  import                  op_import into an in-memory workbook (excel_fake)
+  import_cached           repeat op_import of an unchanged file with a warm content cache
+  export                  op_export from that workbook (sheet read, JSON + refs sidecar + store write)
+
+Each case reports the best of --rounds wall times, microseconds per row, the simulated COM
+round trips (exact for a given row count) and a digest of its output. --save writes these to
+a baseline JSON (sorted, one case per key) so a rerun after a change shows up as a plain diff.
+Without --save, a run is compared with the baseline: it prints the ratios and exits 1 when a
+case produces different output or needs more COM calls (both exact), and also when it got
+slower than --tolerance if one is given; wall times alone only warn, as they are machine-bound.
+
+Usage:
+  python bench_bridge.py                                # 1k + 10k rows, compare with the baseline
+  python bench_bridge.py --sizes 1000,100000,1000000 --rounds 1 --only transform import export
+  python bench_bridge.py --save                         # (re)write bench_bridge.baseline.json
+  python bench_bridge.py --generate legacy 50000 big.json   # just write a synthetic dataset
+  python bench_bridge.py --scaling 200000               # transform --workers 1, 2, 4, ... CPU count
+
+1M entries need a few GB of memory for the in-memory workbook (import / export).
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import gc
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import prophecies_excel_bridge as bridge
+from excel_fake import FakeExcel
+from prophecies_stream import JsonArrayWriter
+
+BASELINE_FORMAT = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_bridge.baseline.json')
+DEFAULT_SIZES = (1000, 10000)
+DEFAULT_TOLERANCE = 0.5
+MIN_DELTA_SECONDS = 0.01  # ratios of millisecond-scale timings are mostly noise
+
+# ------------------ Synthetic datasets ------------------
+
+# (book, chapters, verses per chapter) - enough shape for plausible refs, not canon-exact
+OT_BOOKS = [('Gen', 50, 31), ('Exod', 40, 30), ('Num', 36, 40), ('Deut', 34, 30), ('2Sam', 24, 30),
+            ('Ps', 150, 20), ('Isa', 66, 25), ('Jer', 52, 30), ('Ezek', 48, 30), ('Dan', 12, 30),
+            ('Hos', 14, 15), ('Joel', 3, 25), ('Mic', 7, 15), ('Zech', 14, 15), ('Mal', 4, 15)]
+NT_BOOKS = [('Matt', 28, 35), ('Mark', 16, 40), ('Luke', 24, 45), ('John', 21, 35), ('Acts', 28, 40),
+            ('Rom', 16, 25), ('Gal', 6, 20), ('Heb', 13, 25), ('1Pet', 5, 20), ('Rev', 22, 20)]
+CATEGORIES = [('Messianic', 'Messianisch'), ('Israel', 'Israel'), ('Nations', 'Völker'),
+              ('End Times', 'Endzeit'), ('Judgment', 'Gericht'), ('Restoration', 'Wiederherstellung')]
+STATUSES = ['Fulfilled', 'Partial', 'Future', 'Fulfilled / Ongoing', 'Fulfilled (typological)']
+EN_SUBJECTS = ['The Messiah', 'A king from David\'s line', 'The servant of the LORD', 'Jerusalem', 'The nations',
+               'A forerunner', 'The temple', 'The shepherd', 'Israel', 'The Spirit']
+EN_VERBS = ['will be born in', 'shall come to', 'will be rejected by', 'is pierced for', 'will be gathered to',
+            'shall enter', 'will be betrayed for', 'is raised from', 'shall be poured out on', 'will rule over']
+EN_OBJECTS = ['Bethlehem', 'his own people', 'thirty pieces of silver', 'the transgressions of many', 'the land',
+              'the city on a donkey', 'the dead', 'all flesh', 'the ends of the earth', 'the house of David']
+DE_SUBJECTS = ['Der Messias', 'Ein König aus Davids Linie', 'Der Knecht des HERRN', 'Jerusalem', 'Die Völker',
+               'Ein Wegbereiter', 'Der Tempel', 'Der Hirte', 'Israel', 'Der Geist']
+DE_VERBS = ['wird geboren in', 'kommt nach', 'wird verworfen von', 'wird durchbohrt für', 'wird gesammelt in',
+            'zieht ein in', 'wird verraten für', 'wird auferweckt von', 'wird ausgegossen über', 'herrscht über']
+DE_OBJECTS = ['Bethlehem', 'seinem eigenen Volk', 'dreißig Silberlinge', 'die Übertretungen vieler', 'das Land',
+              'die Stadt auf einem Esel', 'den Toten', 'alles Fleisch', 'die Enden der Erde', 'das Haus Davids']
+SOURCES = ['Josephus, Antiquities', 'Tacitus, Annals', 'Dead Sea Scrolls (1QIsa)', 'Babylonian Chronicle',
+           'Cyrus Cylinder', 'Pliny the Younger, Letters', 'Lachish Letters']
+
+
+def _ref(rnd: random.Random, books, with_book: bool = True) -> str:
+    book, chapters, verses = rnd.choice(books)
+    c = rnd.randint(1, chapters)
+    v = rnd.randint(1, verses)
+    shape = rnd.random()
+    if shape < 0.55:
+        tail = f"{c}:{v}"
+    elif shape < 0.85:
+        tail = f"{c}:{v}-{v + rnd.randint(1, 6)}"
+    elif shape < 0.95:
+        tail = f"{c}:{v}, {v + rnd.randint(2, 9)}"
+    else:
+        tail = f"{c}"
+    return f"{book} {tail}" if with_book else tail
+
+
+def _multi_ref(rnd: random.Random, books, max_parts: int) -> str:
+    """"Isa 53:3-5; 7:14; Matt 1:22-23" style: book changes, same-book continuations, verse lists."""
+    parts = [_ref(rnd, books)]
+    for _ in range(rnd.randint(0, max_parts - 1)):
+        parts.append(_ref(rnd, books, with_book=rnd.random() < 0.7))
+    return '; '.join(parts)
+
+
+def _sentence(rnd: random.Random, subjects, verbs, objects, clauses: int) -> str:
+    i = rnd.randrange(len(subjects))
+    parts = [f"{subjects[i]} {rnd.choice(verbs)} {rnd.choice(objects)}"]
+    for _ in range(clauses):
+        parts.append(f"{rnd.choice(verbs)} {rnd.choice(objects)}")
+    return ', '.join(parts) + '.'
+
+
+def synthetic_hierarchical(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """n entries in the current schema with unique prophecyRef / id."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        ref = f"{_multi_ref(rnd, OT_BOOKS, 3)} #{i}"
+        prophecy_en = _sentence(rnd, EN_SUBJECTS, EN_VERBS, EN_OBJECTS, rnd.randint(0, 3))
+        fulfillment_en = _sentence(rnd, EN_SUBJECTS, EN_VERBS, EN_OBJECTS, rnd.randint(0, 2))
+        category = rnd.choice(CATEGORIES)
+        summary: Dict[str, Any] = {'prophecy': prophecy_en, 'fulfillment': fulfillment_en,
+                                   'en': {'prophecy': prophecy_en, 'fulfillment': fulfillment_en}}
+        if rnd.random() < 0.8:
+            summary['de'] = {'prophecy': _sentence(rnd, DE_SUBJECTS, DE_VERBS, DE_OBJECTS, rnd.randint(0, 3)),
+                             'fulfillment': _sentence(rnd, DE_SUBJECTS, DE_VERBS, DE_OBJECTS, rnd.randint(0, 2))}
+        out.append({
+            'id': ref,
+            'prophecyRef': ref,
+            'summary': summary,
+            'category': {'en': category[0], 'de': category[1]},
+            'status': rnd.choice(STATUSES),
+            'fulfillment': {
+                'biblicalRef': _multi_ref(rnd, NT_BOOKS, 4),
+                'externalRef': {'en': rnd.choice(SOURCES) if rnd.random() < 0.3 else '',
+                                'de': rnd.choice(SOURCES) if rnd.random() < 0.1 else ''},
+            },
+            'notes': {'en': 'See also ' + _multi_ref(rnd, OT_BOOKS, 2) if rnd.random() < 0.25 else '',
+                      'de': 'Vgl. ' + _multi_ref(rnd, OT_BOOKS, 2) if rnd.random() < 0.1 else ''},
+        })
+    return out
+
+
+def synthetic_legacy(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """n flat legacy rows exercising every branch of legacy_row_to_new."""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        ref = f"{_multi_ref(rnd, OT_BOOKS, 3)} #{i}"
+        category = rnd.choice(CATEGORIES)
+        text = _sentence(rnd, EN_SUBJECTS, EN_VERBS, EN_OBJECTS, rnd.randint(0, 3))
+        if rnd.random() < 0.85:
+            text += rnd.choice([' — ', ' - ']) + _sentence(rnd, EN_SUBJECTS, EN_VERBS, EN_OBJECTS, rnd.randint(0, 2))
+        row: Dict[str, Any] = {
+            'id': ref,
+            'category': category[0],
+            'prophecyRef': ref,
+            'fulfillmentRef': _multi_ref(rnd, NT_BOOKS, 4),
+            'prophecyText': text,
+            'status': rnd.choice(STATUSES),
+        }
+        if rnd.random() < 0.5:
+            row['category_de'] = category[1]
+        if rnd.random() < 0.3:
+            row['date'] = f"c. {rnd.randint(400, 1000)} BC"
+        if rnd.random() < 0.4:
+            row['sources'] = rnd.sample(SOURCES, rnd.randint(1, 3))
+        if rnd.random() < 0.3:
+            row['notes'] = 'See also ' + _multi_ref(rnd, OT_BOOKS, 2)
+        if rnd.random() < 0.1:
+            row['notes_de'] = 'Vgl. ' + _multi_ref(rnd, OT_BOOKS, 2)
+        if rnd.random() < 0.05:
+            row['confidence'] = rnd.choice(['high', 'medium', 'low'])
+        out.append(row)
+    return out
+
+
+GENERATORS = {'legacy': synthetic_legacy, 'hierarchical': synthetic_hierarchical}
+
+
+def write_dataset(path: str, entries: Sequence[Dict[str, Any]]):
+    """Same bytes the bridge writes (indent=2, UTF-8), streamed."""
+    with JsonArrayWriter(path) as w:
+        for e in entries:
+            w.write(e)
+
+# ------------------ Cases ------------------
+
+
+def _digest(value) -> str:
+    if not isinstance(value, bytes):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(value).hexdigest()[:16]
+
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return _digest(f.read())
+
+
+class Fixture:
+    """Datasets and files for one size, shared by every case of that size."""
+
+    def __init__(self, rows: int, seed: int, tmp_dir: str, per_row_cap: int):
+        self.rows = rows
+        self.tmp_dir = tmp_dir
+        self.per_row_cap = per_row_cap
+        self.legacy = synthetic_legacy(rows, seed)
+        self.entries = synthetic_hierarchical(rows, seed)
+        self.legacy_path = os.path.join(tmp_dir, f'legacy-{rows}.json')
+        self.entries_path = os.path.join(tmp_dir, f'prophecies-{rows}.json')
+        write_dataset(self.legacy_path, self.legacy)
+        write_dataset(self.entries_path, self.entries)
+
+    def work_copy(self, src: str, name: str) -> str:
+        dst = os.path.join(self.tmp_dir, name)
+        shutil.copyfile(src, dst)
+        return dst
+
+    def filled_backend(self):
+        """ComBackend over a fake workbook whose sheet already holds every entry (counter reset)."""
+        excel = FakeExcel()
+        backend = bridge.ComBackend(excel)
+        ws = backend.resolve_sheet(create_if_missing=True)
+        bridge.write_entries(ws, self.entries, excel)
+        excel.counter.reset()
+        return excel, backend, ws
+
+
+# Each case: (fixture, round) -> (timed callable, finish). finish(result) returns (rows, com_calls, digest)
+# and runs outside the timed span.
+Prepared = Tuple[Callable[[], Any], Callable[[Any], Tuple[int, Optional[int], str]]]
+
+
+def case_legacy_row_to_new(fx: Fixture) -> Prepared:
+    return (lambda: [bridge.legacy_row_to_new(o) for o in fx.legacy],
+            lambda out: (len(out), None, _digest(out)))
+
+
+def case_load_and_migrate(fx: Fixture) -> Prepared:
+    return (lambda: bridge.load_and_migrate(fx.legacy_path),
+            lambda out: (len(out), None, _digest(out)))
+
+
+def case_row_from_entry(fx: Fixture) -> Prepared:
+    return (lambda: [bridge.row_from_entry(e) for e in fx.entries],
+            lambda out: (len(out), None, _digest(out)))
+
+
+def case_entry_from_row_headers(fx: Fixture) -> Prepared:
+    excel, _, ws = fx.filled_backend()
+    n = min(fx.rows, fx.per_row_cap)
+
+    def run():
+        headers = bridge._read_headers(ws)
+        return [bridge.entry_from_row_headers(headers, ws, ri) for ri in range(2, n + 2)]
+
+    def finish(out):
+        calls = excel.counter.total
+        excel.counter.reset()
+        return len(out), calls, _digest(out)
+    return run, finish
+
+
+def case_transform(fx: Fixture) -> Prepared:
+    path = fx.work_copy(fx.legacy_path, 'transform.json')
+    return (lambda: bridge.op_transform(path),
+            lambda _: (fx.rows, None, _file_digest(path)))
+
+
+def case_import(fx: Fixture) -> Prepared:
+    path = fx.work_copy(fx.entries_path, 'import.json')
+    excel = FakeExcel()
+    backend = bridge.ComBackend(excel)
+
+    def finish(_):
+        calls = excel.counter.total
+        ws = excel.ActiveWorkbook.Worksheets(bridge.PRIMARY_SHEET)
+        return fx.rows, calls, _digest(ws.UsedRange.Value)
+    return (lambda: bridge.op_import(path, backend=backend)), finish
+
+
+def case_import_cached(fx: Fixture) -> Prepared:
+    # Repeat import of an unchanged file: the content cache was filled by an untimed first import
+    path = fx.work_copy(fx.entries_path, 'import-cached.json')
+    cache_path = bridge.default_cache_path(path)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        cache = bridge.open_import_cache(path)
+        bridge.op_import(path, backend=bridge.ComBackend(FakeExcel()), cache=cache)
+        bridge.close_import_cache(cache)
+    excel = FakeExcel()
+    backend = bridge.ComBackend(excel)
+
+    def run():
+        cache = bridge.open_import_cache(path)
+        try:
+            bridge.op_import(path, backend=backend, cache=cache)
+        finally:
+            bridge.close_import_cache(cache)
+
+    def finish(_):
+        calls = excel.counter.total
+        ws = excel.ActiveWorkbook.Worksheets(bridge.PRIMARY_SHEET)
+        return fx.rows, calls, _digest(ws.UsedRange.Value)
+    return run, finish
+
+
+def case_export(fx: Fixture) -> Prepared:
+    path = fx.work_copy(fx.entries_path, 'export.json')
+    excel, backend, _ = fx.filled_backend()
+    return (lambda: bridge.op_export(path, backend=backend),
+            lambda _: (fx.rows, excel.counter.total, _file_digest(path)))
+
+
+CASES: Dict[str, Callable[[Fixture], Prepared]] = {
+    'legacy_row_to_new': case_legacy_row_to_new,
+    'load_and_migrate': case_load_and_migrate,
+    'row_from_entry': case_row_from_entry,
+    'entry_from_row_headers': case_entry_from_row_headers,
+    'transform': case_transform,
+    'import': case_import,
+    'import_cached': case_import_cached,
+    'export': case_export,
+}
+
+
+def run_case(name: str, fx: Fixture, rounds: int) -> Dict[str, Any]:
+    best = float('inf')
+    measured = None
+    for _ in range(rounds):
+        fn, finish = CASES[name](fx)
+        gc.collect()
+        gc.disable()  # as timeit: collections triggered by earlier cases' garbage are not this case's cost
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                out = fn()
+                elapsed = time.perf_counter() - t0
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        got = finish(out)
+        if measured is not None and got != measured:
+            raise SystemExit(f"{name}@{fx.rows}: rounds disagree ({measured} vs {got})")
+        measured = got
+    rows, calls, digest = measured
+    return {'case': name, 'rows': rows, 'seconds': round(best, 6),
+            'us_per_row': round(best * 1e6 / max(rows, 1), 3), 'com_calls': calls, 'digest': digest}
+
+
+def run_suite(sizes: Sequence[int], cases: Sequence[str], rounds: int, seed: int, per_row_cap: int) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    tmp_dir = tempfile.mkdtemp(prefix='bench-bridge-')
+    try:
+        for n in sizes:
+            t0 = time.perf_counter()
+            fx = Fixture(n, seed, tmp_dir, per_row_cap)
+            print(f"-- {n:,} rows (datasets generated in {time.perf_counter() - t0:.2f}s)", file=sys.stderr)
+            for name in cases:
+                r = run_case(name, fx, rounds)
+                results[f"{name}@{n}"] = r
+                print(f"   {name:<24} {r['seconds']:>10.4f}s", file=sys.stderr)
+            del fx
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return {
+        'format': BASELINE_FORMAT,
+        'seed': seed,
+        'rounds': rounds,
+        'per_row_cap': per_row_cap,
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.machine()},
+        'results': results,
+    }
+
+# ------------------ Scaling ------------------
+
+
+def _worker_counts(max_workers: int) -> List[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def run_scaling(rows: int, seed: int, rounds: int, max_workers: int, chunk_size: int) -> List[Dict[str, Any]]:
+    """op_transform on one legacy dataset at 1, 2, 4, ... workers; every output must be byte-identical.
+
+    The 'split' row is the main-process share of a parallel run (reading the element texts),
+    i.e. the part that does not shrink with more workers.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix='bench-scaling-')
+    try:
+        src = os.path.join(tmp_dir, 'legacy.json')
+        write_dataset(src, synthetic_legacy(rows, seed))
+        path = os.path.join(tmp_dir, 'transform.json')
+        t0 = time.perf_counter()
+        sum(1 for _ in bridge.iter_indented_chunks(src, chunk_size))
+        results = [{'workers': 'split', 'seconds': round(time.perf_counter() - t0, 4)}]
+        expected = None
+        for workers in _worker_counts(max_workers):
+            best = float('inf')
+            for _ in range(rounds):
+                shutil.copyfile(src, path)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    t0 = time.perf_counter()
+                    bridge.op_transform(path, workers, chunk_size)
+                    best = min(best, time.perf_counter() - t0)
+            digest = _file_digest(path)
+            if expected is not None and digest != expected:
+                raise SystemExit(f"transform --workers {workers}: output differs from --workers 1")
+            expected = digest
+            base = results[1]['seconds'] if len(results) > 1 else best
+            results.append({'workers': workers, 'seconds': round(best, 4), 'speedup': round(base / best, 2),
+                            'efficiency': round(base / best / workers, 2), 'digest': digest})
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def print_scaling(rows: int, results: List[Dict[str, Any]]):
+    print(f"transform scaling: {rows:,} legacy rows, {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'efficiency':>10}")
+    for r in results:
+        if r['workers'] == 'split':
+            continue
+        print(f"{r['workers']:>8} {r['seconds']:>9.3f} {r['speedup']:>7.2f}x {r['efficiency']:>10.0%}")
+    print(f"main-process split (serial share): {results[0]['seconds']:.3f}s; outputs byte-identical")
+
+# ------------------ Baseline ------------------
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get('format') == BASELINE_FORMAT else None
+
+
+def save_baseline(path: str, suite: Dict[str, Any]):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(suite, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def compare(baseline: Dict[str, Any], suite: Dict[str, Any], tolerance: float) -> Tuple[List[str], List[str]]:
+    """(regressions, slowdowns): output / COM-call changes are exact; slowdowns beyond tolerance are timing."""
+    problems: List[str] = []
+    slower: List[str] = []
+    if baseline.get('seed') != suite.get('seed'):
+        return [f"seed differs from baseline ({suite.get('seed')} vs {baseline.get('seed')}); outputs not comparable"], []
+    for key, cur in suite['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            continue
+        if cur['digest'] != base['digest']:
+            problems.append(f"{key}: output changed ({base['digest']} -> {cur['digest']})")
+        if base['com_calls'] is not None and cur['com_calls'] is not None and cur['com_calls'] > base['com_calls']:
+            problems.append(f"{key}: COM calls {base['com_calls']} -> {cur['com_calls']}")
+        if (cur['seconds'] > base['seconds'] * (1 + tolerance)
+                and cur['seconds'] - base['seconds'] > MIN_DELTA_SECONDS):
+            slower.append(f"{key}: {cur['seconds'] / base['seconds']:.2f}x slower "
+                          f"({base['seconds']:.4f}s -> {cur['seconds']:.4f}s)")
+    return problems, slower
+
+
+def print_table(suite: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    print(f"{'case':<24} {'rows':>9} {'seconds':>10} {'us/row':>10} {'com_calls':>10}  {'vs baseline':>11}")
+    for key, r in suite['results'].items():
+        base = (baseline or {}).get('results', {}).get(key)
+        ratio = f"{r['seconds'] / base['seconds']:>10.2f}x" if base and base['seconds'] else f"{'-':>11}"
+        calls = '-' if r['com_calls'] is None else r['com_calls']
+        print(f"{r['case']:<24} {r['rows']:>9,} {r['seconds']:>10.4f} {r['us_per_row']:>10.2f} {calls:>10}  {ratio}")
+
+# ------------------ CLI ------------------
+
+
+def _sizes(text: str) -> List[int]:
+    return [int(s.replace('_', '')) for s in text.split(',') if s.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the Excel bridge on synthetic datasets")
+    ap.add_argument('--sizes', type=_sizes, default=list(DEFAULT_SIZES), help='Comma-separated entry counts (default 1000,10000)')
+    ap.add_argument('--only', nargs='+', choices=list(CASES), help='Run only these cases')
+    ap.add_argument('--rounds', type=int, default=3, help='Best of N per case')
+    ap.add_argument('--seed', type=int, default=7)
+    ap.add_argument('--per-row-cap', type=int, default=20000, help='Rows read by the per-row COM case')
+    ap.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON to compare with / save to')
+    ap.add_argument('--save', action='store_true', help='Write the results as the new baseline')
+    ap.add_argument('--tolerance', type=float, help='Fail when a case is slower than this (0.5 = 50%%); '
+                    f'without it slowdowns beyond {DEFAULT_TOLERANCE * 100:.0f}%% only warn')
+    ap.add_argument('--json', action='store_true', help='Print the results as JSON')
+    ap.add_argument('--scaling', type=int, metavar='ROWS', help='Only run the transform --workers scaling benchmark on ROWS legacy rows')
+    ap.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='--scaling: largest worker count (default: CPU count)')
+    ap.add_argument('--chunk-size', type=int, default=bridge.TRANSFORM_CHUNK, help='--scaling: characters of JSON per worker task')
+    ap.add_argument('--generate', nargs=3, metavar=('SHAPE', 'N', 'OUT'), help='Write a synthetic legacy|hierarchical dataset and exit')
+    args = ap.parse_args(argv)
+
+    if args.generate:
+        shape, n, out = args.generate
+        if shape not in GENERATORS:
+            ap.error(f"--generate: shape must be one of {', '.join(GENERATORS)}")
+        write_dataset(out, GENERATORS[shape](int(n), args.seed))
+        print(f"Wrote {int(n):,} {shape} entries -> {out}")
+        return 0
+
+    if args.scaling:
+        results = run_scaling(args.scaling, args.seed, args.rounds, args.max_workers, args.chunk_size)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_scaling(args.scaling, results)
+        return 0
+
+    suite = run_suite(args.sizes, args.only or list(CASES), args.rounds, args.seed, args.per_row_cap)
+    baseline = None if args.save else load_baseline(args.baseline)
+    if args.json:
+        print(json.dumps(suite, ensure_ascii=False, indent=2))
+    else:
+        print_table(suite, baseline)
+    if args.save:
+        save_baseline(args.baseline, suite)
+        print(f"Baseline -> {args.baseline}")
+        return 0
+    if baseline is None:
+        return 0
+    problems, slower = compare(baseline, suite, DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance)
+    for p in problems:
+        print(f"REGRESSION: {p}", file=sys.stderr)
+    for p in slower:
+        print(f"{'REGRESSION' if args.tolerance is not None else 'WARN'}: {p}", file=sys.stderr)
+    return 1 if problems or (slower and args.tolerance is not None) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
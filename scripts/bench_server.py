@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Command latency of the bridge server (prophecies_excel_bridge.py --serve) vs one-shot runs.
+
+Everything runs against excel_fake (a workbook whose sheet already holds the dataset), so the
+numbers are the Python side: interpreter start, imports, JSON load / migration and the command
+itself. Real Excel adds a COM attach (Dispatch) per one-shot run on top, which the server pays once.
+
+  oneshot  a fresh process per command, as the Excel buttons used to run the bridge
+           (the fake workbook setup inside that process is measured and subtracted)
+  client   `python prophecies_client.py ...` per command against a warm server
+  warm     the client round trip from this process (no interpreter start): server-side cost
+
+Usage:
+  python bench_server.py                         # 20k rows, validate / export / import, best of 5
+  python bench_server.py --rows 1000 --rounds 10 --modes validate import
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import prophecies_client
+from bench_bridge import synthetic_hierarchical, write_dataset
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODES = ('validate', 'export', 'import')
+
+
+def _fake_excel(json_path: str):
+    import prophecies_excel_bridge as bridge
+    from excel_fake import FakeExcel
+    excel = FakeExcel()
+    ws = bridge.ComBackend(excel).resolve_sheet(create_if_missing=True)
+    bridge.write_entries(ws, bridge.load_and_migrate(json_path), excel)
+    return excel
+
+
+def child_serve(json_path: str):
+    import prophecies_server
+    excel = _fake_excel(json_path)
+    prophecies_server.serve(json_path, excel_factory=lambda: excel)
+
+
+def child_oneshot(json_path: str, argv: List[str]):
+    # What main() does, with the fake workbook in place of Excel; setup time goes to stderr
+    t0 = time.perf_counter()
+    excel = _fake_excel(json_path)
+    setup = time.perf_counter() - t0
+    import prophecies_excel_bridge as bridge
+    log = bridge.install_logging_hooks()
+    args = bridge.build_parser().parse_args(argv)
+    log.fallback_file = os.path.join(os.path.dirname(os.path.abspath(args.json)), 'prophecies_bridge.log')
+    bridge.run(args, lambda: excel)
+    log.close()
+    sys.__stderr__.write(f"SETUP {setup}\n")
+
+
+def _argv(mode: str, json_path: str) -> List[str]:
+    return ['--mode', mode, '--json', json_path]
+
+
+def _timed_process(cmd: List[str], env: Dict[str, str]) -> float:
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(cmd)} failed ({proc.returncode}):\n{proc.stderr}")
+    setup = [float(line.split()[1]) for line in proc.stderr.splitlines() if line.startswith('SETUP ')]
+    return elapsed - (setup[-1] if setup else 0.0)
+
+
+def _wait_for_server(state_file: str, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if prophecies_client.request({'op': 'status'}, out=io.StringIO(), state_file=state_file) is not None:
+            return
+        time.sleep(0.05)
+    raise SystemExit("bridge server did not come up")
+
+
+def run_latency(rows: int, rounds: int, modes: List[str], seed: int = 7) -> List[Dict[str, object]]:
+    tmp_dir = tempfile.mkdtemp(prefix='bench-server-')
+    state_file = os.path.join(tmp_dir, 'server-state.json')
+    env = dict(os.environ, PROPHECIES_BRIDGE_STATE=state_file, PYTHONPATH=HERE)
+    server = None
+    try:
+        json_path = os.path.join(tmp_dir, 'prophecies.json')
+        write_dataset(json_path, synthetic_hierarchical(rows, seed))
+        results = []
+        for mode in modes:
+            best = min(_timed_process([sys.executable, __file__, '--child-oneshot', json_path, '--', *_argv(mode, json_path)], env)
+                       for _ in range(rounds))
+            results.append({'mode': mode, 'path': 'oneshot', 'seconds': best})
+        server = subprocess.Popen([sys.executable, __file__, '--child-serve', json_path], env=env, cwd=HERE,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _wait_for_server(state_file)
+        client = os.path.join(HERE, 'prophecies_client.py')
+        for mode in modes:
+            argv = _argv(mode, json_path)
+            best = min(_timed_process([sys.executable, client, *argv], env) for _ in range(rounds))
+            results.append({'mode': mode, 'path': 'client', 'seconds': best})
+            warm = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                code = prophecies_client.request({'op': 'run', 'argv': argv, 'cwd': HERE}, out=io.StringIO(),
+                                                 err=io.StringIO(), state_file=state_file)
+                warm.append(time.perf_counter() - t0)
+                if code != 0:
+                    raise SystemExit(f"warm {mode} failed ({code})")
+            results.append({'mode': mode, 'path': 'warm', 'seconds': min(warm)})
+        prophecies_client.request({'op': 'stop'}, out=io.StringIO(), state_file=state_file)
+        server.wait(timeout=30)
+        return results
+    finally:
+        if server is not None and server.poll() is None:
+            server.kill()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def print_latency(rows: int, results: List[Dict[str, object]]):
+    oneshot = {r['mode']: r['seconds'] for r in results if r['path'] == 'oneshot'}
+    print(f"{'mode':<10} {'path':<8} {'ms':>9} {'vs oneshot':>11}  rows={rows:,}")
+    for r in results:
+        base = oneshot.get(r['mode'])
+        ratio = f"{base / r['seconds']:>10.1f}x" if base and r['path'] != 'oneshot' else f"{'-':>11}"
+        print(f"{r['mode']:<10} {r['path']:<8} {r['seconds'] * 1000:>9.1f} {ratio}")
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--child-serve']:
+        child_serve(argv[1])
+        return 0
+    if argv[:1] == ['--child-oneshot']:
+        child_oneshot(argv[1], argv[3:])
+        return 0
+    ap = argparse.ArgumentParser(description="Warm server vs one-shot bridge command latency (excel_fake)")
+    ap.add_argument('--rows', type=int, default=20000)
+    ap.add_argument('--rounds', type=int, default=5, help='Best of N per mode and path')
+    ap.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    ap.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = ap.parse_args(argv)
+    results = run_latency(args.rows, args.rounds, args.modes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_latency(args.rows, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Cross-version verse alignment: canonical verse -> verse row in every version's corpus.bin.
+
+Versions do not share one verse layout: some chapters are longer or shorter, books are missing,
+and the repair stage (fixBibles.js / bible_build.py) silently drops non-string verses, so after
+the drop verse N of a chapter sits at index N-1 in one version and N-2 in another. This tool
+reads every version's raw source once and records, for each canonical (book, chapter, verse),
+where that verse lives in each version: its row in <abbr>/corpus.bin (bible_corpus.py). A
+parallel lookup is then a few array reads plus one slice per version; no JSON is loaded.
+
+The canonical axis is dense: per canonical book (bible_refs numbering) the largest chapter
+count of any version, per chapter the largest verse count (raw positions, dropped verses
+included). Cell codes per version:
+  row                 verse text at that corpus row
+  row | MERGED        the version's verse is empty (joined into a neighbour); row holds the text
+  row | UNALIGNED     the chapter's verse count differs from the consensus, so verse N of this
+                      version need not be canonical verse N; parallel() leaves it out (None)
+                      unless asked for the positional text
+  DROPPED             present in the source but not a string; the repair stage removed it
+  GAP                 the version has no such verse (short chapter, missing chapter or book)
+
+Alignment is by position within a chapter, which only holds where the versions agree on the
+verse count. The consensus count is the most common one among the versions that have the
+chapter (ties: the larger); versions with any other count get UNALIGNED cells for the chapter.
+
+File public/bibles/alignment.bin (little-endian, sections 8-byte aligned):
+  header         magic 'BALN', format, versions, chapters, cells, 4 x (offset, length)
+  versions       UTF-8 "abbr\\tverses" lines (verses = corpus rows, checked when texts are read)
+  book_chapters  uint32[67]              first chapter row of each canonical book
+  chapter_cells  uint32[chapters + 1]    first cell of each chapter row
+  columns        uint32[versions * cells] cell codes, one column per version
+
+public/bibles/alignment-report.json lists per version the gap / dropped / merged counts and
+missing or unrecognised books, every chapter whose verse count differs from the consensus
+(most common count), and every chapter where dropped verses shift the client's verse indexes.
+
+Usage:
+  python bible_align.py build                              # all versions in index.json
+  python bible_align.py get "John 3:16; Ps 23:1-2" --versions fi_pr zh_ncv [--positional]
+  python bible_align.py report --top 20
+  python bible_align.py bench --lookups 20000
+"""
+from __future__ import annotations
+import argparse
+import collections
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from bible_build import DEFAULT_BIBLES, OSIS_BY_NAME, _is_book_like, _normalize_book, _repair_structure, _sha256_file, _write_text, list_versions, parse_source
+from bible_corpus import CORPUS_FILE, Corpus, _u32_bytes, _u32_view
+from bible_refs import CANONICAL_BOOKS, OSIS_ABBREVS, lookup_book, parse_ref, unpack, verse_id
+
+ALIGN_FORMAT = 2
+ALIGN_FILE = 'alignment.bin'
+REPORT_FILE = 'alignment-report.json'
+GAP = 0xFFFFFFFF
+DROPPED = 0xFFFFFFFE
+MERGED = 0x80000000
+UNALIGNED = 0x40000000
+ROW_MASK = 0x3FFFFFFF
+N_BOOKS = len(CANONICAL_BOOKS)
+_MAGIC = b'BALN'
+_HEAD = struct.Struct('<4sHHIII8Q')  # magic, format, reserved, versions, chapters, cells, 4 x (offset, length)
+
+
+def cell_status(code: int) -> str:
+    if code == GAP:
+        return 'gap'
+    if code == DROPPED:
+        return 'dropped'
+    if code & UNALIGNED:
+        return 'unaligned'
+    return 'merged' if code & MERGED else 'ok'
+
+
+def _ref(book: int, chapter: int) -> str:
+    return f"{OSIS_ABBREVS[book - 1]} {chapter}"
+
+
+# ------------------ Source layout ------------------
+
+
+class VersionLayout(NamedTuple):
+    abbr: str
+    verses: int                                   # corpus rows (strings kept by the repair stage)
+    chapters: Dict[Tuple[int, int], List[int]]    # (canonical book, chapter) -> cell code per raw verse position
+    unknown_books: List[str]                      # not mappable to a canonical book (rows still counted)
+    duplicate_books: List[str]                    # second book mapping to the same canonical book
+
+
+def _raw_books(raw) -> Tuple[List[dict], bool]:
+    """Book objects with their raw chapters, and whether verse positions are the source's own."""
+    if isinstance(raw, dict):
+        for key in ('books', 'bible', 'data'):
+            if isinstance(raw.get(key), list):
+                return _raw_books(raw[key])
+    if isinstance(raw, list) and all(_is_book_like(b) for b in raw):
+        return raw, True
+    # Loose chapter arrays: only the repaired structure is known, dropped verses cannot be placed
+    return _repair_structure(raw), False
+
+
+def read_layout(abbr: str, source: str) -> VersionLayout:
+    """Where each raw verse of a version ends up in its corpus (same book / verse order as the repair stage)."""
+    books, exact = _raw_books(parse_source(source))
+    chapters: Dict[Tuple[int, int], List[int]] = {}
+    unknown: List[str] = []
+    duplicate: List[str] = []
+    row = 0
+    for raw_book in books:
+        book = _normalize_book(raw_book) if exact else raw_book
+        if not book['chapters']:
+            continue  # dropped by the repair stage: no rows
+        name = book.get('name') or ''
+        abbrev = OSIS_BY_NAME.get(name) or book.get('abbrev') or ''
+        canonical = (lookup_book(abbrev) if abbrev else None) or lookup_book(name)
+        if canonical is None:
+            unknown.append(name or abbrev)
+        elif (canonical, 1) in chapters:
+            duplicate.append(name or abbrev)
+            canonical = None
+        source_chapters = raw_book['chapters'] if exact else book['chapters']
+        for ci, ch in enumerate(source_chapters, start=1):
+            verses = [ch] if isinstance(ch, str) else ch
+            codes: List[int] = []
+            last_text = None
+            for v in verses:
+                if not isinstance(v, str):
+                    codes.append(DROPPED)
+                    continue
+                if v.strip():
+                    last_text = row
+                    codes.append(row)
+                else:
+                    codes.append((last_text if last_text is not None else row) | MERGED)
+                row += 1
+            if canonical is not None:
+                chapters[(canonical, ci)] = codes
+    return VersionLayout(abbr, row, chapters, unknown, duplicate)
+
+
+# ------------------ Build ------------------
+
+
+def chapter_consensus(layouts: Sequence[VersionLayout]) -> Dict[Tuple[int, int], int]:
+    """(book, chapter) -> most common verse count among the versions that have it (ties: the larger)."""
+    counts: Dict[Tuple[int, int], collections.Counter] = collections.defaultdict(collections.Counter)
+    for lay in layouts:
+        for key, codes in lay.chapters.items():
+            if codes:
+                counts[key][len(codes)] += 1
+    return {key: max(c.items(), key=lambda kv: (kv[1], kv[0]))[0] for key, c in counts.items()}
+
+
+def _flag_unaligned(codes: Sequence[int]) -> List[int]:
+    return [c if c == DROPPED else c | UNALIGNED for c in codes]
+
+
+def pack_alignment(layouts: Sequence[VersionLayout]) -> bytes:
+    book_chapters = [0]
+    chapter_cells = [0]
+    keys: List[Tuple[int, int, int]] = []  # (book, chapter, verses) per chapter row
+    for book in range(1, N_BOOKS + 1):
+        n_ch = max((c for lay in layouts for (b, c) in lay.chapters if b == book), default=0)
+        for chapter in range(1, n_ch + 1):
+            n_v = max((len(lay.chapters.get((book, chapter), ())) for lay in layouts), default=0)
+            keys.append((book, chapter, n_v))
+            chapter_cells.append(chapter_cells[-1] + n_v)
+        book_chapters.append(len(keys))
+    consensus = chapter_consensus(layouts)
+    columns = bytearray()
+    for lay in layouts:
+        col: List[int] = []
+        for book, chapter, n_v in keys:
+            codes = lay.chapters.get((book, chapter), ())
+            col.extend(_flag_unaligned(codes) if codes and len(codes) != consensus[(book, chapter)] else codes)
+            col.extend([GAP] * (n_v - len(codes)))
+        columns += _u32_bytes(col)
+    sections = [
+        '\n'.join(f"{lay.abbr}\t{lay.verses}" for lay in layouts).encode('utf-8'),
+        _u32_bytes(book_chapters),
+        _u32_bytes(chapter_cells),
+        bytes(columns),
+    ]
+    table = []
+    pos = _HEAD.size
+    for data in sections:
+        pos += -pos % 8
+        table += [pos, len(data)]
+        pos += len(data)
+    out = bytearray(_HEAD.pack(_MAGIC, ALIGN_FORMAT, 0, len(layouts), len(keys), chapter_cells[-1], *table))
+    for data, start in zip(sections, table[::2]):
+        out += b'\0' * (start - len(out))
+        out += data
+    return bytes(out)
+
+
+def build_report(layouts: Sequence[VersionLayout], missing: Sequence[str], errors: Dict[str, str],
+                 sources: Dict[str, str]) -> dict:
+    versions: Dict[str, dict] = {}
+    all_keys = sorted({k for lay in layouts for k in lay.chapters})
+    widths: Dict[Tuple[int, int], int] = {}
+    consensus = chapter_consensus(layouts)
+    misalignments = []
+    for book, chapter in all_keys:
+        counts = {lay.abbr: len(lay.chapters.get((book, chapter), ())) for lay in layouts}
+        widths[(book, chapter)] = max(counts.values())
+        off = {a: n for a, n in counts.items() if n != consensus.get((book, chapter), 0)}
+        if off:
+            misalignments.append({'ref': _ref(book, chapter), 'consensus': consensus.get((book, chapter), 0),
+                                  'versions': off})
+    shifts = []
+    for lay in layouts:
+        codes = [c for k in all_keys for c in lay.chapters.get(k, ())]
+        books = {b for b, _ in lay.chapters}
+        stats = {
+            'verses': lay.verses,
+            'gaps': sum(n - len(lay.chapters.get(k, ())) for k, n in widths.items()),
+            'dropped': sum(c == DROPPED for c in codes),
+            'merged': sum(c != DROPPED and bool(c & MERGED) for c in codes),
+            'missing_books': [OSIS_ABBREVS[b - 1] for b in range(1, N_BOOKS + 1) if b not in books],
+            'unknown_books': lay.unknown_books,
+            'duplicate_books': lay.duplicate_books,
+            'misaligned_chapters': sum(1 for m in misalignments if lay.abbr in m['versions']),
+            'unaligned': sum(sum(c != DROPPED for c in codes) for k, codes in lay.chapters.items()
+                             if codes and len(codes) != consensus[k]),
+        }
+        for (book, chapter), chapter_codes in sorted(lay.chapters.items()):
+            dropped_at = [i + 1 for i, c in enumerate(chapter_codes) if c == DROPPED]
+            # Verses after the first dropped one are read one index too early by the client
+            if dropped_at and dropped_at[0] < len(chapter_codes):
+                shifts.append({'ref': _ref(book, chapter), 'version': lay.abbr, 'dropped_verses': dropped_at,
+                               'shifted_from': dropped_at[0] + 1})
+        versions[lay.abbr] = stats
+    return {'format': ALIGN_FORMAT, 'versions': versions, 'missing_versions': list(missing), 'errors': errors,
+            'misalignments': misalignments, 'shifts': shifts, 'sources': sources}
+
+
+def write_alignment(bibles_dir: str = DEFAULT_BIBLES, force: bool = False,
+                    only: Optional[Sequence[str]] = None) -> Tuple[Optional[dict], bool]:
+    """Build alignment.bin + alignment-report.json unless every source is unchanged; returns (report, written)."""
+    with open(os.path.join(bibles_dir, 'index.json'), 'r', encoding='utf-8-sig') as f:
+        listed = [v['abbreviation'] for lang in json.load(f) for v in lang.get('versions') or [] if v.get('abbreviation')]
+    present = list_versions(bibles_dir)
+    if only:
+        present = [a for a in present if a in set(only)]
+    missing = [a for a in listed if a not in present and not (only and a not in only)]
+    sources = {a: _sha256_file(os.path.join(bibles_dir, a + '.json')) for a in present}
+    out_path = os.path.join(bibles_dir, ALIGN_FILE)
+    report_path = os.path.join(bibles_dir, REPORT_FILE)
+    if not force and os.path.exists(out_path):
+        try:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if previous.get('format') == ALIGN_FORMAT and previous.get('sources') == sources:
+                return previous, False
+        except (OSError, ValueError):
+            pass
+    layouts: List[VersionLayout] = []
+    errors: Dict[str, str] = {}
+    for abbr in present:
+        try:
+            layouts.append(read_layout(abbr, os.path.join(bibles_dir, abbr + '.json')))
+        except (OSError, ValueError) as e:
+            errors[abbr] = str(e)
+            sources.pop(abbr, None)
+    if not layouts:
+        return None, False
+    data = pack_alignment(layouts)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    report = build_report(layouts, missing, errors, sources)
+    _write_text(report_path, json.dumps(report, ensure_ascii=False, indent=2))
+    return report, True
+
+
+# ------------------ Reader ------------------
+
+
+class Alignment:
+    """mmap reader: cell of a canonical verse in O(1), per-version corpus row / text per cell."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bibles_dir = os.path.dirname(os.path.abspath(path))
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, n_versions, n_chapters, n_cells, *table = _HEAD.unpack_from(self._mm, 0)
+        if magic != _MAGIC or fmt != ALIGN_FORMAT:
+            raise ValueError(f"{path}: not a format {ALIGN_FORMAT} alignment file")
+        sec = [(table[i], table[i] + table[i + 1]) for i in range(0, len(table), 2)]
+        lines = str(self._mm[sec[0][0]:sec[0][1]], 'utf-8').split('\n') if n_versions else []
+        self.versions = [ln.split('\t')[0] for ln in lines]
+        self._verses = {ln.split('\t')[0]: int(ln.split('\t')[1]) for ln in lines}
+        self._book_chapters = _u32_view(self._mm, *sec[1])
+        self._chapter_cells = _u32_view(self._mm, *sec[2])
+        self._columns = _u32_view(self._mm, *sec[3])
+        self.chapters = n_chapters
+        self.cells = n_cells
+        self._column = {abbr: i * n_cells for i, abbr in enumerate(self.versions)}
+        self._corpora: Dict[str, Corpus] = {}
+
+    def close(self):
+        for corpus in self._corpora.values():
+            corpus.close()
+        self._corpora.clear()
+        for view in (self._book_chapters, self._chapter_cells, self._columns):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+    def __enter__(self) -> 'Alignment':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # -- structure --
+
+    def chapter_count(self, book: int) -> int:
+        return self._book_chapters[book] - self._book_chapters[book - 1] if 1 <= book <= N_BOOKS else 0
+
+    def verse_count(self, book: int, chapter: int) -> int:
+        if not 1 <= chapter <= self.chapter_count(book):
+            return 0
+        row = self._book_chapters[book - 1] + chapter - 1
+        return self._chapter_cells[row + 1] - self._chapter_cells[row]
+
+    def cell(self, book: int, chapter: int, verse: int) -> Optional[int]:
+        """Cell index of a canonical verse, or None when no version has it."""
+        if not 1 <= verse <= self.verse_count(book, chapter):
+            return None
+        return self._chapter_cells[self._book_chapters[book - 1] + chapter - 1] + verse - 1
+
+    def code(self, cell: int, version: str) -> int:
+        return self._columns[self._column[version] + cell]
+
+    def locate(self, vid: int, versions: Optional[Sequence[str]] = None) -> Dict[str, Tuple[str, Optional[int]]]:
+        """Per version: (status, corpus row) of a canonical verse ID (bible_refs packing)."""
+        cell = self.cell(*unpack(vid))
+        out = {}
+        for abbr in versions or self.versions:
+            code = GAP if cell is None else self.code(cell, abbr)
+            status = cell_status(code)
+            out[abbr] = (status, code & ROW_MASK if status in ('ok', 'merged', 'unaligned') else None)
+        return out
+
+    # -- text --
+
+    def corpus(self, version: str) -> Corpus:
+        corpus = self._corpora.get(version)
+        if corpus is None:
+            path = os.path.join(self.bibles_dir, version, CORPUS_FILE)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} not found; build it first with bible_build.py "
+                                        f"(or bible_corpus.py build)")
+            corpus = Corpus(path)
+            if corpus.verses != self._verses[version]:
+                corpus.close()
+                raise ValueError(f"{version}: corpus.bin has {corpus.verses} verses, alignment expects "
+                                 f"{self._verses[version]}; rebuild with bible_build.py / bible_align.py build")
+            self._corpora[version] = corpus
+        return corpus
+
+    def parallel(self, vid: int, versions: Optional[Sequence[str]] = None,
+                 positional: bool = False) -> Dict[str, Optional[str]]:
+        """Text of one canonical verse in each version (None for gaps, dropped verses and, unless
+        positional, verses of chapters whose numbering does not match the consensus)."""
+        out = {}
+        for abbr, (status, row) in self.locate(vid, versions).items():
+            if row is None or (status == 'unaligned' and not positional):
+                out[abbr] = None
+            else:
+                out[abbr] = self.corpus(abbr).verse_at(row)
+        return out
+
+    def iter_ref(self, ref: str) -> Iterator[int]:
+        """Canonical verse IDs of a reference string, clamped to the aligned verses."""
+        for start, end in parse_ref(ref).ranges:
+            b1, c1, v1 = unpack(start)
+            b2, c2, v2 = unpack(end)
+            for b in range(b1, b2 + 1):
+                c_hi = min(c2 if b == b2 else self.chapter_count(b), self.chapter_count(b))
+                for c in range(c1 if b == b1 else 1, c_hi + 1):
+                    v_hi = min(v2 if (b, c) == (b2, c2) else self.verse_count(b, c), self.verse_count(b, c))
+                    for v in range(v1 if (b, c) == (b1, c1) else 1, v_hi + 1):
+                        yield verse_id(b, c, v)
+
+
+# ------------------ CLI ------------------
+
+
+def _print_report(report: dict, top: int):
+    print(f"{'version':<16} {'verses':>7} {'gaps':>6} {'dropped':>8} {'merged':>7} {'unaligned':>10} {'off-chapters':>13}  missing books")
+    for abbr, s in report['versions'].items():
+        books = ', '.join(s['missing_books'][:6]) + (' …' if len(s['missing_books']) > 6 else '')
+        print(f"{abbr:<16} {s['verses']:>7,} {s['gaps']:>6,} {s['dropped']:>8,} {s['merged']:>7,} {s['unaligned']:>10,} {s['misaligned_chapters']:>13,}  {books}")
+    if report['missing_versions']:
+        print(f"Listed in index.json without a source file: {', '.join(report['missing_versions'])}")
+    for abbr, err in report['errors'].items():
+        print(f"ERROR: {abbr}: {err}", file=sys.stderr)
+    mis = report['misalignments']
+    print(f"{len(mis)} chapter(s) whose verse count differs between versions; "
+          f"{len(report['shifts'])} chapter(s) with verses shifted by dropped entries")
+    for m in mis[:top]:
+        print(f"  {m['ref']:<10} consensus {m['consensus']:>3}: " + ', '.join(f"{a} {n}" for a, n in m['versions'].items()))
+    for s in report['shifts'][:top]:
+        print(f"  {s['ref']:<10} {s['version']}: dropped {s['dropped_verses']}, verses from {s['shifted_from']} shifted")
+
+
+def _bench(bibles_dir: str, lookups: int, seed: int):
+    from bible_corpus import load_books
+    path = os.path.join(bibles_dir, ALIGN_FILE)
+    t0 = time.perf_counter()
+    align = Alignment(path)
+    for abbr in align.versions:
+        align.corpus(abbr)
+    t_open = time.perf_counter() - t0
+    rnd = random.Random(seed)
+    vids = []
+    while len(vids) < lookups:
+        b = rnd.randint(1, N_BOOKS)
+        c = rnd.randint(1, max(1, align.chapter_count(b)))
+        n = align.verse_count(b, c)
+        if n:
+            vids.append(verse_id(b, c, rnd.randint(1, n)))
+    t0 = time.perf_counter()
+    for vid in vids:
+        align.parallel(vid)
+    t_align = time.perf_counter() - t0
+    # What a client without the table does: load every version and index [book][chapter][verse]
+    t0 = time.perf_counter()
+    loaded = {}
+    for abbr in align.versions:
+        by_canonical = {}
+        for book in load_books(os.path.join(bibles_dir, 'fixed', abbr + '.json') if os.path.exists(
+                os.path.join(bibles_dir, 'fixed', abbr + '.json')) else os.path.join(bibles_dir, abbr + '.json')):
+            c = lookup_book(book.get('abbrev') or '') or lookup_book(book.get('name') or '')
+            if c is not None:
+                by_canonical.setdefault(c, book['chapters'])
+        loaded[abbr] = by_canonical
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    differ = unaligned = 0
+    for vid in vids:
+        b, c, v = unpack(vid)
+        naive = {}
+        for abbr, books in loaded.items():
+            chs = books.get(b)
+            naive[abbr] = chs[c - 1][v - 1] if chs and c <= len(chs) and v <= len(chs[c - 1]) else None
+        differ += naive != align.parallel(vid, positional=True)
+        unaligned += any(status == 'unaligned' for status, _ in align.locate(vid).values())
+    t_naive = time.perf_counter() - t0 - t_align  # parallel() is called again for the comparison
+    n = len(align.versions)
+    print(f"{n} version(s), {align.cells:,} canonical verses, alignment.bin {os.path.getsize(path) / 1e6:.2f} MB")
+    print(f"  open          : alignment + {n} corpora {t_open * 1000:.1f} ms vs json load of {n} versions {t_load * 1000:.1f} ms")
+    print(f"  parallel verse: {t_align / lookups * 1e6:.1f} us per lookup across {n} versions "
+          f"(by-index on loaded JSON {max(t_naive, 0) / lookups * 1e6:.1f} us)")
+    print(f"  by-index lookup returned a different text than the positional one for {differ:,} of {lookups:,} verses; "
+          f"{unaligned:,} fall in chapters some version numbers differently (left out by parallel())")
+    align.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cross-version verse alignment table (public/bibles/alignment.bin)")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help=f'Write {ALIGN_FILE} and {REPORT_FILE} (skipped when no source changed)')
+    p.add_argument('--bibles', default=DEFAULT_BIBLES)
+    p.add_argument('--force', action='store_true')
+    p.add_argument('--only', nargs='+', metavar='ABBR')
+    p.add_argument('--top', type=int, default=10, help='Misaligned chapters to print')
+    p = sub.add_parser('get', help='Print a reference in every (or the given) version side by side')
+    p.add_argument('ref')
+    p.add_argument('--bibles', default=DEFAULT_BIBLES)
+    p.add_argument('--versions', nargs='+', metavar='ABBR')
+    p.add_argument('--positional', action='store_true',
+                   help='Also print verses of chapters whose verse count differs from the consensus (flagged)')
+    p = sub.add_parser('report', help=f'Summarise {REPORT_FILE}')
+    p.add_argument('--bibles', default=DEFAULT_BIBLES)
+    p.add_argument('--top', type=int, default=20)
+    p = sub.add_parser('bench', help='Parallel lookups vs loading every version')
+    p.add_argument('--bibles', default=DEFAULT_BIBLES)
+    p.add_argument('--lookups', type=int, default=20000)
+    p.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+    try:
+        return _run(args)
+    except (OSError, ValueError) as e:
+        hint = '' if args.cmd == 'build' or os.path.exists(os.path.join(args.bibles, ALIGN_FILE)) else \
+            f" (run 'python bible_align.py build' first)"
+        print(f"ERROR: {e}{hint}", file=sys.stderr)
+        return 1
+
+
+def _run(args: argparse.Namespace) -> int:
+    if args.cmd == 'build':
+        t0 = time.perf_counter()
+        report, written = write_alignment(args.bibles, args.force, args.only)
+        if report is None:
+            print("ERROR: no version could be read", file=sys.stderr)
+            return 1
+        print(f"{'Wrote' if written else 'Unchanged:'} {os.path.join(args.bibles, ALIGN_FILE)} ({time.perf_counter() - t0:.2f}s)")
+        _print_report(report, args.top)
+    elif args.cmd == 'get':
+        with Alignment(os.path.join(args.bibles, ALIGN_FILE)) as align:
+            versions = args.versions or align.versions
+            for vid in align.iter_ref(args.ref):
+                b, c, v = unpack(vid)
+                print(f"{OSIS_ABBREVS[b - 1]} {c}:{v}")
+                located = align.locate(vid, versions)
+                for abbr, text in align.parallel(vid, versions, args.positional).items():
+                    status = located[abbr][0]
+                    print(f"  {abbr:<16} {text if text is not None else '—'}" + ('' if status == 'ok' else f"  [{status}]"))
+    elif args.cmd == 'report':
+        with open(os.path.join(args.bibles, REPORT_FILE), 'r', encoding='utf-8') as f:
+            _print_report(json.load(f), args.top)
+    elif args.cmd == 'bench':
+        _bench(args.bibles, args.lookups, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
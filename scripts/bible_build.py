@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Parallel build pipeline for the Bible versions in public/bibles.
+
+Per version:  repair -> normalize -> split -> index -> stats, compact, shard
+  repair     tolerant load of <abbr>.json (BOM / junk prefix / trailing commas, fixBibles.js structure repair)
+  normalize  OSIS abbreviations (updateAbbrevs.js) ; writes fixed/<abbr>.json
+  split      <abbr>/meta.json + NN.json, same layout as splitBibles.js (but from the repaired books)
+  index      <abbr>/search-index.* (bible_search.py, mode picked from index.json)
+  stats      <abbr>/search-stats.bin, per-chapter term aggregates (bible_stats.py)
+  compact    <abbr>/corpus.bin (bible_corpus.py)
+  shard      <abbr>/bible.min.json + shards.json byte-range manifest (bible_shards.py)
+
+split works on the repaired, normalized books that every later stage reads, so meta.json
+agrees with the index, corpus and shards. splitBibles.js splits the raw <abbr>.json instead:
+its files match only for sources that need no repair (run after updateAbbrevs.js); on one that
+does, it copies the defects (non-string verses, chapter-less books) or fails.
+
+Versions run in a process pool. Every stage has a content key: the hash of its input key,
+the code it runs and its parameters (for index in auto mode, also the version's language in
+index.json). A stage whose key is unchanged and whose outputs exist
+is skipped; source hashes are cached against (size, mtime) in build-manifest.json, so a
+no-op rebuild only stats files. Timings per version / stage go to build-report.json, which
+supersedes the report.json / split-report.json written by the Node scripts.
+
+Usage:
+  python bible_build.py                             # public/bibles, all versions in index.json
+  python bible_build.py --jobs 4 --force             # rebuild everything
+  python bible_build.py --only fi_pr zh_ncv
+  python bible_build.py bench --copies 8             # scaling + no-op timing on a temp copy
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import bible_corpus
+import bible_search
+import bible_shards
+import bible_stats
+from bible_refs import CANONICAL_BOOKS, OSIS_ABBREVS
+from prophecies_stream import dumps_indented
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BIBLES = os.path.join(SCRIPTS_DIR, '..', 'public', 'bibles')
+MANIFEST = 'build-manifest.json'
+REPORT = 'build-report.json'
+FIXED_DIR = 'fixed'
+PIPELINE_VERSION = 1
+
+# stage -> (input stage, modules whose source is part of the key)
+STAGES: List[Tuple[str, Optional[str], Tuple[str, ...]]] = [
+    ('repair', None, ('bible_build.py',)),
+    ('normalize', 'repair', ('bible_build.py', 'bible_refs.py')),
+    ('split', 'normalize', ('bible_build.py',)),
+    ('index', 'normalize', ('bible_search.py', 'bible_refs.py')),
+    ('stats', 'index', ('bible_stats.py',)),
+    ('compact', 'normalize', ('bible_corpus.py',)),
+    ('shard', 'normalize', ('bible_shards.py',)),
+]
+OSIS_BY_NAME = dict(zip(CANONICAL_BOOKS, OSIS_ABBREVS))
+
+
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_text(path: str, text: str):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# ------------------ Stages ------------------
+
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+def _is_book_like(o) -> bool:
+    return isinstance(o, dict) and isinstance(o.get('chapters'), list)
+
+
+def _normalize_book(b: dict) -> dict:
+    chapters = []
+    for idx, ch in enumerate(b.get('chapters') or []):
+        if isinstance(ch, str):
+            chapters.append([ch])
+        elif isinstance(ch, list):
+            chapters.append([v for v in ch if isinstance(v, str)])
+        else:
+            raise ValueError(f"Chapter not array at index {idx}")
+    name = b.get('name') or (str(b['abbrev']).upper() if b.get('abbrev') else 'UNKNOWN')
+    abbrev = b.get('abbrev') or (b['name'][:2].lower() if b.get('name') else None)
+    book = {'name': name, 'abbrev': abbrev, 'chapters': chapters}
+    if abbrev is None:
+        del book['abbrev']  # JSON.stringify drops undefined
+    return book
+
+
+def _repair_structure(raw) -> List[dict]:
+    if isinstance(raw, list) and all(_is_book_like(b) for b in raw):
+        return [_normalize_book(b) for b in raw]
+    if isinstance(raw, dict):
+        for key in ('books', 'bible', 'data'):
+            if isinstance(raw.get(key), list):
+                return _repair_structure(raw[key])
+    if isinstance(raw, list):
+        repaired: List[dict] = []
+        current = None
+        for entry in raw:
+            if _is_book_like(entry):
+                current = _normalize_book(entry)
+                repaired.append(current)
+            elif isinstance(entry, list):
+                if current is None:
+                    current = {'name': f"BOOK_{len(repaired) + 1}", 'abbrev': f"b{len(repaired) + 1}", 'chapters': []}
+                    repaired.append(current)
+                current['chapters'].append([v for v in entry if isinstance(v, str)])
+        return repaired
+    raise ValueError('Unrecognized structure')
+
+
+def parse_source(source: str):
+    """Tolerant parse of a raw <abbr>.json (BOM, junk prefix, trailing commas), before structure repair."""
+    with open(source, 'r', encoding='utf-8') as f:
+        text = f.read()
+    text = text.lstrip('\ufeff')
+    m = re.search(r'[\[{]', text)
+    if m and m.start() > 0:
+        text = text[m.start():]
+    try:
+        raw = json.loads(text)
+    except json.JSONDecodeError as e:
+        try:
+            raw = json.loads(_TRAILING_COMMA.sub(r'\1', text))
+        except json.JSONDecodeError:
+            raise ValueError(f"JSON parse error: {e}") from None
+    return raw
+
+
+def stage_repair(source: str) -> List[dict]:
+    """fixBibles.js: tolerant parse + structure repair; books without chapters are dropped."""
+    return [b for b in _repair_structure(parse_source(source)) if b['chapters']]
+
+
+def stage_normalize(books: List[dict], out_path: str) -> List[dict]:
+    """updateAbbrevs.js: OSIS abbreviations for known English book names."""
+    for b in books:
+        want = OSIS_BY_NAME.get(b.get('name'))
+        if want:
+            b['abbrev'] = want
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    _write_text(out_path, dumps_indented(books))
+    return books
+
+
+def stage_split(books: Sequence[dict], abbr: str, out_dir: str):
+    """splitBibles.js layout: one compact JSON per (repaired) book plus meta.json."""
+    os.makedirs(out_dir, exist_ok=True)
+    meta = {'abbreviation': abbr, 'books': []}
+    for i, b in enumerate(books):
+        file_name = f"{i + 1:02d}.json"
+        abbrev = b.get('abbrev') or (b['name'][:3].lower() if b.get('name') else f"b{i + 1}")
+        _write_text(os.path.join(out_dir, file_name),
+                    json.dumps({'name': b['name'], 'abbrev': abbrev, 'chapters': b['chapters']}, ensure_ascii=False, separators=(',', ':')))
+        meta['books'].append({'idx': i, 'name': b['name'], 'abbrev': abbrev, 'file': file_name,
+                              'chapterCount': len(b['chapters']), 'verseCounts': [len(ch) for ch in b['chapters']]})
+    _write_text(os.path.join(out_dir, 'meta.json'), json.dumps(meta, ensure_ascii=False, indent=2))
+
+
+def _stage_outputs(stage: str, bibles_dir: str, abbr: str) -> List[str]:
+    out_dir = os.path.join(bibles_dir, abbr)
+    if stage in ('repair', 'normalize'):
+        return [os.path.join(bibles_dir, FIXED_DIR, abbr + '.json')]
+    if stage == 'split':
+        return [os.path.join(out_dir, 'meta.json')]
+    if stage == 'index':
+        return [os.path.join(out_dir, bible_search.INDEX_JSON), os.path.join(out_dir, bible_search.POSTINGS_BIN)]
+    if stage == 'stats':
+        return [os.path.join(out_dir, bible_stats.STATS_FILE)]
+    if stage == 'shard':
+        return [os.path.join(out_dir, bible_shards.SHARD_FILE), os.path.join(out_dir, bible_shards.MANIFEST_FILE)]
+    return [os.path.join(out_dir, bible_corpus.CORPUS_FILE)]
+
+
+# ------------------ Keys ------------------
+
+
+def code_fingerprints() -> Dict[str, str]:
+    names = {m for _, _, mods in STAGES for m in mods}
+    out = {}
+    for name in sorted(names):
+        with open(os.path.join(SCRIPTS_DIR, name), 'rb') as f:
+            out[name] = _sha256_bytes(f.read())
+    return out
+
+
+def stage_keys(source_sha: str, params: Dict[str, Any], code: Dict[str, str]) -> Dict[str, str]:
+    keys: Dict[str, str] = {}
+    for stage, dep, mods in STAGES:
+        parts = [str(PIPELINE_VERSION), stage, keys[dep] if dep else source_sha,
+                 *(code[m] for m in mods), json.dumps(params.get(stage), sort_keys=True)]
+        keys[stage] = _sha256_bytes('\0'.join(parts).encode('utf-8'))
+    return keys
+
+
+def source_hash(path: str, cached: Optional[dict]) -> dict:
+    st = os.stat(path)
+    if cached and cached.get('size') == st.st_size and cached.get('mtime_ns') == st.st_mtime_ns:
+        return cached
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': _sha256_file(path)}
+
+
+# ------------------ Worker ------------------
+
+
+def build_version(task: dict) -> dict:
+    """Run the dirty stages for one version (process-pool entry point)."""
+    abbr = task['abbr']
+    bibles_dir = task['bibles_dir']
+    source = os.path.join(bibles_dir, abbr + '.json')
+    fixed_path = os.path.join(bibles_dir, FIXED_DIR, abbr + '.json')
+    out_dir = os.path.join(bibles_dir, abbr)
+    dirty = set(task['dirty'])
+    timings: Dict[str, Any] = {}
+    books: Optional[List[dict]] = None
+    t_version = time.perf_counter()
+    try:
+        for stage, _, _ in STAGES:
+            if stage not in dirty:
+                timings[stage] = 'skipped'
+                continue
+            t0 = time.perf_counter()
+            if stage == 'repair':
+                books = stage_repair(source)
+            elif stage == 'normalize':
+                books = stage_normalize(books, fixed_path)
+            else:
+                if books is None:
+                    books = bible_search.load_bible(fixed_path)
+                if stage == 'split':
+                    stage_split(books, abbr, out_dir)
+                elif stage == 'index':
+                    bible_search.write_index(source, out_dir, mode=task['params']['index']['mode'],
+                                             ngram=task['params']['index']['ngram'],
+                                             mmap_layout=task['params']['index']['mmap'], books=books)
+                elif stage == 'stats':
+                    bible_stats.write_stats(source, books, os.path.join(out_dir, bible_stats.STATS_FILE))
+                elif stage == 'compact':
+                    bible_corpus.write_corpus(source, os.path.join(out_dir, bible_corpus.CORPUS_FILE), books=books)
+                elif stage == 'shard':
+                    bible_shards.write_shards(source, out_dir, books=books)
+            timings[stage] = round(time.perf_counter() - t0, 4)
+    except Exception as e:
+        return {'file': abbr + '.json', 'status': 'error', 'error': f"{stage}: {e}", 'stages': timings}
+    return {'file': abbr + '.json', 'status': 'built', 'books': len(books) if books is not None else None,
+            'stages': timings, 'seconds': round(time.perf_counter() - t_version, 4)}
+
+
+# ------------------ Driver ------------------
+
+
+def version_languages(bibles_dir: str) -> Dict[str, str]:
+    """abbreviation -> language, as listed in index.json."""
+    with open(os.path.join(bibles_dir, 'index.json'), 'r', encoding='utf-8-sig') as f:
+        languages = json.load(f)
+    return {v['abbreviation']: lang.get('language', '') for lang in languages for v in lang.get('versions') or [] if v.get('abbreviation')}
+
+
+def list_versions(bibles_dir: str) -> List[str]:
+    """Abbreviations listed in index.json that have a <abbr>.json next to it."""
+    with open(os.path.join(bibles_dir, 'index.json'), 'r', encoding='utf-8-sig') as f:
+        languages = json.load(f)
+    listed = [v['abbreviation'] for lang in languages for v in lang.get('versions') or [] if v.get('abbreviation')]
+    return [a for a in listed if os.path.exists(os.path.join(bibles_dir, a + '.json'))]
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def run_pipeline(bibles_dir: str, jobs: Optional[int] = None, force: bool = False, only: Optional[Sequence[str]] = None,
+                 index_mode: str = 'auto', ngram: int = bible_search.NGRAM_N, mmap_layout: bool = False,
+                 quiet: bool = False) -> dict:
+    t_start = time.perf_counter()
+    manifest_path = os.path.join(bibles_dir, MANIFEST)
+    manifest = _load_json(manifest_path, {})
+    known = manifest.get('versions', {}) if manifest.get('pipeline') == PIPELINE_VERSION else {}
+    code = code_fingerprints()
+    versions = list_versions(bibles_dir)
+    languages = version_languages(bibles_dir) if index_mode == 'auto' else {}
+    if only:
+        versions = [a for a in versions if a in set(only)]
+    new_manifest: Dict[str, Any] = {a: v for a, v in known.items() if a not in versions}
+    tasks = []
+    report: List[dict] = []
+    for abbr in versions:
+        prev = known.get(abbr, {})
+        src = source_hash(os.path.join(bibles_dir, abbr + '.json'), prev.get('source'))
+        # auto mode resolves from the language in index.json, so an edited language re-indexes
+        params = {'index': {'mode': index_mode, 'ngram': ngram, 'mmap': mmap_layout}}
+        if index_mode == 'auto':
+            params['index']['language'] = languages.get(abbr)
+        keys = stage_keys(src['sha256'], params, code)
+        done = prev.get('stages', {})
+        dirty = []
+        for stage, _, _ in STAGES:
+            outputs = _stage_outputs(stage, bibles_dir, abbr)
+            if force or done.get(stage) != keys[stage] or not all(os.path.exists(p) for p in outputs):
+                dirty.append(stage)
+        # normalize needs repair's in-memory books
+        if 'normalize' in dirty and 'repair' not in dirty:
+            dirty.insert(0, 'repair')
+        new_manifest[abbr] = {'source': src, 'stages': keys}
+        if dirty:
+            tasks.append({'abbr': abbr, 'bibles_dir': bibles_dir, 'dirty': dirty, 'params': params})
+        else:
+            report.append({'file': abbr + '.json', 'status': 'skipped', 'stages': {s: 'skipped' for s, _, _ in STAGES}})
+    t_plan = time.perf_counter() - t_start
+    if tasks:
+        workers = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+        if workers == 1:
+            results = [build_version(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(build_version, tasks))
+        for res in results:
+            if res['status'] == 'error':
+                # Forget the keys so the next run retries this version
+                new_manifest.pop(res['file'][:-5], None)
+            report.append(res)
+    report.sort(key=lambda r: versions.index(r['file'][:-5]))
+    totals = {s: round(sum(r['stages'].get(s) for r in report if isinstance(r['stages'].get(s), float)), 4) for s, _, _ in STAGES}
+    summary = {
+        'pipeline': PIPELINE_VERSION,
+        'jobs': jobs or os.cpu_count(),
+        'plan_seconds': round(t_plan, 4),
+        'total_seconds': round(time.perf_counter() - t_start, 4),
+        'stage_totals': totals,
+        'versions': report,
+    }
+    if tasks or new_manifest != known:
+        _write_text(manifest_path, json.dumps({'pipeline': PIPELINE_VERSION, 'versions': new_manifest}, indent=2))
+    # A no-op run keeps the timings of the last real build
+    if tasks or not os.path.exists(os.path.join(bibles_dir, REPORT)):
+        _write_text(os.path.join(bibles_dir, REPORT), json.dumps(summary, ensure_ascii=False, indent=2))
+    if not quiet:
+        _print_report(summary)
+    return summary
+
+
+def _print_report(summary: dict):
+    names = [s for s, _, _ in STAGES]
+    print(f"{'version':<18} {'status':<8} " + ' '.join(f"{n:>9}" for n in names))
+    for r in summary['versions']:
+        cells = []
+        for n in names:
+            v = r['stages'].get(n, '-')
+            cells.append(f"{v:>9.3f}" if isinstance(v, float) else f"{v:>9}")
+        print(f"{r['file'][:-5]:<18} {r['status']:<8} " + ' '.join(cells) + (f"  {r['error']}" if r.get('error') else ''))
+    print(f"{'total (cpu s)':<27} " + ' '.join(f"{summary['stage_totals'][n]:>9.3f}" for n in names))
+    print(f"wall {summary['total_seconds']:.3f}s (planning {summary['plan_seconds'] * 1000:.1f} ms, jobs={summary['jobs']})")
+
+
+def _bench(bibles_dir: str, copies: int, max_jobs: int):
+    """Copy the available versions `copies` times into a temp tree and time full / no-op builds."""
+    versions = list_versions(bibles_dir)
+    lang_of = version_languages(bibles_dir)
+    tmp = tempfile.mkdtemp(prefix='bible-build-')
+    try:
+        entries = []
+        for i in range(copies):
+            for abbr in versions:
+                name = f"{abbr}_{i}"
+                shutil.copy2(os.path.join(bibles_dir, abbr + '.json'), os.path.join(tmp, name + '.json'))
+                entries.append({'language': lang_of.get(abbr, ''), 'versions': [{'name': name, 'abbreviation': name}]})
+        with open(os.path.join(tmp, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        print(f"{len(entries)} versions, {os.cpu_count()} CPU(s)")
+        jobs = 1
+        while jobs <= max_jobs:
+            t = run_pipeline(tmp, jobs=jobs, force=True, quiet=True)['total_seconds']
+            print(f"  full rebuild jobs={jobs:<3} {t:7.2f}s")
+            jobs *= 2
+        t = run_pipeline(tmp, quiet=True)['total_seconds']
+        print(f"  no-op rebuild         {t * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parallel Bible corpus build pipeline")
+    ap.add_argument('cmd', nargs='?', choices=['build', 'bench'], default='build')
+    ap.add_argument('--bibles', default=DEFAULT_BIBLES, help='Folder with index.json and <abbr>.json files')
+    ap.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    ap.add_argument('--force', action='store_true', help='Ignore the manifest and rebuild every stage')
+    ap.add_argument('--only', nargs='+', help='Restrict to these abbreviations')
+    ap.add_argument('--index-mode', choices=('auto',) + bible_search.INDEX_MODES, default='auto')
+    ap.add_argument('--ngram', type=int, default=bible_search.NGRAM_N)
+    ap.add_argument('--mmap', action='store_true', help='Also write the single-file search index')
+    ap.add_argument('--copies', type=int, default=8, help='bench: copies of each available version')
+    args = ap.parse_args()
+    bibles_dir = os.path.normpath(args.bibles)
+    if args.cmd == 'bench':
+        _bench(bibles_dir, args.copies, args.jobs or os.cpu_count() or 1)
+        return 0
+    summary = run_pipeline(bibles_dir, args.jobs, args.force, args.only, args.index_mode, args.ngram, args.mmap)
+    return 1 if any(r['status'] == 'error' for r in summary['versions']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Compact binary corpus for one Bible version, read through mmap.
+
+One file (public/bibles/<abbr>/corpus.bin) holds the UTF-8 text of every verse plus
+offset tables book -> chapter -> verse, so a verse or a range is a couple of array
+lookups and one slice of the mapped file instead of a full json.load of 3-4 MB.
+
+Layout (little-endian, sections 8-byte aligned):
+  header          magic 'BCRP', format, book / chapter / verse counts, 5 x (offset, length)
+  books           UTF-8 "name\\tabbrev" lines
+  book_chapters   uint32[books + 1]     first chapter row of each book
+  chapter_verses  uint32[chapters + 1]  first verse row of each chapter
+  verse_offsets   uint32[verses + 1]    byte offset of each verse in text
+  text            concatenated UTF-8 verse texts
+
+Input is either the raw <abbr>.json or the splitBibles.js output folder (meta.json + NN.json).
+Book numbers are 1-based file order, as in bible_search verse IDs.
+
+Usage:
+  python bible_corpus.py build --bibles ../public/bibles               # every <abbr>.json -> <abbr>/corpus.bin
+  python bible_corpus.py build --split-dir ../public/bibles/fi_pr
+  python bible_corpus.py get --bible ../public/bibles/fi_pr.json "John 3:16; Ps 23"
+  python bible_corpus.py bench --bible ../public/bibles/fi_pr.json
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bible_refs import WHOLE, lookup_book, parse_ref, unpack, verse_id
+
+CORPUS_FORMAT = 1
+CORPUS_FILE = 'corpus.bin'
+SKIP_FILES = {'index.json', 'report.json', 'split-report.json'}
+_MAGIC = b'BCRP'
+_HEAD = struct.Struct('<4sHHIII10Q')  # magic, format, reserved, books, chapters, verses, 5 x (offset, length)
+
+
+def _u32_bytes(values) -> bytes:
+    a = array('I', values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+
+def _u32_view(buf, start: int, end: int) -> Sequence[int]:
+    if sys.byteorder == 'little':
+        return memoryview(buf)[start:end].cast('I')
+    a = array('I', bytes(buf[start:end]))
+    a.byteswap()
+    return a
+
+
+# ------------------ Input ------------------
+
+
+def load_books(path: str) -> List[dict]:
+    """Books from a raw <abbr>.json file or a splitBibles.js folder."""
+    if os.path.isdir(path):
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8-sig') as f:
+            meta = json.load(f)
+        books = []
+        for b in meta.get('books') or []:
+            with open(os.path.join(path, b['file']), 'r', encoding='utf-8-sig') as f:
+                books.append(json.load(f))
+        return books
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        books = json.load(f)
+    if not isinstance(books, list):
+        raise ValueError(f"{path}: top-level is not a list of books")
+    return books
+
+
+def corpus_path_for(bible_path: str) -> str:
+    root = bible_path if os.path.isdir(bible_path) else os.path.splitext(bible_path)[0]
+    return os.path.join(root, CORPUS_FILE)
+
+
+# ------------------ Build ------------------
+
+
+def pack_corpus(books: Sequence[dict]) -> bytes:
+    names = []
+    book_chapters = [0]
+    chapter_verses = [0]
+    verse_offsets = [0]
+    text = bytearray()
+    for i, book in enumerate(books):
+        names.append(f"{book.get('name') or ''}\t{book.get('abbrev') or ''}")
+        chapters = book.get('chapters') or []
+        for chapter in chapters:
+            for v in chapter:
+                text += (v if isinstance(v, str) else str(v or '')).encode('utf-8')
+                verse_offsets.append(len(text))
+            chapter_verses.append(len(verse_offsets) - 1)
+        book_chapters.append(len(chapter_verses) - 1)
+    sections = [
+        '\n'.join(names).encode('utf-8'),
+        _u32_bytes(book_chapters),
+        _u32_bytes(chapter_verses),
+        _u32_bytes(verse_offsets),
+        bytes(text),
+    ]
+    table = []
+    pos = _HEAD.size
+    for data in sections:
+        pos += -pos % 8
+        table += [pos, len(data)]
+        pos += len(data)
+    out = bytearray(_HEAD.pack(_MAGIC, CORPUS_FORMAT, 0, len(books), len(chapter_verses) - 1, len(verse_offsets) - 1, *table))
+    for data, start in zip(sections, table[::2]):
+        out += b'\0' * (start - len(out))
+        out += data
+    return bytes(out)
+
+
+def write_corpus(source: str, out_path: Optional[str] = None, books: Optional[Sequence[dict]] = None) -> Tuple[str, int]:
+    out_path = out_path or corpus_path_for(source)
+    data = pack_corpus(load_books(source) if books is None else books)
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    return out_path, len(data)
+
+
+# ------------------ Reader ------------------
+
+
+class Corpus:
+    """mmap reader: O(1) verse access; verse_bytes() returns a memoryview into the mapping."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, n_books, n_chapters, n_verses, *table = _HEAD.unpack_from(self._mm, 0)
+        if magic != _MAGIC or fmt != CORPUS_FORMAT:
+            raise ValueError(f"{path}: not a format {CORPUS_FORMAT} corpus file")
+        sec = [(table[i], table[i] + table[i + 1]) for i in range(0, len(table), 2)]
+        lines = str(self._mm[sec[0][0]:sec[0][1]], 'utf-8').split('\n') if n_books else []
+        self.books = [ln.split('\t')[0] for ln in lines]
+        self.abbrevs = [ln.split('\t')[1] if '\t' in ln else '' for ln in lines]
+        self._book_chapters = _u32_view(self._mm, *sec[1])
+        self._chapter_verses = _u32_view(self._mm, *sec[2])
+        self._verse_offsets = _u32_view(self._mm, *sec[3])
+        self._text = memoryview(self._mm)[sec[4][0]:sec[4][1]]
+        self.chapters = n_chapters
+        self.verses = n_verses
+        self._canonical: Optional[Dict[int, int]] = None
+
+    def close(self):
+        for view in (self._book_chapters, self._chapter_verses, self._verse_offsets, self._text):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+    def __enter__(self) -> 'Corpus':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # -- structure --
+
+    def chapter_count(self, book: int) -> int:
+        return self._book_chapters[book] - self._book_chapters[book - 1]
+
+    def verse_count(self, book: int, chapter: int) -> int:
+        row = self._book_chapters[book - 1] + chapter - 1
+        return self._chapter_verses[row + 1] - self._chapter_verses[row]
+
+    def _row(self, book: int, chapter: int, verse: int) -> int:
+        if not (1 <= book <= len(self.books) and 1 <= chapter <= self.chapter_count(book)):
+            raise IndexError(f"no chapter {book}:{chapter}")
+        row = self._book_chapters[book - 1] + chapter - 1
+        first = self._chapter_verses[row]
+        if not (1 <= verse <= self._chapter_verses[row + 1] - first):
+            raise IndexError(f"no verse {book}:{chapter}:{verse}")
+        return first + verse - 1
+
+    # -- text --
+
+    def verse_bytes(self, book: int, chapter: int, verse: int) -> memoryview:
+        r = self._row(book, chapter, verse)
+        return self._text[self._verse_offsets[r]:self._verse_offsets[r + 1]]
+
+    def verse_at(self, row: int) -> str:
+        """Text of the row-th verse in file order (0-based, across all books)."""
+        if not 0 <= row < self.verses:
+            raise IndexError(f"no verse row {row}")
+        return str(self._text[self._verse_offsets[row]:self._verse_offsets[row + 1]], 'utf-8')
+
+    def verse(self, book: int, chapter: int, verse: int) -> str:
+        return str(self.verse_bytes(book, chapter, verse), 'utf-8')
+
+    def verse_by_id(self, vid: int) -> str:
+        return self.verse(*unpack(vid))
+
+    def iter_range(self, start: int, end: int) -> Iterator[Tuple[int, str]]:
+        """(verse_id, text) for an inclusive verse-ID range in this version's book order.
+
+        Chapter / verse 999 (bible_refs.WHOLE) and other overshoots are clamped to what exists.
+        """
+        b1, c1, v1 = unpack(start)
+        b2, c2, v2 = unpack(end)
+        for b in range(max(b1, 1), min(b2, len(self.books)) + 1):
+            n_ch = self.chapter_count(b)
+            c_lo = c1 if b == b1 else 1
+            c_hi = min(c2 if b == b2 else n_ch, n_ch)
+            for c in range(c_lo, c_hi + 1):
+                row = self._book_chapters[b - 1] + c - 1
+                first = self._chapter_verses[row]
+                n_v = self._chapter_verses[row + 1] - first
+                v_lo = v1 if (b, c) == (b1, c1) else 1
+                v_hi = min(v2 if (b, c) == (b2, c2) else n_v, n_v)
+                offs = self._verse_offsets
+                for v in range(v_lo, v_hi + 1):
+                    r = first + v - 1
+                    yield verse_id(b, c, v), str(self._text[offs[r]:offs[r + 1]], 'utf-8')
+
+    def iter_verses(self) -> Iterator[Tuple[int, str]]:
+        return self.iter_range(verse_id(1, 1, 1), verse_id(len(self.books), WHOLE, WHOLE))
+
+    # -- references --
+
+    def canonical_book(self, canonical: int) -> Optional[int]:
+        """File book number for a canonical (bible_refs) book number."""
+        if self._canonical is None:
+            self._canonical = {}
+            for i, (name, abbrev) in enumerate(zip(self.books, self.abbrevs), start=1):
+                c = lookup_book(abbrev) if abbrev else None
+                c = c or lookup_book(name)
+                if c is not None:
+                    self._canonical.setdefault(c, i)
+        return self._canonical.get(canonical)
+
+    def passage(self, ref: str) -> List[Tuple[int, str]]:
+        """All verses of a reference string such as "John 3:16; Ps 23" (verse IDs in file book order)."""
+        out = []
+        for start, end in parse_ref(ref).ranges:
+            b1, c1, v1 = unpack(start)
+            b2, c2, v2 = unpack(end)
+            fb1, fb2 = self.canonical_book(b1), self.canonical_book(b2)
+            if fb1 is None or fb2 is None:
+                continue
+            out.extend(self.iter_range(verse_id(fb1, c1, v1), verse_id(fb2, c2, v2)))
+        return out
+
+
+# ------------------ CLI ------------------
+
+
+def _bible_files(folder: str) -> List[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.json') and f not in SKIP_FILES)
+
+
+def _measure(fn) -> Tuple[float, int, object]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current, result
+
+
+def _bench(bible_path: str, lookups: int, seed: int):
+    path = corpus_path_for(bible_path)
+    if not os.path.exists(path):
+        write_corpus(bible_path)
+    t_json, mem_json, books = _measure(lambda: load_books(bible_path))
+    t_open, mem_open, corpus = _measure(lambda: Corpus(path))
+    rnd = random.Random(seed)
+    ids = [vid for vid, _ in corpus.iter_verses()]
+    sample = [unpack(rnd.choice(ids)) for _ in range(lookups)]
+    t0 = time.perf_counter()
+    for b, c, v in sample:
+        books[b - 1]['chapters'][c - 1][v - 1]
+    t_json_get = (time.perf_counter() - t0) / lookups
+    t0 = time.perf_counter()
+    for b, c, v in sample:
+        corpus.verse(b, c, v)
+    t_get = (time.perf_counter() - t0) / lookups
+    mismatches = sum(1 for b, c, v in sample if corpus.verse(b, c, v) != books[b - 1]['chapters'][c - 1][v - 1])
+    first = min(ids)
+    t0 = time.perf_counter()
+    with Corpus(path) as cold:
+        cold.verse_by_id(first)
+    t_first = time.perf_counter() - t0
+    print(f"{os.path.basename(bible_path)}: {corpus.verses} verses, json {os.path.getsize(bible_path) / 1e6:.1f} MB, corpus {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"  json.load      : {t_json * 1000:8.1f} ms  {mem_json / 1e6:7.1f} MB Python heap")
+    print(f"  Corpus open    : {t_open * 1000:8.3f} ms  {mem_open / 1e6:7.3f} MB Python heap (file mapped, paged on demand)")
+    print(f"  first verse    : json {(t_json + t_json_get) * 1000:.1f} ms vs corpus {t_first * 1000:.3f} ms (open + read)")
+    print(f"  random verse   : json {t_json_get * 1e6:.2f} us vs corpus {t_get * 1e6:.2f} us per lookup ({lookups} lookups, {mismatches} mismatches)")
+    corpus.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compact binary Bible corpus (mmap reader)")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help=f'Write <abbr>/{CORPUS_FILE}')
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument('--bible', help='Raw <abbr>.json file')
+    g.add_argument('--split-dir', help='splitBibles.js output folder (meta.json + NN.json)')
+    g.add_argument('--bibles', help='Folder with <abbr>.json files')
+    p = sub.add_parser('get', help='Print the verses of a reference')
+    p.add_argument('--bible', required=True, help='<abbr>.json (its corpus.bin is read) or a corpus.bin path')
+    p.add_argument('ref')
+    p = sub.add_parser('bench', help='Memory / latency vs json.load')
+    p.add_argument('--bible', required=True)
+    p.add_argument('--lookups', type=int, default=100000)
+    p.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    if args.cmd == 'build':
+        sources = [args.bible or args.split_dir] if (args.bible or args.split_dir) else _bible_files(args.bibles)
+        for src in sources:
+            t0 = time.perf_counter()
+            try:
+                out, size = write_corpus(src)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"ERROR: {src}: {e}", file=sys.stderr)
+                continue
+            print(f"{src} -> {out} ({size / 1e6:.1f} MB, {time.perf_counter() - t0:.2f}s)")
+    elif args.cmd == 'get':
+        path = args.bible if args.bible.endswith('.bin') else corpus_path_for(args.bible)
+        with Corpus(path) as corpus:
+            for vid, text in corpus.passage(args.ref):
+                b, c, v = unpack(vid)
+                print(f"{corpus.books[b - 1]} {c}:{v} {text}")
+    elif args.cmd == 'bench':
+        _bench(args.bible, args.lookups, args.seed)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Batch reference resolution: prophecies.json refs -> verse texts, one passage pack per version.
+
+The client's extractVerseObjects() parses a ref string on every render, resolves only its
+first ref, and looks the book up with a linear startsWith() scan over CANONICAL_BOOKS. Here
+every prophecyRef / fulfillment.biblicalRef is split the way the detail view splits it
+(splitRefs: ';'-separated parts, "C:V" parts inherit the previous book), each distinct part
+is parsed once with bible_refs (hashed book table, all ranges of the part), and the verse
+texts are sliced out of each version's corpus.bin (bible_corpus.py). Parts without a book of
+their own are keyed by their canonical form (see keyed_parts).
+
+Output: public/bibles/<abbr>/passages.json
+  {"format": 1, "version": abbr, "prophecies": sha256 of prophecies.json,
+   "passages": {"<key>": [[n, text], ...], ...}, "missing": [keys with no verses]}
+n is the verse number, or "C:V" when the part spans chapters (as in the client's verseObjs).
+One passage per line, so the packs diff cleanly.
+
+Usage:
+  python bible_passages.py                                  # all versions in public/bibles/index.json
+  python bible_passages.py --only fi_pr --jobs 2
+  python bible_passages.py get --bible ../public/bibles/fi_pr.json "Isa 53:3-5"
+  python bible_passages.py bench
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import bible_corpus
+from bible_refs import CANONICAL_BOOKS, VerseRange, format_range, parse_ref, unpack, verse_id
+from prophecies_stream import file_sha256, iter_json_array
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BIBLES = os.path.join(SCRIPTS_DIR, '..', 'public', 'bibles')
+DEFAULT_PROPHECIES = os.path.join(SCRIPTS_DIR, '..', 'public', 'prophecies.json')
+PASSAGES_FORMAT = 1
+PASSAGES_FILE = 'passages.json'
+
+_SPLIT = re.compile(r'\s*;\s*')
+_BOOK_HEAD = re.compile(r'^([1-3]?\s*[A-Za-z]+(?:\s+[A-Za-z]+)*)\s+\d')
+_BARE_CV = re.compile(r'^\d+:\d')
+
+Passage = List[list]  # [[n, text], ...]
+
+
+def split_refs(ref_str: Optional[str]) -> List[str]:
+    """Port of the detail view's splitRefs(): the parts that become PassageBlocks."""
+    out: List[str] = []
+    last_book = ''
+    for raw in _SPLIT.split(ref_str or ''):
+        part = raw.strip()
+        if not part:
+            continue
+        m = _BOOK_HEAD.match(part)
+        if m:
+            last_book = m.group(1)
+        elif _BARE_CV.match(part) and last_book:
+            part = f"{last_book} {part}"
+        out.append(part)
+    return out
+
+
+def keyed_parts(ref_str: Optional[str]) -> List[Tuple[str, str, Tuple[VerseRange, ...]]]:
+    """(display part, pack key, canonical ranges) per split_refs() part.
+
+    A part without its own book ("16" after "Ps 22:1") is parsed in the context of the
+    parts before it and keyed by its canonical form ("Ps 22:16"), so equal display strings
+    from different entries cannot collide.
+    """
+    parts = split_refs(ref_str)
+    out = []
+    for i, part in enumerate(parts):
+        if i == 0 or _BOOK_HEAD.match(part):
+            out.append((part, part, parse_ref(part).ranges))
+            continue
+        before = len(parse_ref('; '.join(parts[:i])).ranges)
+        ranges = parse_ref('; '.join(parts[:i + 1])).ranges[before:]
+        out.append((part, '; '.join(format_range(s, e) for s, e in ranges) or part, ranges))
+    return out
+
+
+def entry_parts(entry: dict):
+    """keyed_parts() of an entry's prophecyRef and fulfillment.biblicalRef."""
+    fulfillment = entry.get('fulfillment') or {}
+    return keyed_parts(entry.get('prophecyRef')), keyed_parts(fulfillment.get('biblicalRef'))
+
+
+def collect_parts(entries: Iterable[dict]) -> Dict[str, Tuple[VerseRange, ...]]:
+    """Distinct pack keys (first-seen order) -> canonical verse-ID ranges, parsed once."""
+    parts: Dict[str, Tuple[VerseRange, ...]] = {}
+    for e in entries:
+        for group in entry_parts(e):
+            for _, key, ranges in group:
+                parts.setdefault(key, ranges)
+    return parts
+
+
+def passages_path_for(bible_path: str) -> str:
+    return os.path.join(os.path.splitext(bible_path)[0], PASSAGES_FILE)
+
+
+# ------------------ Resolve ------------------
+
+
+def resolve(corpus: bible_corpus.Corpus, ranges: Sequence[VerseRange]) -> Passage:
+    """[[n, text], ...] for canonical ranges; verses missing in this version are skipped."""
+    picked: List[Tuple[int, str]] = []
+    for start, end in ranges:
+        b1, c1, v1 = unpack(start)
+        b2, c2, v2 = unpack(end)
+        fb1, fb2 = corpus.canonical_book(b1), corpus.canonical_book(b2)
+        if fb1 is None or fb2 is None:
+            continue
+        picked.extend(corpus.iter_range(verse_id(fb1, c1, v1), verse_id(fb2, c2, v2)))
+    multi_chapter = len({vid // 1000 for vid, _ in picked}) > 1
+    out: Passage = []
+    for vid, text in picked:
+        text = text.strip()
+        if not text:
+            continue
+        _, c, v = unpack(vid)
+        out.append([f"{c}:{v}" if multi_chapter else v, text])
+    return out
+
+
+def _open_corpus(bible_path: str) -> bible_corpus.Corpus:
+    path = bible_corpus.corpus_path_for(bible_path)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(bible_path):
+        bible_corpus.write_corpus(bible_path, path)
+    return bible_corpus.Corpus(path)
+
+
+def render_pack(abbr: str, source_sha: Optional[str], passages: Dict[str, Passage]) -> str:
+    head = json.dumps({'format': PASSAGES_FORMAT, 'version': abbr, 'prophecies': source_sha}, ensure_ascii=False)[:-1]
+    lines = [json.dumps(k, ensure_ascii=False) + ':' + json.dumps(v, ensure_ascii=False, separators=(',', ':'))
+             for k, v in passages.items()]
+    missing = json.dumps([k for k, v in passages.items() if not v], ensure_ascii=False)
+    return head + ',\n"passages":{\n' + ',\n'.join(lines) + '\n},\n"missing":' + missing + '}\n'
+
+
+def write_pack(bible_path: str, parts: Dict[str, Tuple[VerseRange, ...]], source_sha: Optional[str],
+               out_path: Optional[str] = None) -> Tuple[str, int, bool]:
+    """Resolve every part against one version; returns (path, passages with text, written)."""
+    out_path = out_path or passages_path_for(bible_path)
+    abbr = os.path.splitext(os.path.basename(bible_path))[0]
+    with _open_corpus(bible_path) as corpus:
+        passages = {part: resolve(corpus, ranges) for part, ranges in parts.items()}
+    text = render_pack(abbr, source_sha, passages)
+    found = sum(1 for v in passages.values() if v)
+    try:
+        with open(out_path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return out_path, found, False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(tmp, out_path)
+    return out_path, found, True
+
+
+def _pack_task(task: dict) -> dict:
+    t0 = time.perf_counter()
+    try:
+        path, found, written = write_pack(task['bible'], task['parts'], task['sha'])
+    except Exception as e:
+        return {'version': task['abbr'], 'error': str(e)}
+    return {'version': task['abbr'], 'found': found, 'written': written, 'seconds': round(time.perf_counter() - t0, 4)}
+
+
+def build_packs(bibles_dir: str, prophecies_path: str, jobs: Optional[int] = None,
+                only: Optional[Sequence[str]] = None) -> List[dict]:
+    """Parse the refs once, then write one pack per version (process pool across versions)."""
+    from bible_build import list_versions
+    parts = collect_parts(iter_json_array(prophecies_path))
+    sha = file_sha256(prophecies_path)
+    versions = [a for a in list_versions(bibles_dir) if not only or a in set(only)]
+    tasks = [{'abbr': a, 'bible': os.path.join(bibles_dir, a + '.json'), 'parts': parts, 'sha': sha} for a in versions]
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(tasks) or 1))
+    if workers == 1:
+        results = [_pack_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_pack_task, tasks))
+    for r in results:
+        r['parts'] = len(parts)
+    return results
+
+
+# ------------------ Lookup ------------------
+
+
+class PassagePack:
+    """Loaded passages.json: opening a prophecy is a dict lookup per PassageBlock."""
+
+    def __init__(self, data: dict):
+        if data.get('format') != PASSAGES_FORMAT:
+            raise ValueError(f"unsupported passage pack format {data.get('format')}")
+        self.version = data.get('version')
+        self.prophecies = data.get('prophecies')
+        self.passages: Dict[str, Passage] = data.get('passages') or {}
+
+    @classmethod
+    def for_bible(cls, bible_path: str) -> 'PassagePack':
+        with open(passages_path_for(bible_path), 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, part: str) -> Passage:
+        return self.passages.get(part, [])
+
+    def entry(self, entry: dict) -> Tuple[List[Tuple[str, Passage]], List[Tuple[str, Passage]]]:
+        """(prophecy, fulfillment) passages of one prophecies.json entry, in display order."""
+        prophecy, fulfillment = entry_parts(entry)
+        return [(p, self.get(key)) for p, key, _ in prophecy], [(p, self.get(key)) for p, key, _ in fulfillment]
+
+
+# ------------------ CLI ------------------
+
+
+def _client_first_ref(books: Sequence[dict], ref: str) -> int:
+    """Baseline: extractVerseObjects() as the client runs it (first ref, linear book scan); returns verse count."""
+    first = re.split(r'[;,]', ref)[0].strip()
+    core = re.sub(r'\s*\(.*', '', first).strip()
+    m = re.match(r'^([1-3]?\s?[A-Za-z.]+(?:\s+[A-Za-z.]+)*)\s+(\d+)(?::(\d+)(?:-(\d+))?|\s*[-–—]\s*(\d+))?$', core)
+    if not m:
+        return 0
+    norm = m.group(1).lower().rstrip('.')
+    idx = next((i for i, cb in enumerate(CANONICAL_BOOKS)
+                if cb.lower() == norm or cb.lower().startswith(norm) or norm.startswith(cb.lower())), -1)
+    if idx < 0 or idx >= len(books):
+        return 0
+    chapters = books[idx].get('chapters') or []
+    c1 = int(m.group(2))
+    if c1 > len(chapters):
+        return 0
+    if m.group(3) is None:
+        return len(chapters[c1 - 1])
+    start = int(m.group(3))
+    end = max(start, int(m.group(4) or start))
+    return len(chapters[c1 - 1][start - 1:end])
+
+
+def _bench(bibles_dir: str, prophecies_path: str, jobs: Optional[int]):
+    from bible_build import list_versions
+    entries = list(iter_json_array(prophecies_path))
+    versions = list_versions(bibles_dir)
+    refs = [p for e in entries for group in entry_parts(e) for p, _, _ in group]
+
+    t0 = time.perf_counter()
+    shown = 0
+    for abbr in versions:
+        books = bible_corpus.load_books(os.path.join(bibles_dir, abbr + '.json'))
+        shown += sum(1 for r in refs if _client_first_ref(books, r))
+    t_client = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = build_packs(bibles_dir, prophecies_path, jobs)
+    t_build = time.perf_counter() - t0
+
+    packs = [PassagePack.for_bible(os.path.join(bibles_dir, a + '.json')) for a in versions]
+    t0 = time.perf_counter()
+    for pack in packs:
+        for e in entries:
+            pack.entry(e)
+    t_lookup = time.perf_counter() - t0
+
+    print(f"{len(entries)} entries, {len(refs)} ref parts ({results[0]['parts'] if results else 0} distinct) x {len(versions)} versions")
+    print(f"client-style parse per ref (JSON load + first ref only): {t_client:.3f}s, {shown} parts with verses")
+    print(f"batch resolve, all refs, all versions:                  {t_build:.3f}s, "
+          f"{sum(r.get('found', 0) for r in results)} parts with verses")
+    print(f"pack lookup, every entry x version:                     {t_lookup * 1000:.2f} ms "
+          f"({t_lookup / max(1, len(entries) * len(packs)) * 1e6:.1f} us per entry)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Resolve prophecies.json refs to verse texts for every Bible version")
+    ap.add_argument('--bibles', default=DEFAULT_BIBLES)
+    ap.add_argument('--prophecies', default=DEFAULT_PROPHECIES)
+    ap.add_argument('--only', nargs='+')
+    ap.add_argument('--jobs', type=int)
+    sub = ap.add_subparsers(dest='cmd')
+    sub.add_parser('build', help=f'Write <abbr>/{PASSAGES_FILE} for every version (default)')
+    p = sub.add_parser('get', help='Resolve one ref string against one version')
+    p.add_argument('--bible', required=True)
+    p.add_argument('ref')
+    sub.add_parser('bench', help='Client-style per-ref parsing vs batch resolve vs pack lookup')
+    args = ap.parse_args()
+
+    if args.cmd in (None, 'build'):
+        t0 = time.perf_counter()
+        results = build_packs(args.bibles, args.prophecies, args.jobs, args.only)
+        for r in results:
+            if 'error' in r:
+                print(f"{r['version']:<16} ERROR {r['error']}")
+            else:
+                state = 'written' if r['written'] else 'unchanged'
+                print(f"{r['version']:<16} {r['found']}/{r['parts']} parts resolved, {state} ({r['seconds']:.2f}s)")
+        print(f"{time.perf_counter() - t0:.2f}s")
+        return 1 if any('error' in r for r in results) else 0
+    if args.cmd == 'get':
+        with _open_corpus(args.bible) as corpus:
+            for part, key, ranges in keyed_parts(args.ref):
+                print(part if part == key else f"{part} ({key})")
+                for n, text in resolve(corpus, ranges):
+                    print(f"  {n} {text}")
+        return 0
+    _bench(args.bibles, args.prophecies, args.jobs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""Bible reference parsing and canonical verse IDs.
+
+Compiles reference strings such as "Acts 3:19-26; John 6:14; 7:40" or
+"Isa 52:13-53:12" into lists of inclusive (start, end) verse-ID ranges.
+
+Verse IDs are packed integers:  book * 1_000_000 + chapter * 1_000 + verse
+with book = 1..66 in canonical (Protestant) order. A whole chapter ends at verse
+999 and a whole book ends at chapter 999, so ranges stay valid without knowing
+verse counts; consumers clamp to the actual chapter length.
+
+Grammar handled (per ';' separated segment, ',' continues the segment):
+  Book                      whole book          (Lam, Obadiah)
+  Book-Book                 book range          (Ezra-Nehemiah)
+  Book C / Book C-C2        chapter / range     (Isa 23, Ezek 38-39)
+  Book C:V[-V2]             verses              (Isa 53:7-8)
+  Book C:V-C2:V2            cross-chapter       (Isa 52:13-53:12)
+  ; C:V / ; C               book carry-over     (John 6:14; 7:40)
+  , V[-V2] / , C:V          verse / chapter carry-over (Gal 3:8,16,29)
+  Book V[-V2]               verses of a one-chapter book (Jude 14, Obad 15-21; "Jude 1" is the chapter)
+Brackets act like ';'; free text after a reference ends the segment until the next book name
+followed by a number ("Gen 3:15 cf. Rom 16:20"); skipped words and numbers go to .unparsed.
+
+Usage:
+  python bible_refs.py parse "Acts 3:19-26; John 6:14; 7:40"
+  python bible_refs.py index --json ../public/prophecies.json       # writes prophecies.refs.json
+  python bible_refs.py bench --json ../public/prophecies.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+CANONICAL_BOOKS = [
+    'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy', 'Joshua', 'Judges', 'Ruth', '1 Samuel', '2 Samuel',
+    '1 Kings', '2 Kings', '1 Chronicles', '2 Chronicles', 'Ezra', 'Nehemiah', 'Esther', 'Job', 'Psalms', 'Proverbs',
+    'Ecclesiastes', 'Song of Solomon', 'Isaiah', 'Jeremiah', 'Lamentations', 'Ezekiel', 'Daniel', 'Hosea', 'Joel', 'Amos',
+    'Obadiah', 'Jonah', 'Micah', 'Nahum', 'Habakkuk', 'Zephaniah', 'Haggai', 'Zechariah', 'Malachi',
+    'Matthew', 'Mark', 'Luke', 'John', 'Acts', 'Romans', '1 Corinthians', '2 Corinthians', 'Galatians', 'Ephesians',
+    'Philippians', 'Colossians', '1 Thessalonians', '2 Thessalonians', '1 Timothy', '2 Timothy', 'Titus', 'Philemon',
+    'Hebrews', 'James', '1 Peter', '2 Peter', '1 John', '2 John', '3 John', 'Jude', 'Revelation',
+]
+# OSIS-style abbreviations (same table as BOOK_ABBREV_MAP in BibleApp.jsx)
+OSIS_ABBREVS = [
+    'Gen', 'Exod', 'Lev', 'Num', 'Deut', 'Josh', 'Judg', 'Ruth', '1Sam', '2Sam', '1Kgs', '2Kgs', '1Chr', '2Chr', 'Ezra', 'Neh',
+    'Esth', 'Job', 'Ps', 'Prov', 'Eccl', 'Song', 'Isa', 'Jer', 'Lam', 'Ezek', 'Dan', 'Hos', 'Joel', 'Amos', 'Obad', 'Jonah',
+    'Mic', 'Nah', 'Hab', 'Zeph', 'Hag', 'Zech', 'Mal', 'Matt', 'Mark', 'Luke', 'John', 'Acts', 'Rom', '1Cor', '2Cor', 'Gal',
+    'Eph', 'Phil', 'Col', '1Thess', '2Thess', '1Tim', '2Tim', 'Titus', 'Phlm', 'Heb', 'Jas', '1Pet', '2Pet', '1John', '2John',
+    '3John', 'Jude', 'Rev',
+]
+# Further common abbreviations / variants (normalizeNameForMap in BibleApp.jsx plus usual short forms)
+EXTRA_ALIASES = {
+    'Genesis': ['Gn', 'Ge'], 'Exodus': ['Ex', 'Exo'], 'Leviticus': ['Lv'], 'Numbers': ['Nm', 'Nb'], 'Deuteronomy': ['Dt'],
+    'Judges': ['Jdg', 'Jdgs'], 'Ruth': ['Ru', 'Rth'], 'Esther': ['Est'], 'Psalms': ['Psalm', 'Psa', 'Pss', 'Psm'],
+    'Proverbs': ['Pr', 'Prv'], 'Ecclesiastes': ['Eccles', 'Ecc', 'Qoh'], 'Song of Solomon': ['Song of Songs', 'Canticles', 'Cant', 'SoS'],
+    'Isaiah': ['Is'], 'Ezekiel': ['Eze', 'Ezk'], 'Daniel': ['Dn'], 'Joel': ['Jl'], 'Amos': ['Am'], 'Obadiah': ['Ob'],
+    'Jonah': ['Jon', 'Jnh'], 'Nahum': ['Na'], 'Zephaniah': ['Zep'], 'Zechariah': ['Zec'], 'Matthew': ['Mt', 'Mat'],
+    'Mark': ['Mk', 'Mrk'], 'Luke': ['Lk'], 'John': ['Jn', 'Jhn'], 'Acts': ['Ac'], 'Romans': ['Ro', 'Rm'],
+    'Philippians': ['Php'], 'Philemon': ['Philem', 'Phm'], 'James': ['Jm'], 'Jude': ['Jud'],
+    'Revelation': ['Re', 'Revelations', 'The Revelation', 'The Revelation of John', 'Apocalypse'],
+    '1 Samuel': ['1 Sa'], '2 Samuel': ['2 Sa'], '1 Kings': ['1 Ki', '1 Kin'], '2 Kings': ['2 Ki', '2 Kin'],
+    '1 Chronicles': ['1 Chron', '1 Ch'], '2 Chronicles': ['2 Chron', '2 Ch'], '1 Thessalonians': ['1 Th', '1 Thes'],
+    '2 Thessalonians': ['2 Th', '2 Thes'], '1 Peter': ['1 Pe', '1 Pt'], '2 Peter': ['2 Pe', '2 Pt'], '1 John': ['1 Jn'],
+    '2 John': ['2 Jn'], '3 John': ['3 Jn'],
+}
+
+BOOK_FACTOR = 1_000_000
+CHAPTER_FACTOR = 1_000
+WHOLE = 999  # end marker for "to the end of the chapter / book"
+
+VerseRange = Tuple[int, int]
+
+
+def verse_id(book: int, chapter: int, verse: int) -> int:
+    return book * BOOK_FACTOR + chapter * CHAPTER_FACTOR + verse
+
+
+def unpack(vid: int) -> Tuple[int, int, int]:
+    book, rest = divmod(vid, BOOK_FACTOR)
+    chapter, verse = divmod(rest, CHAPTER_FACTOR)
+    return book, chapter, verse
+
+
+def format_verse_id(vid: int) -> str:
+    b, c, v = unpack(vid)
+    return f"{OSIS_ABBREVS[b - 1]} {c}:{v}"
+
+
+# ------------------ Book lookup ------------------
+
+_ORDINALS = {'i': '1', 'ii': '2', 'iii': '3', 'first': '1', 'second': '2', 'third': '3', '1st': '1', '2nd': '2', '3rd': '3'}
+
+
+def normalize_book_key(name: str) -> str:
+    """Lower-case, drop dots/spaces, map roman / spelled ordinals ('II Kings', '2nd Kings' -> '2kings')."""
+    parts = name.replace('.', ' ').lower().split()
+    if len(parts) > 1 and parts[0] in _ORDINALS:
+        parts[0] = _ORDINALS[parts[0]]
+    return ''.join(parts)
+
+
+def _build_book_table() -> Dict[str, int]:
+    table: Dict[str, int] = {}
+    for idx, name in enumerate(CANONICAL_BOOKS, start=1):
+        table[normalize_book_key(name)] = idx
+        table[normalize_book_key(OSIS_ABBREVS[idx - 1])] = idx
+        for alias in EXTRA_ALIASES.get(name, ()):
+            table[normalize_book_key(alias)] = idx
+    # Unambiguous prefixes of full names (what the client's startsWith() lookup accepted), min 3 chars
+    owners: Dict[str, set] = {}
+    for idx, name in enumerate(CANONICAL_BOOKS, start=1):
+        key = normalize_book_key(name)
+        for n in range(3, len(key)):
+            owners.setdefault(key[:n], set()).add(idx)
+    for prefix, idxs in owners.items():
+        if len(idxs) == 1 and prefix not in table:
+            table[prefix] = next(iter(idxs))
+    return table
+
+
+BOOK_TABLE = _build_book_table()
+SINGLE_CHAPTER_BOOKS = frozenset(BOOK_TABLE[k] for k in ('obad', 'phlm', '2john', '3john', 'jude'))
+_MAX_BOOK_WORDS = 5  # "The Revelation of John"
+
+
+def lookup_book(name: str) -> Optional[int]:
+    """Canonical 1-based book index for any known name / abbreviation (hashed, O(1))."""
+    return BOOK_TABLE.get(normalize_book_key(name))
+
+
+# ------------------ Parser ------------------
+
+_BRACKETS = re.compile(r'[()\[\]]')
+_TOKEN = re.compile(r'(?P<num>\d+)[a-z]?\b|(?P<word>[^\W\d_]+)\.?|(?P<punct>[:;,\-–—])')
+
+
+class ParsedRef(NamedTuple):
+    ranges: Tuple[VerseRange, ...]
+    unparsed: Tuple[str, ...]  # fragments ignored (free text, unknown words)
+
+
+def _tokens(ref: str) -> List[Tuple[str, str]]:
+    # Brackets start a new segment: "(Rom 1:17; Gal 3:11)" parses, "(recall)" is ignored as free text
+    out = []
+    for m in _TOKEN.finditer(_BRACKETS.sub(';', ref)):
+        kind = m.lastgroup
+        val = m.group(kind)
+        if kind == 'punct' and val in '–—':
+            val = '-'
+        out.append((kind, val))
+    return out
+
+
+def _match_book(toks: Sequence[Tuple[str, str]], i: int) -> Tuple[Optional[int], int]:
+    """Longest book name starting at token i -> (book, tokens consumed)."""
+    best: Tuple[Optional[int], int] = (None, 0)
+    words: List[str] = []
+    j = i
+    while j < len(toks) and len(words) < _MAX_BOOK_WORDS:
+        kind, val = toks[j]
+        if kind == 'num' and j == i and val in ('1', '2', '3'):
+            words.append(val)
+        elif kind == 'word':
+            words.append(val)
+        else:
+            break
+        j += 1
+        book = BOOK_TABLE.get(normalize_book_key(' '.join(words)))
+        if book is not None:
+            best = (book, j - i)
+    return best
+
+
+@lru_cache(maxsize=65536)
+def parse_ref(ref: str) -> ParsedRef:
+    """Compile a reference list into sorted-as-written verse-ID ranges (cached per string)."""
+    toks = _tokens(ref or '')
+    ranges: List[VerseRange] = []
+    unparsed: List[str] = []
+    book: Optional[int] = None
+    chapter: Optional[int] = None
+    verse_ctx = False       # last spec had a verse part -> ', N' continues with verses
+    book_pending = False    # book named but no chapter/verse spec yet -> whole book
+    skip_segment = False    # free text seen: ignore until next ';' or book reference
+    i, n = 0, len(toks)
+
+    def num_at(k: int) -> Optional[int]:
+        return int(toks[k][1]) if k < n and toks[k][0] == 'num' else None
+
+    def punct_at(k: int) -> Optional[str]:
+        return toks[k][1] if k < n and toks[k][0] == 'punct' else None
+
+    def flush_book():
+        nonlocal book_pending
+        if book_pending and book is not None:
+            ranges.append((verse_id(book, 1, 1), verse_id(book, WHOLE, WHOLE)))
+        book_pending = False
+
+    while i < n:
+        kind, val = toks[i]
+        if kind == 'punct' and val == ';':
+            flush_book()
+            skip_segment = False
+            verse_ctx = False
+            i += 1
+            continue
+        if skip_segment:
+            cand, used = _match_book(toks, i)
+            if cand is None or not (kind == 'word' or used > 1) or num_at(i + used) is None:
+                if kind == 'num':
+                    unparsed.append(val)
+                i += 1
+                continue
+            skip_segment = False  # "(cf. Rom 16:20)": a book reference ends the free text
+        if kind == 'punct':
+            if val == '-' and book_pending:
+                # Book range: "Ezra-Nehemiah"
+                other, used = _match_book(toks, i + 1)
+                if other is not None and other >= (book or 0):
+                    ranges.append((verse_id(book, 1, 1), verse_id(other, WHOLE, WHOLE)))
+                    book, book_pending, chapter = other, False, None
+                    i += 1 + used
+                    continue
+            i += 1
+            continue
+        # Book name (a leading 1/2/3 only counts if followed by a name)
+        cand, used = _match_book(toks, i)
+        if cand is not None and (kind == 'word' or used > 1):
+            if not (book_pending and cand == book):  # "Heb Heb 3:7" -> same book once
+                flush_book()
+            book, chapter, verse_ctx, book_pending = cand, None, False, True
+            i += used
+            continue
+        if kind == 'word':
+            # Free text ("applied", "prophesied by ...") ends this segment
+            unparsed.append(val)
+            flush_book()
+            skip_segment = True
+            i += 1
+            continue
+        # Numeric spec
+        if book is None:
+            unparsed.append(val)
+            i += 1
+            continue
+        a = int(val)
+        b = num_at(i + 2) if punct_at(i + 1) == ':' else None
+        if b is not None:
+            start_c, start_v, has_verse = a, b, True
+            i += 3
+        elif verse_ctx and chapter is not None:
+            start_c, start_v, has_verse = chapter, a, True
+            i += 1
+        elif book in SINGLE_CHAPTER_BOOKS and (a > 1 or punct_at(i + 1) == '-' and num_at(i + 2) is not None):
+            # "Jude 14" is verse 14 of the only chapter (a lone "Jude 1" stays the chapter)
+            start_c, start_v, has_verse = 1, a, True
+            i += 1
+        else:
+            start_c, start_v, has_verse = a, None, False
+            i += 1
+        end_c, end_v = start_c, start_v
+        if punct_at(i) == '-' and num_at(i + 1) is not None:
+            x = num_at(i + 1)
+            y = num_at(i + 3) if punct_at(i + 2) == ':' else None
+            if y is not None:
+                end_c, end_v = x, y
+                i += 4
+            elif has_verse:
+                end_v = x
+                i += 2
+            else:
+                end_c = x
+                i += 2
+        if has_verse and end_v is None:
+            end_v = WHOLE
+        start = verse_id(book, start_c, start_v if start_v is not None else 1)
+        end = verse_id(book, end_c, end_v if end_v is not None else WHOLE)
+        if end < start:
+            start, end = end, start
+        ranges.append((start, end))
+        book_pending = False
+        chapter = end_c
+        verse_ctx = has_verse
+    flush_book()
+    return ParsedRef(tuple(ranges), tuple(unparsed))
+
+
+def parse_ranges(ref: str) -> List[VerseRange]:
+    return list(parse_ref(ref).ranges)
+
+
+def split_ref_list(ref: str) -> List[str]:
+    """Top-level ';' segments with book carry-over made explicit ("John 6:14; 7:40" -> ["John 6:14", "John 7:40"])."""
+    out = []
+    for start, end in parse_ref(ref).ranges:
+        out.append(format_range(start, end))
+    return out
+
+
+def format_range(start: int, end: int) -> str:
+    b1, c1, v1 = unpack(start)
+    b2, c2, v2 = unpack(end)
+    name = OSIS_ABBREVS[b1 - 1]
+    if b1 != b2:
+        return f"{name}-{OSIS_ABBREVS[b2 - 1]}"
+    if c1 == 1 and v1 == 1 and c2 == WHOLE:
+        return name
+    if v1 == 1 and v2 == WHOLE:
+        return f"{name} {c1}" if c1 == c2 else f"{name} {c1}-{c2}"
+    if c1 == c2:
+        return f"{name} {c1}:{v1}" if v1 == v2 else f"{name} {c1}:{v1}-{'end' if v2 == WHOLE else v2}"
+    return f"{name} {c1}:{v1}-{c2}:{v2}"
+
+
+def ranges_overlap(a: Iterable[VerseRange], b: Iterable[VerseRange]) -> bool:
+    b = list(b)
+    return any(s1 <= e2 and s2 <= e1 for s1, e1 in a for s2, e2 in b)
+
+
+# ------------------ Sidecar index for prophecies.json ------------------
+
+REF_INDEX_SUFFIX = '.refs.json'
+
+
+def ref_index_path(json_path: str) -> str:
+    root, _ = os.path.splitext(json_path)
+    return root + REF_INDEX_SUFFIX
+
+
+def build_ref_index(entries: Iterable[dict]) -> List[dict]:
+    """Per entry (same order as prophecies.json): id plus compiled prophecy / fulfillment ranges."""
+    out = []
+    for e in entries:
+        fulfillment = e.get('fulfillment') or {}
+        out.append({
+            'id': e.get('id') or e.get('prophecyRef') or '',
+            'prophecy': [list(r) for r in parse_ref(e.get('prophecyRef') or '').ranges],
+            'fulfillment': [list(r) for r in parse_ref(fulfillment.get('biblicalRef') or '').ranges],
+        })
+    return out
+
+
+def render_ref_index(index: Sequence[dict]) -> str:
+    # One compact entry per line: small, diff-friendly, no runtime regex parsing needed by consumers
+    lines = [json.dumps(e, ensure_ascii=False, separators=(',', ':')) for e in index]
+    header = json.dumps({'encoding': 'book*1000000+chapter*1000+verse', 'whole': WHOLE, 'books': OSIS_ABBREVS}, separators=(',', ':'))
+    return '{"meta":' + header + ',\n"entries":[\n' + ',\n'.join(lines) + '\n]}\n'
+
+
+def write_ref_index(json_path: str, entries: Iterable[dict]) -> Tuple[str, bool]:
+    """Write <name>.refs.json next to json_path unless unchanged; returns (path, written)."""
+    path = ref_index_path(json_path)
+    text = render_ref_index(build_ref_index(entries))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return path, False
+    except OSError:
+        pass
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path, True
+
+
+# ------------------ CLI ------------------
+
+
+def _all_refs(json_path: str) -> List[str]:
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    refs = []
+    for e in data:
+        refs.append(e.get('prophecyRef') or '')
+        refs.append((e.get('fulfillment') or {}).get('biblicalRef') or '')
+    return refs
+
+
+def _bench(json_path: str, rounds: int):
+    refs = _all_refs(json_path)
+    parse_ref.cache_clear()
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for r in refs:
+            parse_ref.__wrapped__(r)
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for r in refs:
+            parse_ref(r)
+    warm = time.perf_counter() - t0
+    total = len(refs) * rounds
+    n_ranges = sum(len(parse_ref(r).ranges) for r in refs)
+    unparsed = sum(1 for r in refs if parse_ref(r).unparsed)
+    print(f"refs={len(refs)} ranges={n_ranges} with_free_text={unparsed} rounds={rounds}")
+    print(f"uncached: {total / cold:,.0f} refs/s ({cold / total * 1e6:.1f} us/ref)")
+    print(f"cached  : {total / warm:,.0f} refs/s ({warm / total * 1e6:.2f} us/ref)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bible reference parser / verse-ID index")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('parse', help='Parse reference strings and print ranges')
+    p.add_argument('refs', nargs='+')
+    p = sub.add_parser('index', help='Write <json>.refs.json sidecar')
+    p.add_argument('--json', required=True)
+    p = sub.add_parser('bench', help='Parser throughput over all refs in prophecies.json')
+    p.add_argument('--json', required=True)
+    p.add_argument('--rounds', type=int, default=200)
+    args = ap.parse_args()
+    if args.cmd == 'parse':
+        for r in args.refs:
+            parsed = parse_ref(r)
+            print(f"{r!r}: {[format_range(s, e) for s, e in parsed.ranges]}" + (f"  (ignored: {' '.join(parsed.unparsed)})" if parsed.unparsed else ''))
+    elif args.cmd == 'index':
+        with open(args.json, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        path, written = write_ref_index(args.json, entries)
+        print(f"{'Wrote' if written else 'Unchanged'} {path}")
+    elif args.cmd == 'bench':
+        _bench(args.json, args.rounds)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
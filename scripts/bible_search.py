@@ -0,0 +1,802 @@
+#!/usr/bin/env python3
+"""Prebuilt inverted full-text index and query engine for public/bibles/<abbr>.json.
+
+Matching follows buildSearchRegex / countMatches in BibleApp.jsx exactly:
+  * query punctuation is stripped with the same PUNCT_RE,
+  * a word is a maximal run of WORD_CLASS characters,
+  * a term matches a word it equals, starts (strictly) or ends (strictly),
+  * case-insensitive unless asked otherwise; modes all / any / phrase.
+
+Index modes (picked from the version's language in index.json, see index_mode_for):
+  word   words -> positional postings. All / any counts come straight from postings; phrase,
+         case-sensitive and non-WORD_CLASS terms are narrowed by postings, then confirmed.
+  ngram  for scriptio-continua versions (Chinese, Japanese, Korean, ...): every character
+         1..N-gram of the folded verse -> verse IDs. A query's overlapping N-grams intersect
+         to a candidate set that is then confirmed against the verse text.
+Confirmation uses count_occurrences(), which counts exactly what the client's regex counts; verse
+text comes from <abbr>/corpus.bin (bible_corpus.py) when it is up to date, else from the JSON.
+
+Index layout (written to public/bibles/<abbr>/, next to splitBibles.js output):
+  search-index.json   {"format", "mode", "ngram", "books", "verses", "vocab": [sorted keys], "offsets": [...]}
+  search-postings.bin per key (vocab order, byte range offsets[i]:offsets[i+1])
+                      word : unsigned LEB128 varints doc_count, then per verse: verse_id delta, tf, tf x position delta
+                      ngram: little-endian uint32 verse IDs (fixed width so they are used without decoding)
+  search-index.bin    optional (--mmap): header, vocab and postings in one file; BibleSearch maps it
+                      and reads offsets / keys / postings through memoryviews, no JSON parse at load.
+Verse IDs use bible_refs packing (book * 1_000_000 + chapter * 1_000 + verse, book = file order).
+
+Usage:
+  python bible_search.py build --bibles ../public/bibles                 # every <abbr>.json
+  python bible_search.py build --bible ../public/bibles/zh_ncv.json --mmap
+  python bible_search.py query --bible ../public/bibles/fi_pr.json "Jumala loi" --mode phrase
+  python bible_search.py bench --bible ../public/bibles/fi_pr.json
+"""
+from __future__ import annotations
+import argparse
+import bisect
+import json
+import os
+import random
+import mmap
+import re
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from bible_corpus import Corpus, corpus_path_for
+from bible_refs import unpack, verse_id
+
+WORD_CLASS = ('A-Za-z0-9_\u00C0-\u02AF\u0370-\u03FF\u0400-\u04FF\u0590-\u05FF\u0600-\u06FF'
+              '\u0900-\u097F\u3040-\u30FF\u3400-\u4DBF\u4E00-\u9FFF')
+PUNCT_RE = re.compile(r'[.,;:*!?"\'“”‘’`´()\[\]{}<>/\\\-]+')
+WORD_RE = re.compile(f'[{WORD_CLASS}]+')
+_ALL_WORD = re.compile(f'[{WORD_CLASS}]+\\Z')
+_WORD_CHAR = re.compile(f'[{WORD_CLASS}]')
+MAX_SEARCH_RESULTS = 5000  # same cap as the client
+
+INDEX_FORMAT = 1
+INDEX_JSON = 'search-index.json'
+POSTINGS_BIN = 'search-postings.bin'
+INDEX_MMAP = 'search-index.bin'
+SKIP_FILES = {'index.json', 'report.json', 'split-report.json'}
+INDEX_MODES = ('word', 'ngram')
+NGRAM_N = 2
+# Languages written without spaces between words, or in scripts outside WORD_CLASS (Hangul, Thai, ...)
+SCRIPTIO_CONTINUA = {'Chinese', 'Japanese', 'Korean', 'Thai', 'Lao', 'Khmer', 'Burmese', 'Tibetan'}
+_MMAP_MAGIC = b'BSIX'
+_MMAP_HEAD = struct.Struct('<4sHHIIII12Q')  # magic, format, mode, ngram, verses, books, keys, 6 x (offset, length)
+
+
+def sanitize(s: str) -> str:
+    return PUNCT_RE.sub('', s)
+
+
+_FOLD: Dict[str, str] = {}
+
+
+def fold(s: str) -> str:
+    """Length-preserving simple case fold (what a JS /u + /i regex compares)."""
+    if s.isascii():
+        return s.lower()
+    out = []
+    for c in s:
+        f = _FOLD.get(c)
+        if f is None:
+            f = c.casefold()
+            if len(f) != 1:
+                f = c.lower() if len(c.lower()) == 1 else c
+            _FOLD[c] = f
+        out.append(f)
+    return ''.join(out)
+
+
+def load_bible(path: str) -> List[dict]:
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        books = json.load(f)
+    if not isinstance(books, list):
+        raise ValueError(f"{path}: top-level is not a list of books")
+    return books
+
+
+def iter_verses(books: Sequence[dict]) -> Iterator[Tuple[int, str]]:
+    for b, book in enumerate(books, start=1):
+        for c, chapter in enumerate(book.get('chapters') or [], start=1):
+            for v, text in enumerate(chapter, start=1):
+                yield verse_id(b, c, v), text if isinstance(text, str) else str(text or '')
+
+
+# ------------------ Varints ------------------
+
+
+def _put_varint(out: bytearray, n: int):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varints(data: bytes) -> List[int]:
+    vals = []
+    n = shift = 0
+    for byte in data:
+        n |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            vals.append(n)
+            n = shift = 0
+    return vals
+
+
+def _u32_bytes(values: Iterable[int]) -> bytes:
+    a = array('I', values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+
+def _u32_view(buf, start: int, end: int) -> Sequence[int]:
+    """uint32 little-endian values in buf[start:end] (zero-copy on little-endian hosts)."""
+    if sys.byteorder == 'little':
+        return memoryview(buf)[start:end].cast('I')
+    a = array('I', bytes(buf[start:end]))
+    a.byteswap()
+    return a
+
+
+# ------------------ Build ------------------
+
+
+def index_mode_for(bible_path: str, books: Optional[Sequence[dict]] = None) -> str:
+    """'ngram' for scriptio-continua versions, else 'word'.
+
+    Uses the language listed for <abbr> in the sibling index.json; versions not listed there
+    fall back to the share of spaces in the first verses.
+    """
+    abbr = os.path.splitext(os.path.basename(bible_path))[0]
+    try:
+        with open(os.path.join(os.path.dirname(bible_path), 'index.json'), 'r', encoding='utf-8-sig') as f:
+            languages = json.load(f)
+        for lang in languages:
+            if any(v.get('abbreviation') == abbr for v in lang.get('versions') or []):
+                return 'ngram' if lang.get('language') in SCRIPTIO_CONTINUA else 'word'
+    except (OSError, ValueError, AttributeError):
+        pass
+    sample = ''.join(text for _, (_, text) in zip(range(2000), iter_verses(books or load_bible(bible_path))))
+    return 'ngram' if sample and sample.count(' ') / len(sample) < 0.02 else 'word'
+
+
+def _ngrams(text: str, n: int) -> Iterator[str]:
+    for k in range(1, n + 1):
+        for i in range(len(text) - k + 1):
+            yield text[i:i + k]
+
+
+def query_grams(term: str, n: int) -> List[str]:
+    """Keys whose verse sets intersect to the candidates for a folded term."""
+    if len(term) <= n:
+        return [term]
+    return list(dict.fromkeys(term[i:i + n] for i in range(len(term) - n + 1)))
+
+
+def _build_ngram(books: Sequence[dict], n: int) -> Tuple[List[str], bytes, List[int], int]:
+    grams: Dict[str, List[int]] = {}
+    verses = 0
+    for vid, text in iter_verses(books):
+        verses += 1
+        for g in set(_ngrams(fold(text), n)):
+            grams.setdefault(g, []).append(vid)
+    vocab = sorted(grams)
+    out = bytearray()
+    offsets = []
+    for g in vocab:
+        offsets.append(len(out))
+        out += _u32_bytes(grams[g])
+    offsets.append(len(out))
+    return vocab, bytes(out), offsets, verses
+
+
+def build_index(books: Sequence[dict], mode: str = 'word', ngram: int = NGRAM_N) -> Tuple[dict, bytes]:
+    """Return (header dict, postings bytes) for one bible."""
+    if mode == 'ngram':
+        vocab, blob, offsets, verses = _build_ngram(books, ngram)
+        header = {'format': INDEX_FORMAT, 'mode': mode, 'ngram': ngram, 'books': [b.get('name') or '' for b in books],
+                  'verses': verses, 'vocab': vocab, 'offsets': offsets}
+        return header, blob
+    postings: Dict[str, List[Tuple[int, List[int]]]] = {}
+    verses = 0
+    for vid, text in iter_verses(books):
+        verses += 1
+        local: Dict[str, List[int]] = {}
+        for pos, m in enumerate(WORD_RE.finditer(text)):
+            local.setdefault(fold(m.group()), []).append(pos)
+        for word, positions in local.items():
+            postings.setdefault(word, []).append((vid, positions))
+    vocab = sorted(postings)
+    out = bytearray()
+    offsets = []
+    for word in vocab:
+        offsets.append(len(out))
+        docs = postings[word]
+        _put_varint(out, len(docs))
+        prev_vid = 0
+        for vid, positions in docs:
+            _put_varint(out, vid - prev_vid)
+            prev_vid = vid
+            _put_varint(out, len(positions))
+            prev_pos = 0
+            for p in positions:
+                _put_varint(out, p - prev_pos)
+                prev_pos = p
+    offsets.append(len(out))
+    header = {
+        'format': INDEX_FORMAT,
+        'mode': mode,
+        'ngram': 0,
+        'books': [b.get('name') or '' for b in books],
+        'verses': verses,
+        'vocab': vocab,
+        'offsets': offsets,
+    }
+    return header, bytes(out)
+
+
+def index_dir_for(bible_path: str) -> str:
+    root, _ = os.path.splitext(bible_path)
+    return root
+
+
+def _reverse_order(vocab: Sequence[str]) -> List[int]:
+    return sorted(range(len(vocab)), key=lambda i: vocab[i][::-1])
+
+
+def pack_mmap(header: dict, blob: bytes) -> bytes:
+    """Single-file layout: fixed header, then 8-byte aligned sections."""
+    vocab = header['vocab']
+    encoded = [w.encode('utf-8') for w in vocab]
+    key_offsets = [0]
+    for w in encoded:
+        key_offsets.append(key_offsets[-1] + len(w))
+    sections = [
+        '\n'.join(header['books']).encode('utf-8'),
+        _u32_bytes(key_offsets),
+        b''.join(encoded),
+        _u32_bytes(_reverse_order(vocab) if header['mode'] == 'word' else []),
+        _u32_bytes(header['offsets']),
+        blob,
+    ]
+    table = []
+    pos = _MMAP_HEAD.size
+    for data in sections:
+        pos += -pos % 8
+        table += [pos, len(data)]
+        pos += len(data)
+    out = bytearray(_MMAP_HEAD.pack(_MMAP_MAGIC, INDEX_FORMAT, INDEX_MODES.index(header['mode']), header['ngram'],
+                                    header['verses'], len(header['books']), len(vocab), *table))
+    for data, start in zip(sections, table[::2]):
+        out += b'\0' * (start - len(out))
+        out += data
+    return bytes(out)
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_index(bible_path: str, out_dir: Optional[str] = None, mode: str = 'auto', ngram: int = NGRAM_N,
+                mmap_layout: bool = False, books: Optional[Sequence[dict]] = None) -> Tuple[str, dict, int]:
+    """Index bible_path (or the already loaded books for it) into out_dir (default public/bibles/<abbr>/)."""
+    out_dir = out_dir or index_dir_for(bible_path)
+    if books is None:
+        books = load_bible(bible_path)
+    if mode == 'auto':
+        mode = index_mode_for(bible_path, books)
+    header, blob = build_index(books, mode, ngram)
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, POSTINGS_BIN), blob)
+    _write_atomic(os.path.join(out_dir, INDEX_JSON), json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    mmap_path = os.path.join(out_dir, INDEX_MMAP)
+    if mmap_layout:
+        _write_atomic(mmap_path, pack_mmap(header, blob))
+    elif os.path.exists(mmap_path):
+        os.remove(mmap_path)  # never leave a stale single-file index next to a fresh JSON one
+    return out_dir, header, len(blob)
+
+
+# ------------------ Query engine ------------------
+
+
+class _PackedStrings(Sequence):
+    """Sorted UTF-8 keys inside the mapped file, decoded on access (bisect-able)."""
+
+    def __init__(self, buf, offsets: Sequence[int], base: int):
+        self.buf = buf
+        self.offsets = offsets
+        self.base = base
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.buf[self.base + self.offsets[i]:self.base + self.offsets[i + 1]], 'utf-8')
+
+
+class _ReversedKeys(Sequence):
+    def __init__(self, vocab: Sequence[str], order: Sequence[int]):
+        self.vocab = vocab
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.vocab[self.order[i]][::-1]
+
+
+class SearchResult(NamedTuple):
+    rows: List[Tuple[int, int]]          # (verse_id, count) in canonical order
+    total: int
+    per_book: Dict[str, int]             # keyed like the client: book name
+    per_chapter: Dict[str, int]          # "<book name> <chapter>"
+    exceeded: bool
+
+
+def _edge_count(word: str, term: str) -> int:
+    """Matches of term inside one folded word under the client's prefix / suffix / whole-word rule."""
+    k = len(term)
+    starts = word.startswith(term)
+    ends = word.endswith(term)
+    if starts and ends:
+        return 2 if len(word) - k >= k else 1
+    return 1 if (starts or ends) else 0
+
+
+def client_regex(term: str, case_sensitive: bool) -> 're.Pattern':
+    """Python port of tokenPattern() from BibleApp.jsx."""
+    w = f'[{WORD_CLASS}]'
+    # Case-insensitivity scoped to the term: case-expanding the big word class costs ~50 ms per compile
+    e = re.escape(term) if case_sensitive else f'(?i:{re.escape(term)})'
+    return re.compile(f'(?:(?<!{w}){e}(?={w})|(?<={w}){e}(?!{w})|(?<!{w}){e}(?!{w}))')
+
+
+def count_occurrences(text: str, term: str, case_sensitive: bool = False) -> int:
+    """len(text.match(tokenPattern(term))) without compiling a regex.
+
+    The three alternatives of tokenPattern reduce to "not preceded AND followed by a
+    word character"; matches are counted left to right without overlap like /g.
+    """
+    if not case_sensitive:
+        text, term = fold(text), fold(term)
+    k = len(term)
+    n = 0
+    i = text.find(term)
+    while i >= 0:
+        before = i > 0 and _WORD_CHAR.match(text, i - 1) is not None
+        after = _WORD_CHAR.match(text, i + k) is not None
+        if before and after:
+            i = text.find(term, i + 1)
+        else:
+            n += 1
+            i = text.find(term, i + k)
+    return n
+
+
+def parse_query(query: str, mode: str) -> List[str]:
+    """Terms as the client derives them ([] = no search)."""
+    if not query.strip():
+        return []
+    if mode == 'phrase':
+        core = sanitize(query.strip())
+        return [core] if core else []
+    return [w for w in (sanitize(x.strip()) for x in query.split()) if w]
+
+
+class BibleSearch:
+    """Query engine over a prebuilt index (texts are loaded only for confirmation).
+
+    Open with BibleSearch.for_bible(path) / BibleSearch.load(index_dir): the single-file
+    mmap layout is preferred when present, otherwise search-index.json + search-postings.bin.
+    """
+
+    def __init__(self, mode: str, ngram: int, books: List[str], verses: int, vocab: Sequence[str],
+                 offsets: Sequence[int], blob, rev_order: Optional[Sequence[int]] = None,
+                 bible_path: Optional[str] = None):
+        if mode not in INDEX_MODES:
+            raise ValueError(f"unknown index mode {mode!r}")
+        self.mode = mode
+        self.ngram = ngram
+        self.books = books
+        self.verses = verses
+        self.vocab = vocab
+        self.offsets = offsets
+        self.blob = blob
+        if mode == 'word':
+            order = rev_order if rev_order is not None and len(rev_order) else _reverse_order(vocab)
+            self._rev_keys = _ReversedKeys(vocab, order)
+        self._cache: Dict[int, List[Tuple[int, Tuple[int, ...]]]] = {}
+        self.bible_path = bible_path
+        self._texts: Optional[List[dict]] = None
+        self.corpus: Optional[Corpus] = None
+        corpus_path = corpus_path_for(bible_path) if bible_path else ''
+        # corpus.bin (bible_corpus.py) serves confirmation reads without parsing the JSON, unless it is stale
+        if corpus_path and os.path.exists(corpus_path) and os.path.getmtime(corpus_path) >= os.path.getmtime(bible_path):
+            self.corpus = Corpus(corpus_path)
+
+    @classmethod
+    def from_json(cls, index_dir: str, bible_path: Optional[str] = None) -> 'BibleSearch':
+        with open(os.path.join(index_dir, INDEX_JSON), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get('format') != INDEX_FORMAT:
+            raise ValueError(f"{index_dir}: unsupported index format {header.get('format')}")
+        with open(os.path.join(index_dir, POSTINGS_BIN), 'rb') as f:
+            blob = f.read()
+        return cls(header.get('mode', 'word'), header.get('ngram', 0), header['books'], header['verses'],
+                   header['vocab'], header['offsets'], blob, bible_path=bible_path)
+
+    @classmethod
+    def from_mmap(cls, path: str, bible_path: Optional[str] = None) -> 'BibleSearch':
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, mode, ngram, verses, _, n_keys, *table = _MMAP_HEAD.unpack_from(mm, 0)
+        if magic != _MMAP_MAGIC or fmt != INDEX_FORMAT:
+            raise ValueError(f"{path}: not a format {INDEX_FORMAT} search index")
+        sec = [(table[i], table[i] + table[i + 1]) for i in range(0, len(table), 2)]
+        books = str(mm[sec[0][0]:sec[0][1]], 'utf-8').split('\n')
+        key_offsets = _u32_view(mm, *sec[1])
+        vocab = _PackedStrings(mm, key_offsets, sec[2][0])
+        rev_order = _u32_view(mm, *sec[3])
+        offsets = _u32_view(mm, *sec[4])
+        blob = memoryview(mm)[sec[5][0]:sec[5][1]]
+        return cls(INDEX_MODES[mode], ngram, books, verses, vocab, offsets, blob, rev_order, bible_path)
+
+    @classmethod
+    def load(cls, index_dir: str, bible_path: Optional[str] = None, layout: str = 'auto') -> 'BibleSearch':
+        mmap_path = os.path.join(index_dir, INDEX_MMAP)
+        if layout == 'mmap' or (layout == 'auto' and os.path.exists(mmap_path)):
+            return cls.from_mmap(mmap_path, bible_path)
+        return cls.from_json(index_dir, bible_path)
+
+    @classmethod
+    def for_bible(cls, bible_path: str, layout: str = 'auto') -> 'BibleSearch':
+        return cls.load(index_dir_for(bible_path), bible_path, layout)
+
+    # -- postings --
+
+    def find(self, key: str) -> Optional[int]:
+        i = bisect.bisect_left(self.vocab, key)
+        return i if i < len(self.vocab) and self.vocab[i] == key else None
+
+    def verse_ids(self, key_id: int) -> Sequence[int]:
+        """ngram mode: verse IDs containing the key (a view into the postings blob)."""
+        return _u32_view(self.blob, self.offsets[key_id], self.offsets[key_id + 1])
+
+    def ngram_candidates(self, term: str) -> set:
+        """Verses containing every N-gram of the (folded) term: superset of the real matches."""
+        lists = []
+        for g in query_grams(fold(term), self.ngram):
+            kid = self.find(g)
+            if kid is None:
+                return set()
+            lists.append(self.verse_ids(kid))
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for ids in lists[1:]:
+            candidates.intersection_update(ids)
+            if not candidates:
+                break
+        return candidates
+
+    def postings(self, word_id: int) -> List[Tuple[int, Tuple[int, ...]]]:
+        cached = self._cache.get(word_id)
+        if cached is not None:
+            return cached
+        vals = _read_varints(bytes(self.blob[self.offsets[word_id]:self.offsets[word_id + 1]]))
+        docs = []
+        i = 1
+        vid = 0
+        for _ in range(vals[0]):
+            vid += vals[i]
+            tf = vals[i + 1]
+            i += 2
+            pos = 0
+            positions = []
+            for p in vals[i:i + tf]:
+                pos += p
+                positions.append(pos)
+            i += tf
+            docs.append((vid, tuple(positions)))
+        self._cache[word_id] = docs
+        return docs
+
+    def _prefixed(self, term: str) -> Iterator[int]:
+        i = bisect.bisect_left(self.vocab, term)
+        while i < len(self.vocab) and self.vocab[i].startswith(term):
+            yield i
+            i += 1
+
+    def _suffixed(self, term: str) -> Iterator[int]:
+        rterm = term[::-1]
+        keys = self._rev_keys
+        i = bisect.bisect_left(keys, rterm)
+        while i < len(keys) and keys[i].startswith(rterm):
+            yield keys.order[i]
+            i += 1
+
+    def edge_words(self, term: str) -> Dict[int, int]:
+        """word_id -> matches per occurrence for a folded all-WORD_CLASS term."""
+        out = {}
+        for wid in self._prefixed(term):
+            out[wid] = _edge_count(self.vocab[wid], term)
+        for wid in self._suffixed(term):
+            if wid not in out:
+                out[wid] = _edge_count(self.vocab[wid], term)
+        return out
+
+    def term_counts(self, term: str) -> Optional[Dict[int, int]]:
+        """verse_id -> case-insensitive match count, or None if the term cannot be answered from the index."""
+        folded = fold(term)
+        if not _ALL_WORD.match(folded):
+            return None
+        counts: Dict[int, int] = {}
+        for wid, per in self.edge_words(folded).items():
+            for vid, positions in self.postings(wid):
+                counts[vid] = counts.get(vid, 0) + per * len(positions)
+        return counts
+
+    def phrase_candidates(self, parts: Sequence[str]) -> Optional[set]:
+        """Verses where the phrase words appear at consecutive positions (superset of real matches)."""
+        folded = [fold(p) for p in parts]
+        if not all(_ALL_WORD.match(p) for p in folded):
+            return None
+        live: Dict[int, set] = {}
+        last = len(folded) - 1
+        for i, part in enumerate(folded):
+            if i == 0:
+                ids = [w for w in self._suffixed(part)]
+            elif i == last:
+                ids = list(self._prefixed(part))
+            else:
+                wid = self.find(part)
+                ids = [] if wid is None else [wid]
+            hits: Dict[int, set] = {}
+            for wid in ids:
+                for vid, positions in self.postings(wid):
+                    if i == 0:
+                        hits.setdefault(vid, set()).update(positions)
+                    elif vid in live:
+                        want = live[vid]
+                        got = {p for p in positions if p - i in want}
+                        if got:
+                            hits.setdefault(vid, set()).update(p - i for p in got)
+            live = hits
+            if not live:
+                break
+        return set(live)
+
+    # -- verification --
+
+    def text(self, vid: int) -> str:
+        if self.corpus is not None:
+            return self.corpus.verse_by_id(vid)
+        if self._texts is None:
+            if not self.bible_path:
+                raise ValueError("bible_path needed to confirm this query against verse text")
+            self._texts = load_bible(self.bible_path)
+        b, c, v = unpack(vid)
+        return self._texts[b - 1]['chapters'][c - 1][v - 1]
+
+    def _all_vids(self) -> Iterator[int]:
+        if self.corpus is not None:
+            for vid, _ in self.corpus.iter_verses():
+                yield vid
+            return
+        if self._texts is None:
+            self.text(verse_id(1, 1, 1))
+        for vid, _ in iter_verses(self._texts):
+            yield vid
+
+    def _confirm(self, term: str, case_sensitive: bool, candidates: Optional[Iterable[int]]) -> Dict[int, int]:
+        out = {}
+        for vid in (self._all_vids() if candidates is None else sorted(candidates)):
+            n = count_occurrences(self.text(vid), term, case_sensitive)
+            if n:
+                out[vid] = n
+        return out
+
+    def counts_for(self, term: str, case_sensitive: bool = False, phrase: bool = False) -> Dict[int, int]:
+        if self.mode == 'ngram':
+            return self._confirm(term, case_sensitive, self.ngram_candidates(term))
+        parts = term.split() if phrase else [term]
+        if len(parts) > 1:
+            return self._confirm(term, case_sensitive, self.phrase_candidates(parts))
+        counts = self.term_counts(term)
+        if counts is None or case_sensitive:
+            return self._confirm(term, case_sensitive, None if counts is None else counts.keys())
+        return counts
+
+    def search(self, query: str, mode: str = 'all', case_sensitive: bool = False, book: Optional[int] = None,
+               chapters: Optional[Tuple[int, int]] = None, max_rows: Optional[int] = MAX_SEARCH_RESULTS) -> SearchResult:
+        """All / any / phrase search; book (1-based) and chapters (inclusive) mirror the client's book scope."""
+        terms = parse_query(query, mode)
+        if not terms:
+            return SearchResult([], 0, {}, {}, False)
+        per_term = [self.counts_for(t, case_sensitive, phrase=(mode == 'phrase')) for t in terms]
+        if mode == 'all':
+            vids = set(per_term[0]).intersection(*per_term[1:])
+        else:
+            vids = set().union(*per_term)
+        rows = []
+        total = 0
+        per_book: Dict[str, int] = {}
+        per_chapter: Dict[str, int] = {}
+        for vid in sorted(vids):
+            b, c, _ = unpack(vid)
+            if book is not None and b != book:
+                continue
+            if chapters is not None and not (chapters[0] <= c <= chapters[1]):
+                continue
+            n = sum(pt.get(vid, 0) for pt in per_term)
+            rows.append((vid, n))
+            total += n
+            name = self.books[b - 1]
+            per_book[name] = per_book.get(name, 0) + n
+            key = f"{name} {c}"
+            per_chapter[key] = per_chapter.get(key, 0) + n
+        if max_rows is not None and len(rows) > max_rows:
+            return SearchResult([], total, {}, {}, True)
+        return SearchResult(rows, total, per_book, per_chapter, False)
+
+
+def linear_search(books: Sequence[dict], query: str, mode: str = 'all', case_sensitive: bool = False) -> Dict[int, int]:
+    """Baseline: the client's per-verse regex scan (verse_id -> count)."""
+    terms = parse_query(query, mode)
+    if not terms:
+        return {}
+    regexes = [client_regex(t, case_sensitive) for t in terms]
+    out = {}
+    for vid, text in iter_verses(books):
+        hits = [len(r.findall(text)) for r in regexes]
+        matched = all(hits) if mode == 'all' else any(hits)
+        if matched:
+            out[vid] = sum(hits)
+    return out
+
+
+# ------------------ CLI ------------------
+
+
+def _bible_files(folder: str) -> List[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.json') and f not in SKIP_FILES)
+
+
+def _bench_queries(engine: BibleSearch, books: Sequence[dict], n: int, seed: int) -> List[Tuple[str, str]]:
+    rnd = random.Random(seed)
+    verses = [text for _, text in iter_verses(books)]
+    queries = []
+    if engine.mode == 'ngram':
+        # 2-4 character substrings of real verses, plus a phrase across a word boundary
+        while len(queries) < n * 4:
+            runs = [r for r in WORD_RE.findall(rnd.choice(verses)) if len(r) >= 4]
+            if runs:
+                run = rnd.choice(runs)
+                k = rnd.randint(2, 4)
+                start = rnd.randrange(len(run) - k + 1)
+                queries.append((run[start:start + k], 'any'))
+        return queries
+    by_df = sorted(range(len(engine.vocab)), key=lambda i: engine.offsets[i + 1] - engine.offsets[i])
+    pick = lambda lo, hi: engine.vocab[by_df[rnd.randrange(int(lo * len(by_df)), int(hi * len(by_df)))]]
+    for _ in range(n):
+        queries.append((pick(0.99, 1.0), 'any'))                          # frequent word
+        queries.append((f"{pick(0.5, 0.9)} {pick(0.9, 1.0)}", 'all'))     # two words
+        queries.append((pick(0.0, 0.5)[:4], 'any'))                       # short prefix / rare stem
+        words = WORD_RE.findall(rnd.choice(verses))
+        if len(words) >= 3:
+            k = rnd.randrange(len(words) - 2)
+            queries.append((' '.join(words[k:k + 2]), 'phrase'))
+    return queries
+
+
+def _timed_load(bible_path: str, layout: str) -> Tuple[float, BibleSearch]:
+    t0 = time.perf_counter()
+    engine = BibleSearch.for_bible(bible_path, layout)
+    return time.perf_counter() - t0, engine
+
+
+def _bench(bible_path: str, n: int, seed: int, mode: str):
+    books = load_bible(bible_path)
+    index_dir = index_dir_for(bible_path)
+    current = None
+    if os.path.exists(os.path.join(index_dir, INDEX_JSON)):
+        with open(os.path.join(index_dir, INDEX_JSON), 'r', encoding='utf-8') as f:
+            current = json.load(f).get('mode', 'word')
+    wanted = index_mode_for(bible_path, books) if mode == 'auto' else mode
+    if current != wanted or not os.path.exists(os.path.join(index_dir, INDEX_MMAP)):
+        write_index(bible_path, mode=wanted, mmap_layout=True)
+    load_json, engine = _timed_load(bible_path, 'json')
+    load_mmap, engine = _timed_load(bible_path, 'mmap')
+    engine._texts = books
+    queries = _bench_queries(engine, books, n, seed)
+    rows = []
+    for q, qmode in queries:
+        engine._cache.clear()
+        t_cand = None
+        if engine.mode == 'ngram':
+            t0 = time.perf_counter()
+            engine.ngram_candidates(q)
+            t_cand = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        res = engine.search(q, qmode, max_rows=None)
+        t_idx = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        base = linear_search(books, q, qmode)
+        t_lin = time.perf_counter() - t0
+        got = dict(res.rows)
+        if got != base:
+            raise SystemExit(f"MISMATCH for {q!r} ({qmode}): index {len(got)} verses vs scan {len(base)}")
+        rows.append((q, qmode, len(got), res.total, t_cand, t_idx, t_lin))
+    print(f"{os.path.basename(bible_path)}: {engine.verses} verses, {engine.mode} index, {len(engine.vocab)} keys; "
+          f"load json {load_json * 1000:.0f} ms, mmap {load_mmap * 1000:.1f} ms")
+    print(f"{'query':<32} {'mode':<7} {'verses':>7} {'hits':>7} {'cand ms':>8} {'index ms':>9} {'scan ms':>9} {'speedup':>8}")
+    for q, qmode, nv, total, tc, ti, tl in rows:
+        cand = '-' if tc is None else f"{tc * 1000:.3f}"
+        print(f"{q[:32]:<32} {qmode:<7} {nv:>7} {total:>7} {cand:>8} {ti * 1000:>9.2f} {tl * 1000:>9.1f} {tl / max(ti, 1e-9):>7.0f}x")
+    med = lambda xs: sorted(xs)[len(xs) // 2] * 1000
+    cand = [r[4] for r in rows if r[4] is not None]
+    print(f"median: {'candidates %.3f ms, ' % med(cand) if cand else ''}index {med([r[5] for r in rows]):.2f} ms, "
+          f"scan {med([r[6] for r in rows]):.1f} ms (all results identical)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inverted full-text index for public/bibles")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help='Build public/bibles/<abbr>/search-index.json + search-postings.bin (+ search-index.bin)')
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument('--bible', help='One bible JSON file')
+    g.add_argument('--bibles', help='Folder with <abbr>.json files')
+    p.add_argument('--mode', choices=('auto',) + INDEX_MODES, default='auto', help='auto: ngram for scriptio-continua languages in index.json')
+    p.add_argument('--ngram', type=int, default=NGRAM_N, help='ngram mode: index 1..N character grams')
+    p.add_argument('--mmap', action='store_true', help=f'Also write the single-file {INDEX_MMAP} layout (loads without JSON parsing)')
+    p = sub.add_parser('query', help='Run one query against a built index')
+    p.add_argument('--bible', required=True)
+    p.add_argument('query')
+    p.add_argument('--mode', choices=['all', 'any', 'phrase'], default='all')
+    p.add_argument('--case-sensitive', action='store_true')
+    p.add_argument('--limit', type=int, default=20, help='Rows to print')
+    p = sub.add_parser('bench', help='Index vs linear regex scan latency (results cross-checked)')
+    p.add_argument('--bible', required=True)
+    p.add_argument('--queries', type=int, default=5, help='Query groups (4 queries each)')
+    p.add_argument('--seed', type=int, default=1)
+    p.add_argument('--mode', choices=('auto',) + INDEX_MODES, default='auto', help='Index mode to benchmark (rebuilt if different)')
+    args = ap.parse_args()
+
+    if args.cmd == 'build':
+        for path in ([args.bible] if args.bible else _bible_files(args.bibles)):
+            t0 = time.perf_counter()
+            try:
+                out_dir, header, size = write_index(path, mode=args.mode, ngram=args.ngram, mmap_layout=args.mmap)
+            except (OSError, ValueError) as e:
+                print(f"ERROR: {path}: {e}", file=sys.stderr)
+                continue
+            print(f"{path} -> {out_dir} ({header['mode']}, {header['verses']} verses, {len(header['vocab'])} keys, postings {size / 1024:.0f} KiB, {time.perf_counter() - t0:.1f}s)")
+    elif args.cmd == 'query':
+        engine = BibleSearch.for_bible(args.bible)
+        t0 = time.perf_counter()
+        res = engine.search(args.query, args.mode, args.case_sensitive)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{res.total} matches in {len(res.rows)} verses ({ms:.1f} ms){' – exceeded limit' if res.exceeded else ''}")
+        for name, n in res.per_book.items():
+            print(f"  {name}: {n}")
+        for vid, n in res.rows[:args.limit]:
+            b, c, v = unpack(vid)
+            print(f"{engine.books[b - 1]} {c}:{v} ({n}) {engine.text(vid)}")
+    elif args.cmd == 'bench':
+        _bench(args.bible, args.queries, args.seed, args.mode)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Byte-range shards: one minified file per version plus a book / chapter offset manifest.
+
+The client fetches the whole <abbr>.json (3-4 MB) before it can render anything. Here each
+version is written once as minified JSON (public/bibles/<abbr>/bible.min.json) laid out so
+that every book object and every chapter array is itself a valid JSON value at a known byte
+range; the whole file is still the plain [{name, abbrev, chapters}] array. The manifest
+(public/bibles/<abbr>/shards.json) records those ranges:
+
+  {"format": 1, "file": "bible.min.json", "size": N, "sha256": "...",
+   "books": [{"name", "abbrev", "offset", "length", "chapters": [[offset, length], ...]}, ...]}
+
+ShardReader opens a version from a directory or an http(s) base URL and reads only the range
+it needs (Range requests over HTTP), so opening a chapter costs the manifest plus that chapter.
+
+Usage:
+  python bible_shards.py build --bibles ../public/bibles
+  python bible_shards.py get --dir ../public/bibles/fi_pr John 3
+  python bible_shards.py bench --bible ../public/bibles/fi_pr.json
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from typing import List, Optional, Sequence, Tuple
+
+from bible_corpus import load_books
+from bible_refs import lookup_book
+
+SHARD_FORMAT = 1
+SHARD_FILE = 'bible.min.json'
+MANIFEST_FILE = 'shards.json'
+SKIP_FILES = {'index.json', 'report.json', 'split-report.json', 'build-manifest.json', 'build-report.json'}
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def pack_shards(books: Sequence[dict]) -> Tuple[bytes, List[dict]]:
+    """Minified bible bytes and per-book / per-chapter byte ranges into them."""
+    out = bytearray(b'[')
+    entries = []
+    for i, book in enumerate(books):
+        if i:
+            out += b','
+        start = len(out)
+        name = book.get('name') or ''
+        abbrev = book.get('abbrev') or ''
+        out += b'{"name":' + _dumps(name) + b',"abbrev":' + _dumps(abbrev) + b',"chapters":['
+        chapters = []
+        for j, chapter in enumerate(book.get('chapters') or []):
+            if j:
+                out += b','
+            data = _dumps(list(chapter))
+            chapters.append([len(out), len(data)])
+            out += data
+        out += b']}'
+        entries.append({'name': name, 'abbrev': abbrev, 'offset': start, 'length': len(out) - start, 'chapters': chapters})
+    out += b']'
+    return bytes(out), entries
+
+
+def write_shards(source: str, out_dir: Optional[str] = None, books: Optional[Sequence[dict]] = None) -> Tuple[str, int]:
+    out_dir = out_dir or os.path.splitext(source)[0]
+    data, entries = pack_shards(load_books(source) if books is None else books)
+    manifest = {'format': SHARD_FORMAT, 'file': SHARD_FILE, 'size': len(data),
+                'sha256': hashlib.sha256(data).hexdigest(), 'books': entries}
+    os.makedirs(out_dir, exist_ok=True)
+    # Data first, manifest last: a reader never sees a manifest pointing into a file it does not describe
+    for name, payload in ((SHARD_FILE, data), (MANIFEST_FILE, _dumps(manifest))):
+        tmp = os.path.join(out_dir, name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, os.path.join(out_dir, name))
+    return os.path.join(out_dir, SHARD_FILE), len(data)
+
+
+# ------------------ Reader ------------------
+
+
+class ShardReader:
+    """Range reader over a shard directory or base URL; bytes_read counts bytes actually transferred."""
+
+    def __init__(self, base: str):
+        self.base = base.rstrip('/')
+        self.remote = self.base.startswith(('http://', 'https://'))
+        self.bytes_read = 0
+        self.manifest = json.loads(self._fetch(MANIFEST_FILE))
+        if self.manifest.get('format') != SHARD_FORMAT:
+            raise ValueError(f"{base}: unsupported shard format {self.manifest.get('format')}")
+        self.books: List[dict] = self.manifest['books']
+        self._file = None
+
+    def _fetch(self, name: str, start: Optional[int] = None, length: Optional[int] = None) -> bytes:
+        if self.remote:
+            req = urllib.request.Request(f"{self.base}/{name}")
+            if start is not None:
+                req.add_header('Range', f"bytes={start}-{start + length - 1}")
+            with urllib.request.urlopen(req) as res:
+                data = res.read()
+                status = res.status
+            self.bytes_read += len(data)
+            # Servers without range support answer 200 with the whole file
+            return data[start:start + length] if start is not None and status == 200 else data
+        if start is None:
+            with open(os.path.join(self.base, name), 'rb') as f:
+                data = f.read()
+        else:
+            if self._file is None:
+                self._file = open(os.path.join(self.base, name), 'rb')
+            self._file.seek(start)
+            data = self._file.read(length)
+        self.bytes_read += len(data)
+        return data
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'ShardReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def find_book(self, name: str) -> Optional[int]:
+        """0-based book index for a name / abbreviation in any form bible_refs knows."""
+        wanted = lookup_book(name)
+        for i, b in enumerate(self.books):
+            if b['name'] == name or b['abbrev'] == name:
+                return i
+            if wanted is not None and (lookup_book(b['abbrev']) or lookup_book(b['name'])) == wanted:
+                return i
+        return None
+
+    def chapter(self, book: int, chapter: int) -> List[str]:
+        """Verses of one chapter (0-based book, 1-based chapter)."""
+        offset, length = self.books[book]['chapters'][chapter - 1]
+        return json.loads(self._fetch(self.manifest['file'], offset, length))
+
+    def book(self, book: int) -> dict:
+        entry = self.books[book]
+        return json.loads(self._fetch(self.manifest['file'], entry['offset'], entry['length']))
+
+
+# ------------------ CLI ------------------
+
+
+def _bible_files(folder: str) -> List[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.json') and f not in SKIP_FILES)
+
+
+def _bench(bible_path: str, rounds: int):
+    shard_dir = os.path.splitext(bible_path)[0]
+    if not os.path.exists(os.path.join(shard_dir, MANIFEST_FILE)):
+        write_shards(bible_path)
+
+    def whole():
+        with open(bible_path, 'rb') as f:
+            data = f.read()
+        books = json.loads(data.decode('utf-8-sig'))
+        return len(data), books[0]['chapters'][0]
+
+    def split_book():
+        with open(os.path.join(shard_dir, 'meta.json'), 'rb') as f:
+            meta_bytes = f.read()
+        meta = json.loads(meta_bytes)
+        with open(os.path.join(shard_dir, meta['books'][0]['file']), 'rb') as f:
+            data = f.read()
+        return len(meta_bytes) + len(data), json.loads(data)['chapters'][0]
+
+    def shard():
+        with ShardReader(shard_dir) as reader:
+            verses = reader.chapter(0, 1)
+            return reader.bytes_read, verses
+
+    paths = [('whole file (<abbr>.json)', whole), ('shard range (manifest + chapter)', shard)]
+    if os.path.exists(os.path.join(shard_dir, 'meta.json')):
+        paths.insert(1, ('split book (meta.json + 01.json)', split_book))
+    expected = whole()[1]
+    print(f"open book 1 chapter 1 of {os.path.basename(bible_path)}, best of {rounds}")
+    print(f"{'path':<36} {'bytes read':>12} {'ms':>8}")
+    for label, fn in paths:
+        best = float('inf')
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            n_bytes, verses = fn()
+            best = min(best, time.perf_counter() - t0)
+        if verses != expected:
+            raise SystemExit(f"MISMATCH: {label} returned different verses")
+        print(f"{label:<36} {n_bytes:>12,} {best * 1000:>8.2f}")
+    with ShardReader(shard_dir) as reader:
+        manifest_bytes = reader.bytes_read
+        sizes = sorted(length for b in reader.books for _, length in b['chapters'])
+    print(f"manifest {manifest_bytes:,} bytes; chapter ranges {sizes[0]:,}..{sizes[-1]:,} bytes (median {sizes[len(sizes) // 2]:,})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Minified per-version shard file with a byte-range manifest")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help=f'Write <abbr>/{SHARD_FILE} + {MANIFEST_FILE}')
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument('--bible', help='One <abbr>.json (or splitBibles.js folder)')
+    g.add_argument('--bibles', help='Every <abbr>.json in this folder')
+    p = sub.add_parser('get', help='Read one chapter through the manifest')
+    p.add_argument('--dir', required=True, help='Shard directory or http(s) base URL')
+    p.add_argument('book')
+    p.add_argument('chapter', type=int)
+    p = sub.add_parser('bench', help='Bytes read / time to open the first chapter')
+    p.add_argument('--bible', required=True)
+    p.add_argument('--rounds', type=int, default=5)
+    args = ap.parse_args()
+
+    if args.cmd == 'build':
+        for path in ([args.bible] if args.bible else _bible_files(args.bibles)):
+            t0 = time.perf_counter()
+            out, size = write_shards(path)
+            print(f"{path} -> {out} ({size / 1024:.0f} KiB, {time.perf_counter() - t0:.2f}s)")
+    elif args.cmd == 'get':
+        with ShardReader(args.dir) as reader:
+            idx = reader.find_book(args.book)
+            if idx is None:
+                print(f"unknown book: {args.book}", file=sys.stderr)
+                return 1
+            for n, text in enumerate(reader.chapter(idx, args.chapter), start=1):
+                print(f"{n} {text}")
+            print(f"({reader.bytes_read:,} bytes read)", file=sys.stderr)
+    elif args.cmd == 'bench':
+        _bench(args.bible, args.rounds)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
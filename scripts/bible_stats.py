@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Precomputed search statistics: word -> per-chapter / per-book match counts.
+
+Built from a word-mode search index (bible_search.py), so word ids line up with its
+vocab. For every word the file keeps a sparse per-chapter vector of (occurrences,
+verses) plus whole-version totals; a query term expands to the words it matches under
+the client's prefix / suffix / whole-word rule and their vectors are summed into
+array-backed per-chapter counts, then folded into per-book counts (canonical order).
+
+Exactness (what countMatches in BibleApp.jsx would report):
+  * occurrence counts for any-mode queries and single-term queries are exact,
+  * verse counts are upper bounds when a query expands to several words or terms,
+  * all-mode with several terms is an upper bound per chapter.
+exact=True answers the latter two from the index postings instead (still no verse text).
+Phrase / case-sensitive queries and n-gram (CJK) versions have no word aggregates; those
+are delegated to BibleSearch.
+
+File: public/bibles/<abbr>/search-stats.bin (little-endian, sections 8-byte aligned)
+  header    magic 'BSTS', format, words, chapters, books, index postings size, 5 x (offset, length)
+  books     uint32[books + 1]      first chapter row of each book (file order)
+  canonical uint32[books]          bible_refs book number per book (0 = unknown)
+  totals    uint32[2 * words]      occurrences, verses per word
+  offsets   uint32[words + 1]      first triple of each word
+  triples   uint16[3 * n]          chapter row, occurrences, verses (saturating at 65535)
+
+Usage:
+  python bible_stats.py build --bible ../public/bibles/fi_pr.json
+  python bible_stats.py query --bible ../public/bibles/fi_pr.json "herra jumala" --mode any --top 5
+  python bible_stats.py bench --bible ../public/bibles/fi_pr.json
+"""
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import bible_search
+from bible_refs import lookup_book, unpack
+
+STATS_FORMAT = 1
+STATS_FILE = 'search-stats.bin'
+_MAGIC = b'BSTS'
+_HEAD = struct.Struct('<4sHHIIIQ10Q')  # magic, format, reserved, words, chapters, books, postings bytes, 5 x (offset, length)
+_U16_MAX = 0xFFFF
+
+
+def _typed_bytes(code: str, values) -> bytes:
+    a = array(code, values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+
+def _typed_view(buf, code: str, start: int, end: int) -> Sequence[int]:
+    if sys.byteorder == 'little':
+        return memoryview(buf)[start:end].cast(code)
+    a = array(code, bytes(buf[start:end]))
+    a.byteswap()
+    return a
+
+
+def stats_path_for(bible_path: str) -> str:
+    return os.path.join(bible_search.index_dir_for(bible_path), STATS_FILE)
+
+
+# ------------------ Build ------------------
+
+
+def build_stats(books: Sequence[dict], engine: bible_search.BibleSearch) -> bytes:
+    """Aggregate the engine's word postings per chapter (n-gram indexes yield an empty table)."""
+    book_first = [0]
+    for b in books:
+        book_first.append(book_first[-1] + len(b.get('chapters') or []))
+    n_chapters = book_first[-1]
+    if n_chapters > _U16_MAX:
+        raise ValueError(f"{n_chapters} chapters do not fit the uint16 chapter rows")
+    canonical = [lookup_book(b.get('abbrev') or '') or lookup_book(b.get('name') or '') or 0 for b in books]
+    totals: List[int] = []
+    offsets = [0]
+    triples = array('H')
+    n_words = len(engine.vocab) if engine.mode == 'word' else 0
+    for wid in range(n_words):
+        per_chapter: Dict[int, List[int]] = {}
+        occurrences = 0
+        for vid, positions in engine.postings(wid):
+            b, c, _ = unpack(vid)
+            row = book_first[b - 1] + c - 1
+            cell = per_chapter.get(row)
+            if cell is None:
+                cell = per_chapter[row] = [0, 0]
+            cell[0] += len(positions)
+            cell[1] += 1
+            occurrences += len(positions)
+        engine._cache.pop(wid, None)
+        totals += [occurrences, sum(cell[1] for cell in per_chapter.values())]
+        for row in sorted(per_chapter):
+            occ, verses = per_chapter[row]
+            triples.extend((row, min(occ, _U16_MAX), min(verses, _U16_MAX)))
+        offsets.append(len(triples) // 3)
+    if sys.byteorder != 'little':
+        triples.byteswap()
+    sections = [
+        _typed_bytes('I', book_first),
+        _typed_bytes('I', canonical),
+        _typed_bytes('I', totals),
+        _typed_bytes('I', offsets),
+        triples.tobytes(),
+    ]
+    table = []
+    pos = _HEAD.size
+    for data in sections:
+        pos += -pos % 8
+        table += [pos, len(data)]
+        pos += len(data)
+    out = bytearray(_HEAD.pack(_MAGIC, STATS_FORMAT, 0, n_words, n_chapters, len(books), engine.offsets[-1] if n_words else 0, *table))
+    for data, start in zip(sections, table[::2]):
+        out += b'\0' * (start - len(out))
+        out += data
+    return bytes(out)
+
+
+def write_stats(bible_path: str, books: Optional[Sequence[dict]] = None, out_path: Optional[str] = None) -> Tuple[str, int]:
+    out_path = out_path or stats_path_for(bible_path)
+    books = bible_search.load_bible(bible_path) if books is None else books
+    engine = bible_search.BibleSearch.load(os.path.dirname(out_path))
+    data = build_stats(books, engine)
+    tmp = out_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, out_path)
+    return out_path, len(data)
+
+
+# ------------------ Query API ------------------
+
+
+class StatsResult(NamedTuple):
+    total: int                      # matches (what the client shows as "matches")
+    verses: int                     # matching verses
+    per_book: Dict[str, int]        # book name -> matches, canonical order
+    per_chapter: Dict[str, int]     # "<book name> <chapter>" -> matches, canonical order
+    exact: bool                     # False: verses / all-mode counts are upper bounds
+
+
+class SearchStats:
+    """Aggregate queries for one version; open with SearchStats.for_bible(path)."""
+
+    def __init__(self, path: str, engine: bible_search.BibleSearch):
+        self.engine = engine
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, n_words, n_chapters, n_books, postings_bytes, *table = _HEAD.unpack_from(self._mm, 0)
+        if magic != _MAGIC or fmt != STATS_FORMAT:
+            raise ValueError(f"{path}: not a format {STATS_FORMAT} statistics file")
+        if n_words and (n_words != len(engine.vocab) or postings_bytes != engine.offsets[-1]):
+            raise ValueError(f"{path}: built from a different search index; rebuild it")
+        sec = [(table[i], table[i] + table[i + 1]) for i in range(0, len(table), 2)]
+        self.words = n_words
+        self.chapters = n_chapters
+        self.book_first = _typed_view(self._mm, 'I', *sec[0])
+        canonical = _typed_view(self._mm, 'I', *sec[1])
+        self.totals = _typed_view(self._mm, 'I', *sec[2])
+        self.offsets = _typed_view(self._mm, 'I', *sec[3])
+        self.triples = _typed_view(self._mm, 'H', *sec[4])
+        self.books: List[str] = engine.books
+        # Canonical order (unknown books keep file order after the known ones)
+        self.book_order = sorted(range(n_books), key=lambda i: (canonical[i] or 1000 + i))
+        self.chapter_book = array('H')
+        for b in range(n_books):
+            self.chapter_book.extend([b] * (self.book_first[b + 1] - self.book_first[b]))
+
+    @classmethod
+    def for_bible(cls, bible_path: str) -> 'SearchStats':
+        engine = bible_search.BibleSearch.for_bible(bible_path)
+        return cls(stats_path_for(bible_path), engine)
+
+    def _words(self, term: str) -> Optional[Dict[int, int]]:
+        folded = bible_search.fold(term)
+        if not self.words or not bible_search._ALL_WORD.match(folded):
+            return None
+        return self.engine.edge_words(folded)
+
+    def term_vector(self, term: str) -> Optional[Tuple[array, array]]:
+        """(occurrences, verse upper bounds) per chapter row for one term; None if not answerable here."""
+        words = self._words(term)
+        if words is None:
+            return None
+        occ = array('q', bytes(8 * self.chapters))
+        verses = array('q', occ)
+        t = self.triples
+        for wid, per in words.items():
+            for k in range(self.offsets[wid] * 3, self.offsets[wid + 1] * 3, 3):
+                row = t[k]
+                occ[row] += per * t[k + 1]
+                verses[row] += t[k + 2]
+        return occ, verses
+
+    def estimate(self, query: str, mode: str = 'any') -> Optional[Tuple[int, int]]:
+        """(matches, verses upper bound) from per-word totals only: O(matching words), no vectors."""
+        terms = bible_search.parse_query(query, mode)
+        total = verses = 0
+        per_term = []
+        for t in terms:
+            words = self._words(t)
+            if words is None:
+                return None
+            occ = sum(per * self.totals[2 * wid] for wid, per in words.items())
+            ver = sum(self.totals[2 * wid + 1] for wid in words)
+            per_term.append((occ, ver))
+        if mode == 'all' and any(occ == 0 for occ, _ in per_term):
+            return 0, 0
+        for occ, ver in per_term:
+            total += occ
+            verses += ver
+        if mode == 'all' and per_term:
+            verses = min(ver for _, ver in per_term)
+        return total, verses
+
+    def summary(self, query: str, mode: str = 'any', case_sensitive: bool = False, exact: bool = False) -> StatsResult:
+        """Counts, per-book and per-chapter breakdown for an all / any query."""
+        terms = bible_search.parse_query(query, mode)
+        if not terms:
+            return StatsResult(0, 0, {}, {}, True)
+        vectors = None if case_sensitive or mode == 'phrase' else [self.term_vector(t) for t in terms]
+        if vectors is None or any(v is None for v in vectors):
+            return self._from_search(query, mode, case_sensitive)
+        single_word = len(terms) == 1 and len(self._words(terms[0]) or ()) <= 1
+        if exact and not single_word:
+            return self._from_postings(terms, mode)
+        occ = array('q', bytes(8 * self.chapters))
+        verses = array('q', occ)
+        for row in range(self.chapters):
+            counts = [v[0][row] for v in vectors]
+            if mode == 'all' and not all(counts):
+                continue
+            occ[row] = sum(counts)
+            bounds = [v[1][row] for v in vectors]
+            verses[row] = min(bounds) if mode == 'all' else sum(bounds)
+        return self._fold(occ, verses, exact=single_word)
+
+    def _fold(self, occ: Sequence[int], verses: Sequence[int], exact: bool) -> StatsResult:
+        per_book: Dict[str, int] = {}
+        per_chapter: Dict[str, int] = {}
+        total = n_verses = 0
+        for b in self.book_order:
+            name = self.books[b]
+            first = self.book_first[b]
+            book_total = 0
+            for row in range(first, self.book_first[b + 1]):
+                n = occ[row]
+                if n:
+                    per_chapter[f"{name} {row - first + 1}"] = n
+                    book_total += n
+                    n_verses += verses[row]
+            if book_total:
+                per_book[name] = book_total
+                total += book_total
+        return StatsResult(total, n_verses, per_book, per_chapter, exact)
+
+    def _from_postings(self, terms: Sequence[str], mode: str) -> StatsResult:
+        per_term = [self.engine.term_counts(t) for t in terms]
+        vids = set(per_term[0]).intersection(*per_term[1:]) if mode == 'all' else set().union(*per_term)
+        occ = [0] * self.chapters
+        verses = [0] * self.chapters
+        for vid in vids:
+            b, c, _ = unpack(vid)
+            row = self.book_first[b - 1] + c - 1
+            occ[row] += sum(pt.get(vid, 0) for pt in per_term)
+            verses[row] += 1
+        return self._fold(occ, verses, exact=True)
+
+    def _from_search(self, query: str, mode: str, case_sensitive: bool) -> StatsResult:
+        res = self.engine.search(query, mode, case_sensitive, max_rows=None)
+        order = {self.books[b]: i for i, b in enumerate(self.book_order)}
+        per_book = dict(sorted(res.per_book.items(), key=lambda kv: order.get(kv[0], 1 << 30)))
+        per_chapter = dict(sorted(res.per_chapter.items(), key=lambda kv: (order.get(kv[0].rsplit(' ', 1)[0], 1 << 30), int(kv[0].rsplit(' ', 1)[1]))))
+        return StatsResult(res.total, len(res.rows), per_book, per_chapter, True)
+
+    def top_books(self, query: str, mode: str = 'any', n: int = 10, **kw) -> List[Tuple[str, int]]:
+        per_book = self.summary(query, mode, **kw).per_book
+        return sorted(per_book.items(), key=lambda kv: -kv[1])[:n]
+
+    def chapter_breakdown(self, query: str, book: str, mode: str = 'any', **kw) -> List[Tuple[int, int]]:
+        prefix = book + ' '
+        per_chapter = self.summary(query, mode, **kw).per_chapter
+        return [(int(k[len(prefix):]), v) for k, v in per_chapter.items() if k.startswith(prefix)]
+
+
+# ------------------ CLI ------------------
+
+
+def _bench(bible_path: str):
+    books = bible_search.load_bible(bible_path)
+    if not os.path.exists(stats_path_for(bible_path)):
+        write_stats(bible_path, books)
+    stats = SearchStats.for_bible(bible_path)
+    if not stats.words:
+        print(f"{os.path.basename(bible_path)}: n-gram index, no word aggregates (queries go through BibleSearch)")
+        return
+    # Most frequent words first: these are the queries that hit MAX_SEARCH_RESULTS in the client
+    common = sorted(range(stats.words), key=lambda w: -stats.totals[2 * w])[:3]
+    queries = [(stats.engine.vocab[w], 'any') for w in common]
+    longer = next(w for w in sorted(range(stats.words), key=lambda w: -stats.totals[2 * w]) if len(stats.engine.vocab[w]) >= 6)
+    queries += [(f"{stats.engine.vocab[common[0]]} {stats.engine.vocab[common[2]]}", 'all'),
+                (stats.engine.vocab[longer][:4], 'any')]
+    print(f"{'query':<20} {'mode':<5} {'matches':>8} {'estimate ms':>12} {'summary ms':>11} {'exact ms':>9} {'scan ms':>9}")
+    for q, mode in queries:
+        t0 = time.perf_counter()
+        est = stats.estimate(q, mode)
+        t_est = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        res = stats.summary(q, mode)
+        t_sum = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        ex = stats.summary(q, mode, exact=True)
+        t_ex = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        base = bible_search.linear_search(books, q, mode)
+        t_scan = time.perf_counter() - t0
+        if ex.total != sum(base.values()) or ex.verses != len(base):
+            raise SystemExit(f"MISMATCH for {q!r}: exact {ex.total}/{ex.verses} vs scan {sum(base.values())}/{len(base)}")
+        if mode == 'any' and (res.total != ex.total or res.per_book != ex.per_book or est[0] != ex.total):
+            raise SystemExit(f"MISMATCH for {q!r}: aggregate {res.total} vs exact {ex.total}")
+        print(f"{q[:20]:<20} {mode:<5} {ex.total:>8} {t_est * 1000:>12.3f} {t_sum * 1000:>11.2f} {t_ex * 1000:>9.1f} {t_scan * 1000:>9.1f}")
+    print("exact counts verified against the linear scan; any-mode aggregates equal the exact counts")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precomputed per-book / per-chapter search statistics")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help=f'Write <abbr>/{STATS_FILE} (needs the search index)')
+    p.add_argument('--bible', required=True)
+    p = sub.add_parser('query', help='Counts / top books / chapter breakdown')
+    p.add_argument('--bible', required=True)
+    p.add_argument('query')
+    p.add_argument('--mode', choices=['all', 'any'], default='all')
+    p.add_argument('--exact', action='store_true', help='Exact verse / all-mode counts from postings')
+    p.add_argument('--top', type=int, default=10)
+    p.add_argument('--book', help='Chapter breakdown for this book name')
+    p = sub.add_parser('bench', help='Aggregate vs postings vs linear scan timings')
+    p.add_argument('--bible', required=True)
+    args = ap.parse_args()
+
+    if args.cmd == 'build':
+        t0 = time.perf_counter()
+        path, size = write_stats(args.bible)
+        print(f"{args.bible} -> {path} ({size / 1024:.0f} KiB, {time.perf_counter() - t0:.1f}s)")
+    elif args.cmd == 'query':
+        stats = SearchStats.for_bible(args.bible)
+        t0 = time.perf_counter()
+        res = stats.summary(args.query, args.mode, exact=args.exact)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{res.total} matches, {'' if res.exact else '<= '}{res.verses} verses ({ms:.2f} ms)")
+        for name, n in sorted(res.per_book.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {name}: {n}")
+        if args.book:
+            prefix = args.book + ' '
+            print(f"{args.book}: " + ', '.join(f"{k[len(prefix):]}={v}" for k, v in res.per_chapter.items() if k.startswith(prefix)))
+    elif args.cmd == 'bench':
+        _bench(args.bible)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
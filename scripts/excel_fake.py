@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""In-memory stand-in for the Excel COM objects used by prophecies_excel_bridge.py.
+
+Mimics the small subset of the object model the bridge touches
+(Application / Workbook / Worksheet / Range) and counts every COM round trip
+(method call, property get or property set) so benchmarks can assert how many
+calls an import or export costs.
+
+Usage:
+  from excel_fake import FakeExcel
+  excel = FakeExcel()
+  ws = excel.ActiveWorkbook.add_sheet('prophecies', rows=[COLUMNS, [...], ...])
+  ... run bridge helpers against ws ...
+  print(excel.counter.total, excel.counter.by_name)
+"""
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_ROWS = 1048576
+MAX_COLS = 16384
+XL_UP = -4162
+
+
+class CallCounter:
+    """Tally of simulated COM round trips keyed by call site name."""
+
+    def __init__(self):
+        self.by_name: Counter = Counter()
+
+    def hit(self, name: str):
+        self.by_name[name] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_name.values())
+
+    def reset(self):
+        self.by_name.clear()
+
+
+class _Font:
+    def __init__(self, rng: 'FakeRange'):
+        self._rng = rng
+
+    @property
+    def Bold(self):
+        self._rng._ws._counter.hit('Font.Bold.get')
+        return all(self._rng._ws._bold.get(rc, False) for rc in self._rng._cells())
+
+    @Bold.setter
+    def Bold(self, value):
+        self._rng._ws._counter.hit('Font.Bold.set')
+        for rc in self._rng._cells():
+            self._rng._ws._bold[rc] = bool(value)
+
+
+class _Count:
+    def __init__(self, n: int):
+        self.Count = n
+
+
+class FakeRange:
+    def __init__(self, ws: 'FakeWorksheet', r1: int, c1: int, r2: int, c2: int):
+        self._ws = ws
+        self._r1, self._r2 = min(r1, r2), max(r1, r2)
+        self._c1, self._c2 = min(c1, c2), max(c1, c2)
+
+    def _cells(self):
+        # Clamp whole-row / whole-column ranges to the populated area
+        r2 = min(self._r2, max(self._ws._max_row(), self._r1))
+        c2 = min(self._c2, max(self._ws._max_col(), self._c1))
+        for r in range(self._r1, r2 + 1):
+            for c in range(self._c1, c2 + 1):
+                yield (r, c)
+
+    @property
+    def Row(self) -> int:
+        return self._r1
+
+    @property
+    def Column(self) -> int:
+        return self._c1
+
+    @property
+    def Rows(self) -> _Count:
+        return _Count(self._r2 - self._r1 + 1)
+
+    @property
+    def Columns(self) -> _Count:
+        return _Count(self._c2 - self._c1 + 1)
+
+    @property
+    def Font(self) -> _Font:
+        return _Font(self)
+
+    @property
+    def Value(self):
+        self._ws._counter.hit('Range.Value.get')
+        data = self._ws._data
+        if self._r1 == self._r2 and self._c1 == self._c2:
+            return data.get((self._r1, self._c1))
+        # COM hands back a tuple of row tuples for multi-cell ranges
+        return tuple(
+            tuple(data.get((r, c)) for c in range(self._c1, self._c2 + 1))
+            for r in range(self._r1, self._r2 + 1)
+        )
+
+    @Value.setter
+    def Value(self, value):
+        self._ws._counter.hit('Range.Value.set')
+        if self._r1 == self._r2 and self._c1 == self._c2 and not isinstance(value, (list, tuple)):
+            self._ws._put(self._r1, self._c1, value)
+            return
+        for ri, row in enumerate(value):
+            for ci, v in enumerate(row):
+                r, c = self._r1 + ri, self._c1 + ci
+                if r > self._r2 or c > self._c2:
+                    continue
+                self._ws._put(r, c, v)
+
+    def Clear(self):
+        self._ws._counter.hit('Range.Clear')
+        for rc in list(self._cells()):
+            self._ws._data.pop(rc, None)
+            self._ws._bold.pop(rc, None)
+
+    def Delete(self):
+        self._ws._counter.hit('Range.Delete')
+        if self._c1 != 1 or self._c2 != MAX_COLS:
+            raise NotImplementedError('only entire-row deletes are simulated')
+        n = self._r2 - self._r1 + 1
+        for store in (self._ws._data, self._ws._bold):
+            shifted = {}
+            for (r, c), v in store.items():
+                if r < self._r1:
+                    shifted[(r, c)] = v
+                elif r > self._r2:
+                    shifted[(r - n, c)] = v
+            store.clear()
+            store.update(shifted)
+
+    def Insert(self):
+        self._ws._counter.hit('Range.Insert')
+        if self._c1 != 1 or self._c2 != MAX_COLS:
+            raise NotImplementedError('only entire-row inserts are simulated')
+        n = self._r2 - self._r1 + 1
+        for store in (self._ws._data, self._ws._bold):
+            shifted = {(r + n if r >= self._r1 else r, c): v for (r, c), v in store.items()}
+            store.clear()
+            store.update(shifted)
+
+    def End(self, direction: int) -> 'FakeRange':
+        self._ws._counter.hit('Range.End')
+        if direction != XL_UP:
+            raise NotImplementedError(direction)
+        r = self._r1
+        while r > 1 and self._ws._data.get((r, self._c1)) in (None, ''):
+            r -= 1
+        return FakeRange(self._ws, r, self._c1, r, self._c1)
+
+
+class _Column:
+    def __init__(self, ws: 'FakeWorksheet', c: int):
+        self._ws = ws
+        self._c = c
+
+    @property
+    def ColumnWidth(self) -> float:
+        self._ws._counter.hit('Column.ColumnWidth.get')
+        return self._ws._widths.get(self._c, 8.43)
+
+    @ColumnWidth.setter
+    def ColumnWidth(self, value: float):
+        self._ws._counter.hit('Column.ColumnWidth.set')
+        self._ws._widths[self._c] = value
+
+
+class _Columns:
+    Count = MAX_COLS
+
+    def __init__(self, ws: 'FakeWorksheet'):
+        self._ws = ws
+
+    def __call__(self, c: int) -> _Column:
+        self._ws._counter.hit('Columns')
+        return _Column(self._ws, c)
+
+    def AutoFit(self):
+        self._ws._counter.hit('Columns.AutoFit')
+        widths: Dict[int, float] = {}
+        for (_, c), v in self._ws._data.items():
+            widths[c] = max(widths.get(c, 0.0), float(len(str(v))) + 1.0)
+        self._ws._widths.update(widths)
+
+
+class _Rows:
+    Count = MAX_ROWS
+
+    def __init__(self, ws: 'FakeWorksheet'):
+        self._ws = ws
+
+    def __call__(self, r: int) -> FakeRange:
+        self._ws._counter.hit('Rows')
+        return FakeRange(self._ws, r, 1, r, MAX_COLS)
+
+
+class FakeWorksheet:
+    def __init__(self, name: str, rows: Optional[Sequence[Sequence[Any]]] = None, counter: Optional[CallCounter] = None):
+        self._name = name
+        self._counter = counter or CallCounter()
+        self._data: Dict[Tuple[int, int], Any] = {}
+        self._bold: Dict[Tuple[int, int], bool] = {}
+        self._widths: Dict[int, float] = {}
+        for ri, row in enumerate(rows or [], start=1):
+            for ci, v in enumerate(row, start=1):
+                self._put(ri, ci, v)
+
+    # -- helpers (not part of the COM surface, never counted) --
+    def _put(self, r: int, c: int, v: Any):
+        if v is None or v == '':
+            self._data.pop((r, c), None)
+        else:
+            self._data[(r, c)] = v
+
+    def _max_row(self) -> int:
+        return max((r for r, _ in self._data), default=1)
+
+    def _max_col(self) -> int:
+        return max((c for _, c in self._data), default=1)
+
+    def snapshot(self) -> List[List[Any]]:
+        """Return populated area as list of rows (None for empty cells)."""
+        return [[self._data.get((r, c)) for c in range(1, self._max_col() + 1)] for r in range(1, self._max_row() + 1)]
+
+    # -- COM surface --
+    @property
+    def Name(self) -> str:
+        self._counter.hit('Worksheet.Name.get')
+        return self._name
+
+    @Name.setter
+    def Name(self, value: str):
+        self._counter.hit('Worksheet.Name.set')
+        self._name = value
+
+    def Cells(self, r: int, c: int) -> FakeRange:
+        self._counter.hit('Cells')
+        return FakeRange(self, r, c, r, c)
+
+    def Range(self, a: FakeRange, b: Optional[FakeRange] = None) -> FakeRange:
+        self._counter.hit('Range')
+        b = b or a
+        return FakeRange(self, a._r1, a._c1, b._r2, b._c2)
+
+    @property
+    def UsedRange(self) -> FakeRange:
+        self._counter.hit('UsedRange')
+        if not self._data:
+            return FakeRange(self, 1, 1, 1, 1)
+        rows = [r for r, _ in self._data]
+        cols = [c for _, c in self._data]
+        return FakeRange(self, min(rows), min(cols), max(rows), max(cols))
+
+    @property
+    def Rows(self) -> _Rows:
+        return _Rows(self)
+
+    @property
+    def Columns(self) -> _Columns:
+        return _Columns(self)
+
+
+class _Worksheets:
+    def __init__(self, wb: 'FakeWorkbook'):
+        self._wb = wb
+
+    def __call__(self, name: str) -> FakeWorksheet:
+        self._wb._counter.hit('Worksheets')
+        for ws in self._wb._sheets:
+            if ws._name == name:
+                return ws
+        raise KeyError(name)
+
+    def __iter__(self):
+        self._wb._counter.hit('Worksheets.__iter__')
+        return iter(list(self._wb._sheets))
+
+    def Add(self) -> FakeWorksheet:
+        self._wb._counter.hit('Worksheets.Add')
+        ws = FakeWorksheet(f"Sheet{len(self._wb._sheets) + 1}", counter=self._wb._counter)
+        self._wb._sheets.insert(0, ws)
+        return ws
+
+
+class FakeWorkbook:
+    def __init__(self, counter: Optional[CallCounter] = None):
+        self._counter = counter or CallCounter()
+        self._sheets: List[FakeWorksheet] = []
+
+    def add_sheet(self, name: str, rows: Optional[Sequence[Sequence[Any]]] = None) -> FakeWorksheet:
+        ws = FakeWorksheet(name, rows, counter=self._counter)
+        self._sheets.append(ws)
+        return ws
+
+    @property
+    def Worksheets(self) -> _Worksheets:
+        return _Worksheets(self)
+
+
+class FakeExcel:
+    """Stand-in for win32com.client.Dispatch('Excel.Application')."""
+
+    def __init__(self):
+        self.counter = CallCounter()
+        self.ActiveWorkbook = FakeWorkbook(self.counter)
+        self.ScreenUpdating = True
+        self.Calculation = -4105  # xlCalculationAutomatic
+        self.messages: List[Tuple[str, int, str]] = []
+
+    @property
+    def Application(self) -> 'FakeExcel':
+        return self
+
+    def MsgBox(self, text: str, buttons: int = 0, title: str = ''):
+        self.messages.append((text, buttons, title))
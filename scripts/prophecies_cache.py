@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Persistent content-hash cache for prophecies_excel_bridge.py imports (SQLite, LRU-bounded).
+
+Two tables in one SQLite file next to the JSON (<name>.cache.sqlite):
+
+  entries  content key -> (encoded, row): the migrated entry as JsonArrayWriter encodes it
+           and its flattened sheet row (JSON text), keyed by a hash of the element's raw JSON text
+  files    sha256 of a whole JSON file -> the ordered entry keys of that file
+
+An import of a file the cache has seen (typically the one the last import or export left
+behind) is a file hash plus one lookup per entry: no JSON scan, no migration, no encoding.
+Any other file is scanned element by element and only elements whose text is not cached are
+decoded and migrated. The caller passes a fingerprint of its migration / flatten code;
+a cache written under a different fingerprint is cleared on open.
+
+Records touched in a run are stamped with that run's tick. close() evicts the least recently
+used records beyond max_entries / max_files and commits. The cache is auxiliary: a file that
+cannot be opened or is corrupt is recreated, and errors while using it are the caller's to
+treat as a miss.
+
+FileMemo is the in-memory counterpart for a long-running process (the --serve daemon): parsed
+files keyed by path and stat signature, so a command on an unchanged file reuses the previous
+parse. It is off unless enable_memo() was called; memoized() then just calls the loader.
+
+Usage:
+  cache = ContentCache(default_cache_path('public/prophecies.json'), fingerprint='bridge-1')
+  hits = cache.get_many(keys)            # {key: (encoded, row_json)}
+  cache.put_many([(key, encoded, row_json), ...])
+  cache.close()
+  entries = memoized('migrated', path, lambda: list(iter_migrated(path)))
+"""
+from __future__ import annotations
+import collections
+import hashlib
+import os
+import sqlite3
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_MAX_ENTRIES = 250_000
+DEFAULT_MAX_FILES = 8
+DEFAULT_MEMO_FILES = 4
+KEY_SIZE = 16
+_BATCH = 500  # keys per IN (...) query; below SQLite's historical 999-variable limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, encoded TEXT NOT NULL, row TEXT NOT NULL, used INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS files (sha TEXT PRIMARY KEY, keys BLOB NOT NULL, used INTEGER NOT NULL);
+"""
+
+
+def content_key(text: str) -> bytes:
+    """Cache key of one element's raw JSON text."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=KEY_SIZE).digest()
+
+
+def default_cache_path(json_path: str) -> str:
+    root, _ = os.path.splitext(os.path.abspath(json_path))
+    return root + '.cache.sqlite'
+
+
+class ContentCache:
+    def __init__(self, path: str, fingerprint: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_files: int = DEFAULT_MAX_FILES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_files = max_files
+        try:
+            self._db = self._open(fingerprint)
+        except sqlite3.DatabaseError:
+            # Corrupt / foreign file: it only ever holds derived data
+            os.remove(path)
+            self._db = self._open(fingerprint)
+
+    def _open(self, fingerprint: str) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        try:
+            # A lost cache costs one full import, so durability is traded for speed
+            db.execute('PRAGMA synchronous=OFF')
+            db.executescript(_SCHEMA)
+            meta = dict(db.execute('SELECT name, value FROM meta'))
+            if meta.get('fingerprint') != fingerprint:
+                db.execute('DELETE FROM entries')
+                db.execute('DELETE FROM files')
+                db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('fingerprint', fingerprint))
+            self.tick = int(meta.get('tick', 0)) + 1
+            db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('tick', str(self.tick)))
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, Tuple[str, str]]:
+        """Cached (encoded, row_json) for every known key; found records are marked as used."""
+        wanted = list(dict.fromkeys(keys))
+        found: Dict[bytes, Tuple[str, str]] = {}
+        for i in range(0, len(wanted), _BATCH):
+            batch = wanted[i:i + _BATCH]
+            marks = ','.join('?' * len(batch))
+            for key, encoded, row in self._db.execute(f'SELECT key, encoded, row FROM entries WHERE key IN ({marks})', batch):
+                found[key] = (encoded, row)
+            self._db.execute(f'UPDATE entries SET used = ? WHERE used < ? AND key IN ({marks})', [self.tick, self.tick] + batch)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, str, str]]):
+        self._db.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                             ((key, encoded, row, self.tick) for key, encoded, row in items))
+
+    def file_keys(self, sha: Optional[str]) -> Optional[List[bytes]]:
+        """Ordered entry keys of the file with this sha256, if it was recorded."""
+        if not sha:
+            return None
+        hit = self._db.execute('SELECT keys FROM files WHERE sha = ?', (sha,)).fetchone()
+        if hit is None:
+            return None
+        self._db.execute('UPDATE files SET used = ? WHERE sha = ?', (self.tick, sha))
+        blob = hit[0]
+        return [blob[i:i + KEY_SIZE] for i in range(0, len(blob), KEY_SIZE)]
+
+    def put_file(self, sha: str, keys: Sequence[bytes]):
+        self._db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?)', (sha, b''.join(keys), self.tick))
+
+    def _evict(self, table: str, limit: int, order: str):
+        excess = self._db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] - limit
+        if excess > 0:
+            self._db.execute(f'DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY {order} LIMIT ?)', (excess,))
+
+    def close(self):
+        """Evict least recently used records beyond the bounds and commit."""
+        if self._db is None:
+            return
+        try:
+            self._evict('entries', self.max_entries, 'used, rowid')
+            self._evict('files', self.max_files, 'used, rowid')
+            self._db.commit()
+        finally:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> 'ContentCache':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+# ------------------ In-process memo ------------------
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of path, or None while it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+class FileMemo:
+    """Values derived from files, valid while the file's mtime / size / inode are unchanged (LRU by file)."""
+
+    def __init__(self, max_files: int = DEFAULT_MEMO_FILES):
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._items: 'collections.OrderedDict[Tuple[str, str], Tuple[Any, Any]]' = collections.OrderedDict()
+
+    def get(self, kind: str, path: str, loader: Callable[[], Any]) -> Any:
+        """loader() unless an equal-signature result is held; exceptions are not memoized."""
+        key = (kind, os.path.abspath(path))
+        sig = file_signature(path)
+        held = self._items.get(key)
+        if held is not None and sig is not None and held[0] == sig:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return held[1]
+        self.misses += 1
+        value = loader()
+        # Signature from before the load: a write during the load invalidates the entry next time
+        self._items[key] = (sig, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_files:
+            self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._items.clear()
+
+
+_MEMO: Optional[FileMemo] = None
+
+
+def enable_memo(max_files: int = DEFAULT_MEMO_FILES) -> FileMemo:
+    global _MEMO
+    _MEMO = FileMemo(max_files)
+    return _MEMO
+
+
+def disable_memo() -> Optional[FileMemo]:
+    global _MEMO
+    memo, _MEMO = _MEMO, None
+    return memo
+
+
+def active_memo() -> Optional[FileMemo]:
+    return _MEMO
+
+
+def memoized(kind: str, path: str, loader: Callable[[], Any]) -> Any:
+    return _MEMO.get(kind, path, loader) if _MEMO is not None else loader()
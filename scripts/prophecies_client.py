@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Thin client for the bridge server (prophecies_excel_bridge.py --serve).
+
+Takes the same arguments as prophecies_excel_bridge.py. When a server is running, the command
+line is sent to it and its output and exit code are relayed, so a button click costs one small
+interpreter start instead of the bridge's imports, a new Excel COM attach and a JSON reload.
+When no server is running (or it cannot be reached) the bridge runs in this process, exactly as
+if prophecies_excel_bridge.py had been called.
+
+The server announces itself in a state file (address + random auth key, mode 0600) inside a
+per-user directory: $XDG_RUNTIME_DIR, else a mode 0700 prophecies-bridge-<user> directory in the
+temp dir. PROPHECIES_BRIDGE_STATE overrides the location. State files owned by another user or
+readable by group / others are ignored. Connections are authenticated with that key
+(multiprocessing.connection HMAC handshake) over a named pipe on Windows, a Unix socket elsewhere.
+This module only uses the standard library so that the client path stays cheap to start.
+
+Usage:
+  python prophecies_client.py --mode export --json path/to/prophecies.json
+  python prophecies_client.py --server-status
+  python prophecies_client.py --server-stop
+"""
+from __future__ import annotations
+import getpass
+import json
+import os
+import sys
+import tempfile
+from multiprocessing.connection import Client
+from typing import Any, Dict, List, Optional
+
+PROTOCOL = 1
+STATE_ENV = 'PROPHECIES_BRIDGE_STATE'
+
+
+def state_dir() -> str:
+    """Per-user directory for the state file: $XDG_RUNTIME_DIR, else a private dir in the temp dir."""
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime and os.path.isdir(runtime):
+        return runtime
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = 'user'
+    return os.path.join(tempfile.gettempdir(), f'prophecies-bridge-{user}')
+
+
+def state_path() -> str:
+    override = os.environ.get(STATE_ENV)
+    if override:
+        return override
+    return os.path.join(state_dir(), 'prophecies-bridge.json')
+
+
+def is_private(st: os.stat_result) -> bool:
+    """True when st belongs to the current user and grants nothing to group / others."""
+    if not hasattr(os, 'getuid'):
+        return True  # Windows: the temp dir is already per-user
+    return st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def read_state(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # The file holds the auth key, so only trust one this user wrote and nobody else can read
+    flags = os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0)
+    try:
+        fd = os.open(path or state_path(), flags)
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, 'r', encoding='utf-8') as f:
+            if not is_private(os.fstat(f.fileno())):
+                return None
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and state.get('protocol') == PROTOCOL else None
+
+
+def connect(state_file: Optional[str] = None):
+    """Authenticated connection to the running server, or None."""
+    state = read_state(state_file)
+    if state is None:
+        return None
+    try:
+        return Client(state['address'], family=state['family'], authkey=bytes.fromhex(state['authkey']))
+    except Exception:
+        # Stale state file (server gone), failed handshake (AuthenticationError), malformed state
+        return None
+
+
+def request(message: Dict[str, Any], out=None, err=None, state_file: Optional[str] = None) -> Optional[int]:
+    """Send one request and relay the streamed output; None when no server could be reached."""
+    conn = connect(state_file)
+    if conn is None:
+        return None
+    out = out or sys.stdout
+    err = err or sys.stderr
+    with conn:
+        try:
+            conn.send(message)
+        except (OSError, EOFError):
+            return None  # nothing was run yet, so running in-process is safe
+        while True:
+            try:
+                kind, payload = conn.recv()
+            except (OSError, EOFError):
+                print("ERROR: Bridge server closed the connection mid-command; see its log.", file=err)
+                return 1
+            if kind == 'out':
+                out.write(payload)
+            elif kind == 'err':
+                err.write(payload)
+            elif kind == 'exit':
+                out.flush()
+                return payload
+
+
+def run_remote(argv: List[str]) -> Optional[int]:
+    return request({'op': 'run', 'argv': list(argv), 'cwd': os.getcwd()})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['--server-status']:
+        code = request({'op': 'status'})
+        if code is None:
+            print("Bridge server not running")
+        return 0 if code is not None else 1
+    if argv[:1] == ['--server-stop']:
+        code = request({'op': 'stop'})
+        print("Bridge server stopped" if code is not None else "Bridge server not running")
+        return 0
+    code = run_remote(argv)
+    if code is not None:
+        return code
+    # No server: the bridge itself, in this process
+    import prophecies_excel_bridge
+    prophecies_excel_bridge.main(argv)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
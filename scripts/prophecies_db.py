@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Indexed SQLite copy of prophecies.json (<name>.db) with a query API.
+
+Written by every bridge export next to the JSON (like <name>.refs.json) and rebuilt only when the
+JSON bytes changed. The JSON stays the source of truth; the database is derived and replaced
+atomically (temp file + rename).
+
+Tables (pos = index of the entry in prophecies.json):
+  prophecies  one row per entry: the entry as compact JSON
+  statuses    (term, pos) for every vocabulary term of a status ("Fulfilled / Ongoing" -> 2 rows)
+  categories  (term, pos) for the English and German category, lower-cased
+  ref_ranges  (book, start_id, end_id, pos, field): prophecyRef ('prophecy') and biblicalRef
+              ('fulfillment') compiled by bible_refs into packed verse-ID ranges, split per book
+              and indexed on (book, start_id); ref_spans holds each book's longest range, which
+              bounds how far before a query range an overlapping range can start
+  texts       contentless FTS5 over every flattened column except id (bilingual summaries,
+              categories, notes, refs, status); rowid = pos
+
+Text search matches word prefixes, case-insensitively ('lamb' finds "Lamb's", 'lam' finds "lamb");
+match='all' needs every word, 'any' one of them, 'phrase' the words in sequence.
+
+Usage:
+  python prophecies_db.py build --json ../public/prophecies.json
+  python prophecies_db.py query --json ../public/prophecies.json --touching "Isa 53"
+  python prophecies_db.py query --json ../public/prophecies.json --status fulfilled --text lamb
+  python prophecies_db.py bench --json ../public/prophecies.json      # indexed vs linear scan
+  python prophecies_db.py bench --rows 100000                          # synthetic dataset
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bible_refs import BOOK_FACTOR, parse_ref, ranges_overlap
+from prophecies_schema import status_terms
+from prophecies_stream import file_sha256
+
+STORE_SUFFIX = '.db'
+STORE_FORMAT = '1'  # bump when the schema or what is stored per entry changes
+MATCH_MODES = ('all', 'any', 'phrase')
+_WORD = re.compile(r'[^\W_]+')  # FTS5 unicode61 token characters: letters and digits
+
+
+def store_path(json_path: str) -> str:
+    root, _ = os.path.splitext(json_path)
+    return root + STORE_SUFFIX
+
+
+def _book_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+    """(book, start, end) pieces of verse-ID ranges; a range spanning books is cut at each book boundary."""
+    out = []
+    for start, end in ranges:
+        for book in range(start // BOOK_FACTOR, end // BOOK_FACTOR + 1):
+            out.append((book, max(start, book * BOOK_FACTOR), min(end, (book + 1) * BOOK_FACTOR - 1)))
+    return out
+
+
+def _text_columns(columns: Sequence[str]) -> List[int]:
+    return [i for i, c in enumerate(columns) if c != 'id']
+
+
+def _schema(columns: Sequence[str]) -> str:
+    text_cols = ', '.join(columns[i] for i in _text_columns(columns))
+    return f"""
+CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE prophecies (pos INTEGER PRIMARY KEY, entry TEXT NOT NULL);
+CREATE TABLE statuses (term TEXT NOT NULL, pos INTEGER NOT NULL, PRIMARY KEY (term, pos)) WITHOUT ROWID;
+CREATE TABLE categories (term TEXT NOT NULL, pos INTEGER NOT NULL, PRIMARY KEY (term, pos)) WITHOUT ROWID;
+CREATE TABLE ref_ranges (book INTEGER NOT NULL, start_id INTEGER NOT NULL, end_id INTEGER NOT NULL,
+                         pos INTEGER NOT NULL, field TEXT NOT NULL);
+CREATE INDEX ref_ranges_book ON ref_ranges (book, start_id);
+CREATE TABLE ref_spans (book INTEGER PRIMARY KEY, max_span INTEGER NOT NULL);
+CREATE VIRTUAL TABLE texts USING fts5({text_cols}, content='', tokenize='unicode61 remove_diacritics 0');
+"""
+
+
+def stored_sha(path: str) -> Optional[str]:
+    """Source sha256 recorded in an existing store of the current format, else None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        db = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            meta = dict(db.execute('SELECT name, value FROM meta'))
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+    return meta.get('source_sha') if meta.get('format') == STORE_FORMAT else None
+
+
+def build_store(path: str, entries: Iterable[Dict[str, Any]], flatten: Callable[[Dict[str, Any]], List[Any]],
+                columns: Sequence[str], source_sha: str = '') -> int:
+    """Write the store for entries to path (temp file + atomic rename); returns the entry count."""
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        db.execute('PRAGMA journal_mode=OFF')
+        db.execute('PRAGMA synchronous=OFF')
+        db.executescript(_schema(columns))
+        text_idx = _text_columns(columns)
+        insert_text = f"INSERT INTO texts (rowid, {', '.join(columns[i] for i in text_idx)}) VALUES (?, {', '.join('?' * len(text_idx))})"
+        rows, texts, statuses, categories, ranges = [], [], [], [], []
+        count = 0
+        for pos, e in enumerate(entries):
+            row = flatten(e)
+            rows.append((pos, json.dumps(e, ensure_ascii=False, separators=(',', ':'))))
+            texts.append((pos, *('' if row[i] is None else str(row[i]) for i in text_idx)))
+            statuses.extend((term, pos) for term in dict.fromkeys(status_terms(str(e.get('status') or ''))))
+            category = e.get('category') or {}
+            categories.extend((term, pos) for term in dict.fromkeys(str(category.get(lang) or '').strip().lower()
+                                                                    for lang in ('en', 'de')) if term)
+            for field, ref in (('prophecy', e.get('prophecyRef')), ('fulfillment', (e.get('fulfillment') or {}).get('biblicalRef'))):
+                ranges.extend((book, s, t, pos, field) for book, s, t in _book_ranges(parse_ref(ref or '').ranges))
+            count += 1
+        db.executemany('INSERT INTO prophecies VALUES (?, ?)', rows)
+        db.executemany(insert_text, texts)
+        db.executemany('INSERT INTO statuses VALUES (?, ?)', statuses)
+        db.executemany('INSERT INTO categories VALUES (?, ?)', categories)
+        db.executemany('INSERT INTO ref_ranges VALUES (?, ?, ?, ?, ?)', ranges)
+        spans: Dict[int, int] = {}
+        for book, start, end, _, _ in ranges:
+            spans[book] = max(spans.get(book, 0), end - start)
+        db.executemany('INSERT INTO ref_spans VALUES (?, ?)', spans.items())
+        db.execute("INSERT INTO texts(texts) VALUES ('optimize')")
+        db.executemany('INSERT INTO meta VALUES (?, ?)', [('format', STORE_FORMAT), ('source_sha', source_sha),
+                                                          ('entries', str(count))])
+        db.commit()
+        db.execute('ANALYZE')
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, path)
+    return count
+
+
+def write_store(json_path: str, entries: Iterable[Dict[str, Any]], flatten: Callable[[Dict[str, Any]], List[Any]],
+                columns: Sequence[str]) -> Tuple[str, bool]:
+    """Write <name>.db next to json_path unless it was built from the same JSON bytes; returns (path, written)."""
+    path = store_path(json_path)
+    sha = file_sha256(json_path) or ''
+    if sha and stored_sha(path) == sha:
+        return path, False
+    build_store(path, entries, flatten, columns, sha)
+    return path, True
+
+
+def fts_query(text: str, match: str = 'all') -> Optional[str]:
+    """FTS5 MATCH expression for free text (word prefixes); None when it has no words."""
+    words = _WORD.findall(text)
+    if not words:
+        return None
+    if match == 'phrase':
+        return '"' + ' '.join(words) + '"*'
+    return f" {'AND' if match == 'all' else 'OR'} ".join(f'"{w}"*' for w in words)
+
+
+class ProphecyStore:
+    """Read-only queries against a store written by build_store / write_store."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        self._spans = dict(self._db.execute('SELECT book, max_span FROM ref_spans'))
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> 'ProphecyStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _where(self, text: Optional[str], match: str, status: Optional[str], category: Optional[str],
+               touching: Optional[str], field: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        expr = fts_query(text, match) if text else None
+        if expr:
+            clauses.append('pos IN (SELECT rowid FROM texts WHERE texts MATCH ?)')
+            params.append(expr)
+        if status:
+            clauses.append('pos IN (SELECT pos FROM statuses WHERE term = ?)')
+            params.append(status.strip().lower())
+        if category:
+            clauses.append('pos IN (SELECT pos FROM categories WHERE term = ?)')
+            params.append(category.strip().lower())
+        if touching:
+            pieces = [p for p in _book_ranges(parse_ref(touching).ranges) if p[0] in self._spans]
+            if not pieces:
+                return '0', []  # no verse recognised, or no entry refers to the book
+            ors = ' OR '.join('(book = ? AND start_id BETWEEN ? AND ? AND end_id >= ?)' for _ in pieces)
+            sub = f'SELECT pos FROM ref_ranges WHERE ({ors})'
+            for book, start, end in pieces:
+                params += [book, start - self._spans[book], end, start]
+            if field:
+                sub += ' AND field = ?'
+                params.append(field)
+            clauses.append(f'pos IN ({sub})')
+        return (' AND '.join(clauses) or '1'), params
+
+    def search(self, text: Optional[str] = None, match: str = 'all', status: Optional[str] = None,
+               category: Optional[str] = None, touching: Optional[str] = None, field: Optional[str] = None,
+               limit: Optional[int] = None) -> List[int]:
+        """Positions (in prophecies.json order) of entries matching every given filter.
+
+        text: words (see match); status: one vocabulary term ('fulfilled'); category: English or
+        German category, case-insensitive; touching: a reference ('Isa 53', 'Isa 52:13-53:12'),
+        optionally limited to field 'prophecy' or 'fulfillment'.
+        """
+        where, params = self._where(text, match, status, category, touching, field)
+        sql = f'SELECT pos FROM prophecies WHERE {where} ORDER BY pos'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [pos for (pos,) in self._db.execute(sql, params)]
+
+    def count(self, text: Optional[str] = None, match: str = 'all', status: Optional[str] = None,
+              category: Optional[str] = None, touching: Optional[str] = None, field: Optional[str] = None) -> int:
+        where, params = self._where(text, match, status, category, touching, field)
+        return self._db.execute(f'SELECT COUNT(*) FROM prophecies WHERE {where}', params).fetchone()[0]
+
+    def entries(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        out = []
+        for i in range(0, len(positions), 500):
+            batch = list(positions[i:i + 500])
+            found = dict(self._db.execute(f"SELECT pos, entry FROM prophecies WHERE pos IN ({','.join('?' * len(batch))})", batch))
+            out.extend(json.loads(found[p]) for p in batch if p in found)
+        return out
+
+    def query(self, **filters) -> List[Dict[str, Any]]:
+        """Matching entries as dicts; same filters as search()."""
+        return self.entries(self.search(**filters))
+
+
+# ------------------ Linear reference (bench) ------------------
+
+
+def scan(entries: Sequence[Dict[str, Any]], rows: Sequence[Sequence[Any]], text: Optional[str] = None,
+         match: str = 'all', status: Optional[str] = None, category: Optional[str] = None,
+         touching: Optional[str] = None, field: Optional[str] = None) -> List[int]:
+    """search() semantics as a pass over every entry (rows = flattened entries, id column first)."""
+    words = [w.lower() for w in _WORD.findall(text or '')]
+    status = status.strip().lower() if status else None
+    category = category.strip().lower() if category else None
+    target = parse_ref(touching).ranges if touching else None
+    out = []
+    for pos, (e, row) in enumerate(zip(entries, rows)):
+        if status and status not in status_terms(str(e.get('status') or '')):
+            continue
+        if category:
+            cat = e.get('category') or {}
+            if category not in (str(cat.get('en') or '').lower(), str(cat.get('de') or '').lower()):
+                continue
+        if target is not None:
+            refs = []
+            if field in (None, 'prophecy'):
+                refs.append(e.get('prophecyRef') or '')
+            if field in (None, 'fulfillment'):
+                refs.append((e.get('fulfillment') or {}).get('biblicalRef') or '')
+            if not any(ranges_overlap(parse_ref(r).ranges, target) for r in refs):
+                continue
+        if words:
+            cells = [_WORD.findall(str(v).lower()) for v in row[1:]]
+            if match == 'phrase':
+                n = len(words)
+                hit = any(toks[i:i + n - 1] == words[:-1] and toks[i + n - 1].startswith(words[-1])
+                          for toks in cells for i in range(len(toks) - n + 1))
+            else:
+                found = [any(t.startswith(w) for toks in cells for t in toks) for w in words]
+                hit = all(found) if match == 'all' else any(found)
+            if not hit:
+                continue
+        out.append(pos)
+    return out
+
+
+BENCH_QUERIES = [
+    ('touching Isa 53', {'touching': 'Isa 53'}),
+    ('touching Matt 2 (fulfillment)', {'touching': 'Matt 2', 'field': 'fulfillment'}),
+    ('fulfilled + messiah', {'status': 'fulfilled', 'text': 'messiah'}),
+    ('text all: born bethlehem', {'text': 'born bethlehem'}),
+    ('text any: shepherd temple', {'text': 'shepherd temple', 'match': 'any'}),
+    ('phrase: pieces of silver', {'text': 'pieces of silver', 'match': 'phrase'}),
+    ('category Messianic', {'category': 'Messianic'}),
+    ('Isa 53 + fulfilled + servant', {'touching': 'Isa 53', 'status': 'fulfilled', 'text': 'servant'}),
+]
+
+
+def _bench(entries: List[Dict[str, Any]], flatten, columns, rounds: int) -> int:
+    import tempfile
+    path = os.path.join(tempfile.mkdtemp(prefix='prophecies-db-'), 'bench.db')
+    t0 = time.perf_counter()
+    build_store(path, entries, flatten, columns)
+    build = time.perf_counter() - t0
+    rows = [flatten(e) for e in entries]
+    print(f"entries={len(entries):,}  build {build:.2f}s  size {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"{'query':<30} {'hits':>7} {'scan ms':>10} {'store ms':>10} {'speedup':>8}")
+    mismatches = 0
+    with ProphecyStore(path) as store:
+        for label, filters in BENCH_QUERIES:
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                expected = scan(entries, rows, **filters)
+            t_scan = (time.perf_counter() - t0) / rounds
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                got = store.search(**filters)
+            t_store = (time.perf_counter() - t0) / rounds
+            flag = '' if got == expected else f'  MISMATCH ({len(got)} vs {len(expected)})'
+            mismatches += bool(flag)
+            print(f"{label:<30} {len(got):>7,} {t_scan * 1000:>10.2f} {t_store * 1000:>10.2f} {t_scan / t_store:>7.0f}x{flag}")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+    return 1 if mismatches else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="SQLite store for prophecies.json: build, query, benchmark")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    p = sub.add_parser('build', help='Write <json>.db next to the JSON (skipped when up to date)')
+    p.add_argument('--json', required=True)
+    p.add_argument('--force', action='store_true', help='Rebuild even if the store matches the JSON')
+    p = sub.add_parser('query', help='Print matching entries (prophecyRef / status / category)')
+    p.add_argument('--json', required=True, help='prophecies.json whose store is queried (built if missing)')
+    p.add_argument('--text')
+    p.add_argument('--match', choices=MATCH_MODES, default='all')
+    p.add_argument('--status')
+    p.add_argument('--category')
+    p.add_argument('--touching', help="Reference, e.g. 'Isa 53' or 'Isa 52:13-53:12'")
+    p.add_argument('--field', choices=['prophecy', 'fulfillment'])
+    p.add_argument('--limit', type=int)
+    p = sub.add_parser('bench', help='Indexed queries vs a linear scan (results must be identical)')
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument('--json')
+    src.add_argument('--rows', type=int, help='Synthetic dataset of this size (bench_bridge.synthetic_hierarchical)')
+    p.add_argument('--rounds', type=int, default=5)
+    args = ap.parse_args(argv)
+
+    from prophecies_excel_bridge import COLUMNS, load_and_migrate, row_from_entry
+    if args.cmd == 'bench':
+        if args.rows:
+            from bench_bridge import synthetic_hierarchical
+            entries = synthetic_hierarchical(args.rows)
+        else:
+            entries = load_and_migrate(args.json)
+        return _bench(entries, row_from_entry, COLUMNS, max(1, args.rounds))
+    path = store_path(args.json)
+    if args.cmd == 'build' or not os.path.exists(path):
+        if args.cmd == 'build' and args.force and os.path.exists(path):
+            os.remove(path)
+        path, written = write_store(args.json, load_and_migrate(args.json), row_from_entry, COLUMNS)
+        print(f"{'Wrote' if written else 'Unchanged'} {path}", file=sys.stderr if args.cmd == 'query' else sys.stdout)
+        if args.cmd == 'build':
+            return 0
+    with ProphecyStore(path) as store:
+        t0 = time.perf_counter()
+        positions = store.search(text=args.text, match=args.match, status=args.status, category=args.category,
+                                 touching=args.touching, field=args.field, limit=args.limit)
+        elapsed = time.perf_counter() - t0
+        for e in store.entries(positions):
+            print(f"{e.get('prophecyRef', '')}\t{e.get('status', '')}\t{(e.get('category') or {}).get('en', '')}")
+    print(f"{len(positions)} match(es) in {elapsed * 1000:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Keyed diff between two prophecy entry lists (e.g. prophecies.json vs the Excel sheet).
+
+Entries are matched on prophecyRef (falling back to id). Repeated or blank refs are
+matched by occurrence, so the n-th blank row on one side pairs with the n-th blank
+row on the other. Content is compared through a caller supplied flatten function
+(the bridge passes row_from_entry) so purely structural differences, such as a
+legacy summary layout, do not count as edits.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Entry = Dict[str, Any]
+
+
+def entry_key(e: Entry) -> str:
+    return str(e.get('prophecyRef') or e.get('id') or '')
+
+
+def _occurrence_keys(entries: Sequence[Entry]) -> List[Tuple[str, int]]:
+    seen: Dict[str, int] = {}
+    keys = []
+    for e in entries:
+        k = entry_key(e)
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        keys.append((k, n))
+    return keys
+
+
+class EntryDiff:
+    """Result of diff_entries(old, new).
+
+    inserted : [(new_index, entry)]
+    updated  : [(old_index, new_index, new_entry)]
+    deleted  : [(old_index, old_entry)]
+    matched  : {new_index: old_index} for unchanged entries
+    reordered: True if surviving entries appear in a different relative order
+    """
+
+    def __init__(self):
+        self.inserted: List[Tuple[int, Entry]] = []
+        self.updated: List[Tuple[int, int, Entry]] = []
+        self.deleted: List[Tuple[int, Entry]] = []
+        self.matched: Dict[int, int] = {}
+        self.reordered = False
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.matched)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted or self.reordered)
+
+    def summary(self) -> str:
+        parts = [f"{len(self.inserted)} inserted", f"{len(self.updated)} updated", f"{len(self.deleted)} deleted", f"{self.unchanged} unchanged"]
+        if self.reordered:
+            parts.append("order changed")
+        return ", ".join(parts)
+
+    def changed_refs(self) -> List[str]:
+        refs = [entry_key(e) for _, e in self.inserted]
+        refs += [entry_key(e) for _, _, e in self.updated]
+        refs += [entry_key(e) for _, e in self.deleted]
+        return refs
+
+
+def diff_entries(old: Sequence[Entry], new: Sequence[Entry], flatten: Optional[Callable[[Entry], Any]] = None) -> EntryDiff:
+    """Compute inserted / updated / deleted entries turning old into new."""
+    flatten = flatten or (lambda e: e)
+    d = EntryDiff()
+    old_index = {k: i for i, k in enumerate(_occurrence_keys(old))}
+    survivors: List[int] = []
+    for ni, k in enumerate(_occurrence_keys(new)):
+        oi = old_index.pop(k, None)
+        if oi is None:
+            d.inserted.append((ni, new[ni]))
+            continue
+        survivors.append(oi)
+        if flatten(old[oi]) == flatten(new[ni]):
+            d.matched[ni] = oi
+        else:
+            d.updated.append((oi, ni, new[ni]))
+    d.deleted = sorted(((oi, old[oi]) for oi in old_index.values()), key=lambda t: t[0])
+    d.reordered = any(a > b for a, b in zip(survivors, survivors[1:]))
+    return d
+
+
+def merge_entries(old: Sequence[Entry], new: Sequence[Entry], d: EntryDiff) -> List[Entry]:
+    """Return new ordering where unchanged entries keep their original object.
+
+    Untouched records therefore serialize byte-identically (including any extra keys the
+    sheet does not carry), which keeps git churn limited to the edited records.
+    """
+    return [old[d.matched[i]] if i in d.matched else e for i, e in enumerate(new)]
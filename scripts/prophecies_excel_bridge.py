@@ -3,16 +3,61 @@
 
 Usage:
   python prophecies_excel_bridge.py --mode transform --json path/to/prophecies.json
+  python prophecies_excel_bridge.py --mode transform --workers 8 --json big.json  # migrate in worker processes
   python prophecies_excel_bridge.py --mode import --json path/to/prophecies.json --workbook <ignored>  # import JSON -> active Excel via COM
   python prophecies_excel_bridge.py --mode export --json path/to/prophecies.json --workbook <ignored>  # export sheet -> JSON
+  python prophecies_excel_bridge.py --mode export --diff --json path/to/prophecies.json  # only changed records; skip write if none
+  python prophecies_excel_bridge.py --mode export --backend xlsx --workbook BibleProphecies.xlsm --json ...  # no Excel needed
+  python prophecies_excel_bridge.py --mode validate --json path/to/prophecies.json --validation-report report.json
+  python prophecies_excel_bridge.py --serve --json path/to/prophecies.json  # warm server for prophecies_client.py
+  python prophecies_excel_bridge.py --watch --json path/to/prophecies.json --workbook BibleProphecies.xlsm  # sync on save
 
 Modes:
   transform : Upgrade legacy flat JSON (prophecyText, fulfillmentRef, etc.) to hierarchical schema.
   import    : Ensure JSON upgraded then write rows to sheet 'bible_prophecies'.
   export    : Read rows from sheet and write hierarchical JSON.
+  validate  : Check the JSON against the schema (prophecies_schema.py) and report every violation by row.
+
+Export validates each sheet row while parsing it (prophecies_schema.py: refs against the canonical
+book table, status vocabulary, bilingual completeness, duplicate / missing / shifted prophecy_ref).
+All violations are reported by sheet row; the export is aborted only if there are errors.
+
+JSON files are streamed (prophecies_stream.py): elements are read and migrated one at a time and
+written through a temp file + atomic rename, byte-identical to json.dump(..., indent=2).
+transform --workers N splits the array into chunks of raw element text (--chunk-size characters);
+worker processes decode, migrate and serialize them and the results are written back in input
+order through the same writer, so the output bytes do not depend on N.
+
+Import keeps a content-hash cache next to the JSON (<name>.cache.sqlite, prophecies_cache.py):
+each element's migrated text and sheet row, keyed by a hash of its raw JSON, plus the entry keys
+of every file it wrote. Re-importing an unchanged file skips the JSON scan, the migration and the
+rewrite; after edits only the changed elements are migrated. The JSON is rewritten only when the
+output bytes would differ. --no-cache turns it off; --cache-size bounds it (LRU).
+
+--serve keeps one process running (prophecies_server.py) that prophecies_client.py, called with
+the same arguments, hands each command to: imports, the Excel COM attach and parsed datasets stay
+warm between button clicks. Without a running server the client runs the bridge in-process.
+
+--watch (prophecies_watch.py) polls --json and --workbook and, once a burst of saves has settled
+(--debounce), runs export --diff for a saved workbook or import --diff for a changed JSON. Content
+hashes recorded after each sync keep its own writes from triggering the other direction.
 
 Excel Interaction:
   Implemented via COM (win32com). The Excel workbook must already be open (buttons trigger this script).
+  Export reads the header-bounded block in a single Range(...).Value call and parses it in Python;
+  import builds the full value matrix in Python and assigns it to one Range (formatting applied once after);
+  excel_fake.py provides a call-counting stand-in for exercising this without Excel.
+  --backend xlsx reads/writes the workbook file directly (prophecies_xlsx.py, stdlib streaming reads)
+  for machines without Excel; sheet resolution is identical to the COM path.
+
+Run output is captured into a bounded ring (prophecies_log.py) and written by a background thread:
+the workbook's Logs sheet in one Range write at the end, or prophecies_bridge.log next to the JSON
+when Excel is not reachable; --log-file adds a rotating file written during the run.
+
+Export also writes <json>.refs.json (bible_refs.py): prophecyRef / biblicalRef compiled into packed
+verse-ID ranges (book*1000000 + chapter*1000 + verse) so consumers need no runtime regex parsing,
+and <json>.db (prophecies_db.py, unless --no-store): SQLite with FTS5 over the text fields, status /
+category indexes and a verse-range table, rebuilt only when the JSON bytes changed.
 
 Schema (Excel columns):
   id | summary_prophecy | summary_fulfillment | category_en | status | category_de | prophecyRef | biblicalFulfillmentRef | externalFulfillmentRef_en | externalFulfillmentRef_de | notes_en | notes_de
@@ -35,19 +80,37 @@ Anything unmapped in legacy rows is appended to notes.en.
 """
 from __future__ import annotations
 import argparse
+import collections
+import contextlib
 import json
 import re
 import sys
 import os
-import textwrap
 import time
 import shutil
-import datetime
-from typing import List, Dict, Any
+import sqlite3
+import hashlib
+from collections.abc import Sequence as SequenceABC
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+import prophecies_log
+import prophecies_profile
+from prophecies_profile import stage
+from bible_refs import write_ref_index
+from prophecies_cache import DEFAULT_MAX_ENTRIES, ContentCache, active_memo, content_key, default_cache_path, memoized
+from prophecies_db import write_store
+from prophecies_diff import EntryDiff, diff_entries, merge_entries
+from prophecies_schema import RowValidator, ValidationReport, is_status, validate_entries
+from prophecies_stream import (JsonArrayWriter, dumps_indented, file_sha256, is_indented_array, iter_indented_chunks,
+                               iter_json_array, iter_json_array_text)
 
 PRIMARY_SHEET = "prophecies"  # preferred / new name
 LEGACY_SHEET = "bible_prophecies"  # still accepted for backward compatibility
-LOG_SHEET = "Logs"  # sheet for captured run output
+LOG_CAPACITY = 5000  # log lines kept for the Logs sheet (oldest dropped first)
+TRANSFORM_CHUNK = 1 << 20  # characters of JSON per worker task in transform --workers
+# Bump when legacy_row_to_new / row_from_entry output changes: import caches (prophecies_cache.py) are keyed on it
+MIGRATION_VERSION = 1
 # Excel columns retain flat per-language summary columns even though internal JSON now uses nested summary.en / summary.de blocks.
 # NOTE: Order must match row_from_entry / entry_from_row. Added 'prophecy_ref' explicit column.
 COLUMNS = [
@@ -119,20 +182,182 @@ def legacy_row_to_new(obj: Dict[str, Any]) -> Dict[str, Any]:
     return new
 
 
-def load_and_migrate(json_path: str) -> List[Dict[str, Any]]:
+def iter_migrated(json_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream entries from json_path, upgrading legacy rows lazily (one element in memory at a time).
+
+    Raises json.JSONDecodeError on malformed input.
+    """
     if not os.path.exists(json_path):
+        return
+    for o in iter_json_array(json_path):
+        if isinstance(o, dict):
+            yield legacy_row_to_new(o)
+
+
+def migrated_entries(json_path: str) -> List[Dict[str, Any]]:
+    """list(iter_migrated(json_path)); reused while the file is unchanged when the --serve memo is on."""
+    return memoized('migrated', json_path, lambda: list(iter_migrated(json_path)))
+
+
+def load_and_migrate(json_path: str) -> List[Dict[str, Any]]:
+    try:
+        return migrated_entries(json_path)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: JSON parse failed: {e}", file=sys.stderr)
         return []
-    with open(json_path, 'r', encoding='utf-8') as f:
+
+
+def write_json_entries(json_path: str, entries: Iterable[Dict[str, Any]], skip_if_unchanged: bool = False) -> JsonArrayWriter:
+    """Stream entries to json_path via temp file + atomic rename; returns the writer (count / sha256 / changed)."""
+    with JsonArrayWriter(json_path, skip_if_unchanged=skip_if_unchanged) as w:
+        for e in entries:
+            w.write(e)
+    return w
+
+
+def migrate_chunk(text: str) -> Tuple[str, int]:
+    """Worker task: ','-separated raw elements -> (migrated entries encoded for JsonArrayWriter.write_encoded, count)."""
+    entries = [legacy_row_to_new(o) for o in json.loads('[' + text + ']') if isinstance(o, dict)]
+    return ',\n  '.join(dumps_indented(e, '  ') for e in entries), len(entries)
+
+
+def _joined_chunks(items: Iterable[str], chunk_chars: int) -> Iterator[str]:
+    chunk: List[str] = []
+    size = 0
+    for item in items:
+        chunk.append(item)
+        size += len(item)
+        if size >= chunk_chars:
+            yield ','.join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield ','.join(chunk)
+
+
+def transform_parallel(json_path: str, workers: int, chunk_size: int = TRANSFORM_CHUNK) -> JsonArrayWriter:
+    """op_transform's migration across a process pool; output is byte-identical to the serial path.
+
+    chunk_size is in characters of input JSON; at most 2 * workers chunks are in flight, so
+    memory stays bounded. Files in the indent=2 layout (everything this script writes) are
+    cut on element closing lines without scanning elements; should a piece fail to decode
+    (hand-edited layout), the run is repeated with the exact per-element scan.
+    """
+    if is_indented_array(json_path):
         try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"ERROR: JSON parse failed: {e}", file=sys.stderr)
-            return []
-    if not isinstance(data, list):
-        print("WARN: JSON root not list; wrapping")
-        data = [data]
-    migrated = [legacy_row_to_new(o) for o in data if isinstance(o, dict)]
-    return migrated
+            return _transform_pool(json_path, workers, iter_indented_chunks(json_path, chunk_size))
+        except json.JSONDecodeError:
+            pass
+    return _transform_pool(json_path, workers, _joined_chunks(iter_json_array_text(json_path), chunk_size))
+
+
+def _transform_pool(json_path: str, workers: int, chunks: Iterable[str]) -> JsonArrayWriter:
+    with JsonArrayWriter(json_path) as w, ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: collections.deque = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(migrate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                w.write_encoded(*pending.popleft().result())
+        while pending:
+            w.write_encoded(*pending.popleft().result())
+    return w
+
+
+class CachedEntries(SequenceABC):
+    """Migrated entries from migrate_cached: encoded JSON text and sheet rows; dicts decoded on first access."""
+
+    def __init__(self, encoded: List[str], rows: List[List[Any]], keys: List[bytes], source_sha: Optional[str],
+                 migrated: int = 0):
+        self.encoded = encoded
+        self.rows = rows
+        self.keys = keys
+        self.source_sha = source_sha
+        self.migrated = migrated  # elements not found in the cache
+        text = '[\n  ' + ',\n  '.join(encoded) + '\n]' if encoded else '[]'
+        # Same bytes JsonArrayWriter produces for these entries
+        self.output_sha = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+
+    def _decoded(self) -> List[Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = json.loads('[' + ','.join(self.encoded) + ']')
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    def __getitem__(self, i):
+        return self._decoded()[i]
+
+
+def _decode_rows(row_texts: List[str]) -> List[List[Any]]:
+    return json.loads('[' + ','.join(row_texts) + ']')
+
+
+def _migrate_texts(texts: List[str], cache: ContentCache, source_sha: Optional[str]) -> CachedEntries:
+    text_keys = [content_key(t) for t in texts]
+    hits = cache.get_many(text_keys)
+    encoded: List[str] = []
+    row_texts: List[str] = []
+    keys: List[bytes] = []
+    fresh = []
+    migrated = 0
+    for raw, key in zip(texts, text_keys):
+        hit = hits.get(key)
+        if hit is None:
+            obj = json.loads(raw)
+            if not isinstance(obj, dict):
+                continue
+            e = legacy_row_to_new(obj)
+            migrated += 1
+            hit = hits[key] = (dumps_indented(e, '  '), json.dumps(row_from_entry(e), ensure_ascii=False))
+            fresh.append((key, *hit))
+        enc, row = hit
+        if enc != raw:
+            # Legacy / reformatted element: the rewritten file holds enc, so it is cached under its own key too
+            key = content_key(enc)
+            if key not in hits:
+                hits[key] = hit
+                fresh.append((key, enc, row))
+        encoded.append(enc)
+        row_texts.append(row)
+        keys.append(key)
+    cache.put_many(fresh)
+    return CachedEntries(encoded, _decode_rows(row_texts), keys, source_sha, migrated)
+
+
+def migrate_cached(json_path: str, cache: ContentCache) -> CachedEntries:
+    """load_and_migrate through the content cache: only elements not seen before are decoded and migrated.
+
+    A file recorded by an earlier import (by its sha256) is served from the cache without
+    reading it. Other indent=2 files are cut into elements on their top-level closing lines;
+    should a piece not decode (hand-edited layout), the exact element scan is used instead.
+    Raises json.JSONDecodeError on malformed input and sqlite3.Error when the cache fails;
+    callers fall back to load_and_migrate.
+    """
+    if not os.path.exists(json_path):
+        return CachedEntries([], [], [], None)
+    source_sha = file_sha256(json_path)
+    keys = cache.file_keys(source_sha)
+    if keys is not None:
+        hits = cache.get_many(keys)
+        if all(k in hits for k in keys):
+            return CachedEntries([hits[k][0] for k in keys], _decode_rows([hits[k][1] for k in keys]), keys, source_sha)
+    if is_indented_array(json_path):
+        try:
+            return _migrate_texts([piece.strip() for piece in iter_indented_chunks(json_path, 1)], cache, source_sha)
+        except json.JSONDecodeError:
+            pass
+    return _migrate_texts(list(iter_json_array_text(json_path)), cache, source_sha)
+
+
+def write_cached(json_path: str, migrated: CachedEntries, cache: ContentCache) -> bool:
+    """Write migrated entries unless json_path already holds exactly that output; records the file in the cache."""
+    changed = migrated.output_sha != migrated.source_sha
+    if changed:
+        with JsonArrayWriter(json_path) as w:
+            w.write_encoded(',\n  '.join(migrated.encoded), len(migrated.encoded))
+    cache.put_file(migrated.output_sha, migrated.keys)
+    return changed
 
 # ------------------ Flatten / Inflate for Excel ------------------
 
@@ -178,10 +403,8 @@ def entry_from_row(values: List[str]) -> Dict[str, Any]:
         values.append('')
     (rid, sp_en, sf_en, sp_de, sf_de, cat_en, status, cat_de, prophecy_ref, biblical_ref,
      ext_en, ext_de, notes_en, notes_de) = values[:len(COLUMNS)]
-    # If id column accidentally contains a status (user shifted columns), leave prophecy_ref blank so duplicate detection warns.
-    invalid_ids = {"fulfilled", "partial", "partial / ongoing", "fulfilled / partial", "fulfilled / ongoing", "fulfilled (typological)"}
-    raw_id_norm = (rid or '').strip().lower()
-    if raw_id_norm in invalid_ids:
+    # If id column accidentally contains a status (user shifted columns), leave prophecy_ref blank so validation flags it.
+    if is_status((rid or '').strip()):
         # treat as empty id; will be flagged
         rid = ''
     prophecy_ref = prophecy_ref or rid
@@ -234,16 +457,23 @@ def _normalize_header(h: str) -> str:
 
 
 def entry_from_row_headers(headers: List[str], ws, ri: int) -> Dict[str, Any]:
+    # Per-row COM variant kept for callers outside the bulk export path
+    row = []
+    for idx in range(1, len(headers)+1):
+        try:
+            row.append(ws.Cells(ri, idx).Value)
+        except Exception:
+            row.append('')
+    return entry_from_values([_normalize_header(h) for h in headers], row)
+
+
+def entry_from_values(norm_headers: List[str], row: Sequence[Any]) -> Dict[str, Any]:
+    """Build hierarchical entry from one row of raw cell values (pure Python, no COM)."""
     # Build map header->value (first occurrence wins)
-    norm_headers = [_normalize_header(h) for h in headers]
     values: Dict[str, str] = {}
-    for idx, h in enumerate(norm_headers, start=1):
+    for h, cell_v in zip(norm_headers, row):
         if not h:
             continue
-        try:
-            cell_v = ws.Cells(ri, idx).Value
-        except Exception:
-            cell_v = ''
         if cell_v is None:
             cell_v = ''
         # Avoid overwriting if duplicate header names
@@ -270,6 +500,246 @@ def entry_from_row_headers(headers: List[str], ws, ri: int) -> Dict[str, Any]:
         'notes': {'en': values.get('notes_en', ''), 'de': values.get('notes_de', '')}
     }
 
+# ------------------ Bulk sheet reads ------------------
+
+
+def _as_matrix(value) -> List[tuple]:
+    # Range.Value returns a scalar for single cells and a tuple of row tuples otherwise
+    if value is None:
+        return []
+    if not isinstance(value, (tuple, list)):
+        return [(value,)]
+    return [tuple(r) if isinstance(r, (tuple, list)) else (r,) for r in value]
+
+
+def read_sheet_block(ws) -> List[tuple]:
+    """Read header row plus all data rows in a single Range(...).Value round trip.
+
+    The block is bounded by the header width (len(COLUMNS)) and the last used row,
+    determined independently of AutoFilter (hidden rows are still included).
+    """
+    try:
+        used = ws.UsedRange
+        last_row = used.Row + used.Rows.Count - 1
+    except Exception:
+        last_row = ws.Cells(ws.Rows.Count, 1).End(-4162).Row  # fallback (xlUp = -4162)
+    last_row = max(1, last_row)
+    return _as_matrix(ws.Range(ws.Cells(1, 1), ws.Cells(last_row, len(COLUMNS))).Value)
+
+
+def _iter_block_rows(block: Sequence[Sequence[Any]], report: Optional[ValidationReport] = None, strict: bool = False):
+    """Yield (sheet_row, entry) for every non-blank data row of a sheet block (validated into report if given)."""
+    if not block:
+        return
+    headers = [str(v).strip().lower() if v is not None else '' for v in block[0]]
+    norm_headers = [_normalize_header(h) for h in headers]
+    validator = RowValidator(norm_headers, strict) if report is not None else None
+    for ri, row in enumerate(block[1:], start=2):
+        # Blank row: every cell within header width empty
+        if all(v in (None, '') for v in row[:len(headers)]):
+            continue
+        if validator is not None:
+            validator.check(ri, row, report)
+        yield ri, entry_from_values(norm_headers, row)
+
+
+def entries_from_block(block: Sequence[Sequence[Any]], strict: bool = False) -> Tuple[List[Dict[str, Any]], ValidationReport]:
+    """Parse a sheet block (row 1 = headers) into entries, validating every row in the same pass.
+
+    Returns (entries, report); report lists every violation by sheet row (duplicate
+    prophecy_ref included) and report.ok is False if any of them is an error. strict makes
+    rows without a usable prophecy_ref errors as well (prophecies_schema).
+    """
+    report = ValidationReport()
+    entries = [entry for _, entry in _iter_block_rows(block, report, strict)]
+    return entries, report
+
+
+def export_entries(ws, strict: bool = False) -> Tuple[List[Dict[str, Any]], ValidationReport]:
+    """Read all entries from worksheet with O(1) COM round trips."""
+    return entries_from_block(read_sheet_block(ws), strict)
+
+# ------------------ Bulk sheet writes ------------------
+
+XL_CALCULATION_MANUAL = -4135
+# Cap width for verbose text columns (summaries, notes) to ~80 chars (~120 width units)
+MAX_COLUMN_WIDTH = 120
+CAPPED_COLUMNS = [2, 3, 4, 5, 13, 14]  # 1-based indices
+
+
+@contextlib.contextmanager
+def suspend_excel_updates(excel):
+    """Disable ScreenUpdating / automatic calculation for the duration of a bulk write."""
+    saved = {}
+    if excel is not None:
+        for attr, value in (('ScreenUpdating', False), ('Calculation', XL_CALCULATION_MANUAL)):
+            try:
+                saved[attr] = getattr(excel, attr)
+                setattr(excel, attr, value)
+            except Exception:
+                pass
+    try:
+        yield
+    finally:
+        for attr, value in saved.items():
+            try:
+                setattr(excel, attr, value)
+            except Exception:
+                pass
+
+
+def _header_needs_rewrite(header_row: Sequence[Any]) -> bool:
+    cells = list(header_row) + [None] * (len(COLUMNS) - len(header_row))
+    existing_first = str(cells[0] or '').strip().lower()
+    second_header = str(cells[1] or '').strip().lower()
+    # Detect legacy header form and rewrite if column count / prophecy_ref position mismatch
+    legacy_detected = (existing_first == 'id' and second_header == 'summary_prophecy')
+    return legacy_detected or cells[len(COLUMNS)-1] is None or cells[8] != 'prophecy_ref'
+
+
+def write_entries(ws, entries: Sequence[Dict[str, Any]], excel=None, rows: Optional[Sequence[Sequence[Any]]] = None) -> int:
+    """Write header + all entry rows with a constant number of COM calls.
+
+    The full value matrix is built in Python and assigned to one Range; header styling,
+    AutoFit and width capping are applied once afterwards. rows, when given, are the
+    entries already flattened (row_from_entry). Returns rows written.
+    """
+    ncols = len(COLUMNS)
+    with stage('build_matrix'):
+        header_row = _as_matrix(ws.Range(ws.Cells(1, 1), ws.Cells(1, ncols)).Value)
+        rewrite_header = _header_needs_rewrite(header_row[0] if header_row else ())
+        matrix = [list(COLUMNS)] if rewrite_header else []
+        matrix.extend(rows if rows is not None else (row_from_entry(e) for e in entries))
+    first_row = 1 if rewrite_header else 2
+    with suspend_excel_updates(excel), stage('range_write'):
+        # Clear existing data below header
+        ws.Range(ws.Cells(2, 1), ws.Cells(ws.Rows.Count, ncols)).Clear()
+        if matrix:
+            ws.Range(ws.Cells(first_row, 1), ws.Cells(first_row + len(matrix) - 1, ncols)).Value = matrix
+    with stage('format_sheet'):
+        format_sheet(ws)
+    return len(entries)
+
+
+def format_sheet(ws):
+    # Header bold + auto-fit, then cap extremely wide columns to keep sheet usable
+    try:
+        ws.Rows(1).Font.Bold = True
+    except Exception:
+        pass
+    try:
+        ws.Columns.AutoFit()
+        for c in CAPPED_COLUMNS:
+            try:
+                col = ws.Columns(c)
+                if col.ColumnWidth > MAX_COLUMN_WIDTH:
+                    col.ColumnWidth = MAX_COLUMN_WIDTH
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+# ------------------ Incremental (diff) sync ------------------
+
+
+def _row_runs(rows: Sequence[int]) -> List[Tuple[int, int]]:
+    # Collapse sorted row numbers into contiguous (start, end) runs
+    runs: List[Tuple[int, int]] = []
+    for r in sorted(rows):
+        if runs and r == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], r)
+        else:
+            runs.append((r, r))
+    return runs
+
+
+def _plan_sync(block: Sequence[Sequence[Any]], entries: Sequence[Dict[str, Any]]):
+    # (diff, [(sheet_row, entry)]) or None when the header is not exactly COLUMNS
+    if not block or [str(v).strip().lower() if v is not None else '' for v in block[0]] != COLUMNS:
+        return None
+    rows = list(_iter_block_rows(block))
+    return diff_entries([e for _, e in rows], entries, flatten=row_from_entry), rows
+
+
+def _sync_ops(d: EntryDiff, rows: Sequence[Tuple[int, Dict[str, Any]]], block_len: int):
+    """Row deletions and insertions turning the sheet into the entry order, bottom-up.
+
+    Yields ('delete', first_row, last_row) and ('insert', row, matrix) in descending sheet row,
+    so each step leaves the rows above it where they were. Inserted entries go directly above
+    the next surviving entry of the JSON (or below the last row), keeping sheet order = JSON order.
+    """
+    survivor_rows = {ni: rows[oi][0] for ni, oi in d.matched.items()}
+    survivor_rows.update((ni, rows[oi][0]) for oi, ni, _ in d.updated)
+    inserted = dict(d.inserted)
+    groups: Dict[int, List[List[Any]]] = {}
+    anchor = block_len + 1  # below the last row
+    for ni in range(len(survivor_rows) + len(inserted) - 1, -1, -1):
+        if ni in inserted:
+            groups.setdefault(anchor, []).insert(0, row_from_entry(inserted[ni]))
+        else:
+            anchor = survivor_rows[ni]
+    ops = [(row, 1, ('insert', row, matrix)) for row, matrix in groups.items()]
+    ops += [(end, 0, ('delete', start, end)) for start, end in _row_runs([rows[oi][0] for oi, _ in d.deleted])]
+    # At equal rows the insertion (above that row) goes first, before deleting rows above it
+    for _, _, op in sorted(ops, reverse=True):
+        yield op
+
+
+def sync_sheet_rows(ws, entries: Sequence[Dict[str, Any]], excel=None) -> Optional[EntryDiff]:
+    """Touch only the sheet rows whose entry changed (keyed on prophecyRef).
+
+    Updated rows are rewritten in place, deleted rows removed and inserted entries placed
+    at their JSON position, bottom-up. Returns None when the sheet header does not match
+    COLUMNS exactly, in which case the caller should fall back to write_entries; a diff
+    with reordered set is returned without touching the sheet (the caller rewrites it).
+    """
+    block = read_sheet_block(ws)
+    plan = _plan_sync(block, entries)
+    if plan is None:
+        return None
+    d, rows = plan
+    if d.reordered or not (d.inserted or d.updated or d.deleted):
+        return d
+    ncols = len(COLUMNS)
+    with suspend_excel_updates(excel):
+        for oi, _, e in d.updated:
+            ri = rows[oi][0]
+            ws.Range(ws.Cells(ri, 1), ws.Cells(ri, ncols)).Value = [row_from_entry(e)]
+        for op in _sync_ops(d, rows, len(block)):
+            if op[0] == 'delete':
+                ws.Range(ws.Rows(op[1]), ws.Rows(op[2])).Delete()
+                continue
+            _, first, matrix = op
+            last = first + len(matrix) - 1
+            if first <= len(block):
+                ws.Range(ws.Rows(first), ws.Rows(last)).Insert()
+            ws.Range(ws.Cells(first, 1), ws.Cells(last, ncols)).Value = matrix
+    return d
+
+
+def sync_block(block: Sequence[Sequence[Any]], entries: Sequence[Dict[str, Any]]) -> Tuple[Optional[EntryDiff], List[List[Any]]]:
+    """Pure-Python counterpart of sync_sheet_rows for file backends: returns (diff, new block)."""
+    plan = _plan_sync(block, entries)
+    if plan is None:
+        return None, []
+    d, rows = plan
+    new_block = [list(r) for r in block]
+    if d.reordered:
+        return d, new_block
+    for oi, _, e in d.updated:
+        new_block[rows[oi][0] - 1] = row_from_entry(e)
+    for op in _sync_ops(d, rows, len(block)):
+        if op[0] == 'delete':
+            del new_block[op[1] - 1:op[2]]
+        else:
+            new_block[op[1] - 1:op[1] - 1] = op[2]
+    return d, new_block
+
+
+def write_json_if_changed(json_path: str, entries: Iterable[Dict[str, Any]]) -> bool:
+    """Write entries unless the file already holds byte-identical output; returns True if written."""
+    return write_json_entries(json_path, entries, skip_if_unchanged=True).changed
+
 # ------------------ Excel COM helpers ------------------
 
 
@@ -289,12 +759,18 @@ def connect_excel():
 # ------------------ Operations ------------------
 
 
-def op_transform(json_path: str):
-    migrated = load_and_migrate(json_path)
+def op_transform(json_path: str, workers: int = 1, chunk_size: int = TRANSFORM_CHUNK):
+    # Streamed end to end: read element -> migrate -> write element (temp file, atomic rename)
     # Backups disabled (git provides history)
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(migrated, f, ensure_ascii=False, indent=2)
-    print(f"Transformed {len(migrated)} entries -> {json_path}")
+    try:
+        if workers > 1 and os.path.exists(json_path):
+            w = transform_parallel(json_path, workers, chunk_size)
+        else:
+            w = write_json_entries(json_path, iter_migrated(json_path))
+    except json.JSONDecodeError as e:
+        print(f"ERROR: JSON parse failed: {e}; {json_path} left untouched.", file=sys.stderr)
+        sys.exit(1)
+    print(f"Transformed {w.count} entries -> {json_path}")
 
 
 def _resolve_sheet(wb, create_if_missing: bool):
@@ -332,181 +808,389 @@ def _resolve_sheet(wb, create_if_missing: bool):
     return None
 
 
-def op_import(json_path: str):
-    migrated = load_and_migrate(json_path)
-    # Persist upgraded format if legacy
-    # Backups disabled (git provides history)
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(migrated, f, ensure_ascii=False, indent=2)
-    excel = connect_excel()
-    # Assume single open workbook (the caller workbook). Use ActiveWorkbook
-    wb = excel.ActiveWorkbook
-    if wb is None:
-        print("ERROR: No active workbook.", file=sys.stderr)
-        sys.exit(1)
-    ws = _resolve_sheet(wb, create_if_missing=True)
-    if ws is None:
-        print("ERROR: Unable to create or access worksheet.", file=sys.stderr)
-        sys.exit(1)
-    # Write header
-    existing_first = str(ws.Cells(1, 1).Value or '').strip().lower()
-    second_header = str(ws.Cells(1, 2).Value or '').strip().lower()
-    # Detect legacy header form and clear if mismatch count
-    legacy_detected = (existing_first == 'id' and second_header == 'summary_prophecy')
-    if legacy_detected or ws.Cells(1, len(COLUMNS)).Value is None or ws.Cells(1, 9).Value != 'prophecy_ref':
-        for ci, col in enumerate(COLUMNS, start=1):
-            ws.Cells(1, ci).Value = col
-            ws.Cells(1, ci).Font.Bold = True
-    # Always ensure bold
-    try:
-        ws.Rows(1).Font.Bold = True
-    except Exception:
+# ------------------ Backends ------------------
+
+
+class ComBackend:
+    """Live Excel via COM: operates on the active workbook (the one whose button ran us)."""
+    name = 'com'
+
+    def __init__(self, excel=None):
+        # Counting proxy under --profile (prophecies_profile); the object itself otherwise
+        self.excel = prophecies_profile.wrap(excel or connect_excel(), 'Application')
+        # Assume single open workbook (the caller workbook). Use ActiveWorkbook
+        self.wb = self.excel.ActiveWorkbook
+        if self.wb is None:
+            print("ERROR: No active workbook.", file=sys.stderr)
+            sys.exit(1)
+
+    def resolve_sheet(self, create_if_missing: bool):
+        return _resolve_sheet(self.wb, create_if_missing)
+
+    def read_entries(self, ws, strict: bool = False) -> Tuple[List[Dict[str, Any]], ValidationReport]:
+        return export_entries(ws, strict)
+
+    def write_entries(self, ws, entries: Sequence[Dict[str, Any]], rows: Optional[Sequence[Sequence[Any]]] = None) -> int:
+        return write_entries(ws, entries, self.excel, rows)
+
+    def sync_entries(self, ws, entries: Sequence[Dict[str, Any]]) -> Optional[EntryDiff]:
+        return sync_sheet_rows(ws, entries, self.excel)
+
+    def save(self):
+        # Workbook stays open in Excel; the user decides when to save it
         pass
-    # simple autofit
-    try:
-        ws.Columns.AutoFit()
-    except Exception:
+
+    def message(self, text: str, icon: int, title: str):
+        try:
+            self.excel.Application.MsgBox(text, icon, title)
+        except Exception:
+            pass
+
+
+class XlsxBackend:
+    """Workbook file on disk (.xlsx / .xlsm) via prophecies_xlsx; no Excel process needed."""
+    name = 'xlsx'
+
+    def __init__(self, workbook_path: str):
+        from prophecies_xlsx import XlsxWorkbook
+        self.wb = XlsxWorkbook(normalize_json_path(workbook_path))
+
+    def resolve_sheet(self, create_if_missing: bool):
+        return _resolve_sheet(self.wb, create_if_missing)
+
+    def read_entries(self, ws, strict: bool = False) -> Tuple[List[Dict[str, Any]], ValidationReport]:
+        return entries_from_block(ws.read_block(len(COLUMNS)), strict)
+
+    def write_entries(self, ws, entries: Sequence[Dict[str, Any]], rows: Optional[Sequence[Sequence[Any]]] = None) -> int:
+        ws.write_block([list(COLUMNS)] + (list(rows) if rows is not None else [row_from_entry(e) for e in entries]))
+        return len(entries)
+
+    def sync_entries(self, ws, entries: Sequence[Dict[str, Any]]) -> Optional[EntryDiff]:
+        d, new_block = sync_block(ws.read_block(len(COLUMNS)), entries)
+        if d is not None and not d.reordered and (d.inserted or d.updated or d.deleted):
+            ws.write_block(new_block)
+        return d
+
+    def save(self):
+        self.wb.save()
+        self.wb.close()
+
+    def message(self, text: str, icon: int, title: str):
+        # No UI without Excel; the same text is already printed to stdout/stderr
         pass
-    # Clear existing data below header
-    ws.Range(ws.Cells(2, 1), ws.Cells(ws.Rows.Count, len(COLUMNS))).Clear()
-    for ri, entry in enumerate(migrated, start=2):
-        row = row_from_entry(entry)
-        for ci, val in enumerate(row, start=1):
-            ws.Cells(ri, ci).Value = val
-
-    # Auto-fit then cap extremely wide columns to keep sheet usable
+
+
+BACKENDS = {'com': ComBackend, 'xlsx': XlsxBackend}
+
+
+def open_backend(kind: str = 'com', workbook: Optional[str] = None, excel_factory=None):
+    if kind == 'xlsx':
+        if not workbook:
+            print("ERROR: --backend xlsx requires --workbook path/to/BibleProphecies.xlsm", file=sys.stderr)
+            sys.exit(1)
+        return XlsxBackend(workbook)
+    return ComBackend(excel_factory() if excel_factory is not None else None)
+
+
+def open_import_cache(json_path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> Optional[ContentCache]:
+    """Content cache next to json_path, keyed on this script's migration; None (with a warning) if unusable."""
+    path = default_cache_path(normalize_json_path(json_path))
     try:
-        ws.Columns.AutoFit()
-        # Cap width for verbose text columns (summaries, notes) to ~80 chars (~120 width units)
-        max_width = 120
-        cap_cols = [2, 3, 4, 5, 13, 14]  # 1-based indices
-        for c in cap_cols:
-            try:
-                if ws.Columns(c).ColumnWidth > max_width:
-                    ws.Columns(c).ColumnWidth = max_width
-            except Exception:
-                pass
-    except Exception:
-        pass
+        return ContentCache(path, f"{MIGRATION_VERSION}:{','.join(COLUMNS)}", max_entries=max_entries)
+    except (sqlite3.Error, OSError) as e:
+        print(f"WARN: Import cache {path} unavailable ({e}); migrating without it", file=sys.stderr)
+        return None
+
+
+def close_import_cache(cache: Optional[ContentCache]):
+    if cache is None:
+        return
+    try:
+        cache.close()
+    except sqlite3.Error as e:
+        print(f"WARN: Could not update import cache ({e})", file=sys.stderr)
+
+
+def _import_cached(json_path: str, cache: ContentCache) -> Optional[CachedEntries]:
+    # None when the cache cannot be used; the caller then takes the uncached path
+    try:
+        with stage('load_and_migrate'):
+            migrated = memoized('cached', json_path, lambda: migrate_cached(json_path, cache))
+        with stage('write_json'):
+            if write_cached(json_path, migrated, cache):
+                print(f"Upgraded JSON rewritten -> {json_path}")
+    except json.JSONDecodeError:
+        return None  # load_and_migrate reports it
+    except sqlite3.Error as e:
+        print(f"WARN: Import cache unavailable ({e}); migrating without it", file=sys.stderr)
+        return None
+    print(f"Import cache: {len(migrated) - migrated.migrated} cached, {migrated.migrated} migrated")
+    return migrated
+
+
+def op_import(json_path: str, diff: bool = False, backend=None, cache: Optional[ContentCache] = None):
+    migrated = _import_cached(json_path, cache) if cache is not None else None
+    rows = migrated.rows if migrated is not None else None
+    if migrated is None:
+        with stage('load_and_migrate'):
+            migrated = load_and_migrate(json_path)
+        # Persist upgraded format if legacy
+        # Backups disabled (git provides history)
+        with stage('write_json'):
+            if diff:
+                if write_json_if_changed(json_path, migrated):
+                    print(f"Upgraded JSON rewritten -> {json_path}")
+            else:
+                write_json_entries(json_path, migrated)
+    backend = backend or ComBackend()
+    with stage('resolve_sheet'):
+        ws = backend.resolve_sheet(create_if_missing=True)
+    if ws is None:
+        print("ERROR: Unable to create or access worksheet.", file=sys.stderr)
+        sys.exit(1)
+    with stage('sync_entries'):
+        changes = backend.sync_entries(ws, migrated) if diff else None
+    if changes is not None and changes.reordered:
+        # Row moves are not patched in place; a full write keeps sheet order = JSON order
+        print(f"Diff import: {changes.summary()}; rewriting the whole sheet in JSON order.")
+        changes, diff = None, False
+    if changes is not None:
+        with stage('save'):
+            backend.save()
+        print(f"Diff import into sheet '{ws.Name}': {changes.summary()}")
+        with stage('message'):
+            backend.message(f"Import complete (diff): {changes.summary()}", 64, "Prophecies Import")
+        return
+    if diff:
+        print("Sheet header differs from expected columns; falling back to full import.")
+    # Single matrix assignment; formatting deferred until after the write
+    with stage('write_entries'):
+        backend.write_entries(ws, migrated, rows)
+    with stage('save'):
+        backend.save()
     print(f"Imported {len(migrated)} rows into sheet '{ws.Name}'")
+    with stage('message'):
+        backend.message(f"Import complete: {len(migrated)} rows", 64, "Prophecies Import")
+
+
+def emit_ref_index(json_path: str, entries: Sequence[Dict[str, Any]]):
+    """Write the verse-ID sidecar next to json_path; failures only warn (the JSON itself is already written)."""
     try:
-        excel.Application.MsgBox(f"Import complete: {len(migrated)} rows", 64, "Prophecies Import")
-    except Exception:
-        pass
+        path, written = write_ref_index(json_path, entries)
+    except Exception as e:
+        print(f"WARN: Could not write reference index ({e})", file=sys.stderr)
+        return
+    print(f"{'Wrote' if written else 'Reference index unchanged:'} {path}")
+
+
+def emit_store(json_path: str, entries: Sequence[Dict[str, Any]]):
+    """Write the indexed SQLite copy next to json_path (prophecies_db.py); failures only warn."""
+    try:
+        path, written = write_store(json_path, entries, row_from_entry, COLUMNS)
+    except Exception as e:
+        print(f"WARN: Could not write prophecy store ({e})", file=sys.stderr)
+        return
+    print(f"{'Wrote' if written else 'Prophecy store unchanged:'} {path}")
 
 
-def op_export(json_path: str):
-    excel = connect_excel()
-    wb = excel.ActiveWorkbook
-    if wb is None:
-        print("ERROR: No active workbook.", file=sys.stderr)
+def emit_validation(report: ValidationReport, report_path: Optional[str] = None):
+    """Print the row-indexed report (errors to stderr) and optionally save it as JSON."""
+    if report.violations:
+        stream = sys.stdout if report.ok else sys.stderr
+        for line in report.format():
+            print(line, file=stream)
+    if report_path:
+        try:
+            report.write(report_path)
+            print(f"Validation report -> {report_path}")
+        except OSError as e:
+            print(f"WARN: Could not write validation report ({e})", file=sys.stderr)
+
+
+def op_validate(json_path: str, report_path: Optional[str] = None, strict: bool = False):
+    try:
+        with stage('validate'):
+            # Streamed in one-shot runs; the server keeps the parsed file for the next command
+            source = migrated_entries(json_path) if active_memo() is not None else iter_migrated(json_path)
+            report = validate_entries(source, row_from_entry, COLUMNS, strict=strict)
+    except json.JSONDecodeError as e:
+        print(f"ERROR: JSON parse failed: {e}", file=sys.stderr)
         sys.exit(1)
-    ws = _resolve_sheet(wb, create_if_missing=False)
+    emit_validation(report, report_path)
+    print(f"Validated {json_path}: {report.summary()}")
+    if not report.ok:
+        sys.exit(1)
+
+
+def op_export(json_path: str, diff: bool = False, backend=None, report_path: Optional[str] = None,
+              store: bool = True, strict: bool = False):
+    backend = backend or ComBackend()
+    with stage('resolve_sheet'):
+        ws = backend.resolve_sheet(create_if_missing=False)
     if ws is None:
         print(f"ERROR: Sheet not found. Expected one named '{PRIMARY_SHEET}' or '{LEGACY_SHEET}', or with headers id/summary_prophecy in first row.", file=sys.stderr)
         sys.exit(1)
-    # Determine last used row independent of filters (AutoFilter hides rows so End(xlUp) can stop early)
-    try:
-        last_row = ws.UsedRange.Row + ws.UsedRange.Rows.Count - 1
-    except Exception:
-        last_row = ws.Cells(ws.Rows.Count, 1).End(-4162).Row  # fallback (xlUp = -4162)
-    entries = []
-    seen_prophecy_refs = {}
-    headers = _read_headers(ws)
-    # Iterate over every physical row index (filtered rows may be Hidden but still processed)
-    for ri in range(2, last_row+1):
-        # Determine blank row based on actual headers length
-        row_blank = True
-        for ci, _ in enumerate(headers, start=1):
-            try:
-                v = ws.Cells(ri, ci).Value
-            except Exception:
-                v = None
-            if v not in (None, ''):
-                row_blank = False
-                break
-        if row_blank:
-            continue
-        entry = entry_from_row_headers(headers, ws, ri)
-        # Uniqueness requirement: prophecy_ref column (mirrored into id)
-        pid = entry.get('prophecyRef', '') or entry.get('id', '')
-        if pid:
-            seen_prophecy_refs.setdefault(pid, []).append(ri)
-        entries.append(entry)
-    # Duplicate prophecy_ref check (biblical_ref duplicates allowed)
-    duplicates = {k: v for k, v in seen_prophecy_refs.items() if len(v) > 1}
-    if duplicates:
-        msg_lines = ["Duplicate prophecy_ref detected – export aborted:"]
-        for k, rows in duplicates.items():
-            msg_lines.append(f"  {k} (rows {', '.join(map(str, rows))})")
-        full_msg = "\n".join(msg_lines)
-        print(full_msg, file=sys.stderr)
-        try:
-            excel.Application.MsgBox(full_msg, 16, "Prophecies Export Error")
-        except Exception:
-            pass
+    # Whole header-bounded block in one read; parsing happens in pure Python
+    # Rows are validated while they are parsed; every violation is reported, errors abort
+    with stage('read_entries'):
+        entries, report = backend.read_entries(ws, strict)
+    emit_validation(report, report_path)
+    if not report.ok:
+        msg = "\n".join([f"Validation errors in sheet '{ws.Name}' – export aborted:"] + report.format(detail=2)[1:40])
+        print(f"ERROR: export aborted ({report.summary()})", file=sys.stderr)
+        backend.message(msg, 16, "Prophecies Export Error")
         sys.exit(1)
     # Normalize JSON path (strip surrounding quotes / whitespace)
     json_path = normalize_json_path(json_path)
-    # Direct overwrite (no backup) per user request
-    before_mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else None
+    if diff:
+        with stage('load_and_migrate'):
+            existing = load_and_migrate(json_path)
+        with stage('diff'):
+            changes = diff_entries(existing, entries, flatten=row_from_entry)
+        print(f"Diff vs {json_path}: {changes.summary()}")
+        if not changes:
+            print(f"No changes in sheet '{ws.Name}'; JSON left untouched.")
+            with stage('ref_index'):
+                emit_ref_index(json_path, existing)
+            if store:
+                with stage('store'):
+                    emit_store(json_path, existing)
+            with stage('message'):
+                backend.message("Export skipped: no changes.", 64, "Prophecies Export")
+            return
+        # Unchanged records keep their original object so they serialize identically
+        entries = merge_entries(existing, entries, changes)
+    # Direct overwrite (no backup) per user request; temp file + atomic rename
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(entries, f, ensure_ascii=False, indent=2)
-            f.flush()
-            os.fsync(f.fileno())
+        with stage('write_json'):
+            writer = write_json_entries(json_path, entries)
     except Exception as e:
         err = f"ERROR: Failed writing JSON ({e}). Path: {json_path}"
         print(err, file=sys.stderr)
-        try:
-            excel.Application.MsgBox(err, 16, "Prophecies Export Error")
-        except Exception:
-            pass
+        backend.message(err, 16, "Prophecies Export Error")
         sys.exit(1)
-    after_mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else None
     verification = []
-    # Load back & count to confirm (mtime may not change if export happens within same second)
-    try:
-        with open(json_path, 'r', encoding='utf-8') as vf:
-            reloaded = json.load(vf)
-        if not isinstance(reloaded, list) or len(reloaded) != len(entries):
-            verification.append(f"Reload count mismatch (expected {len(entries)}, got {len(reloaded) if isinstance(reloaded, list) else 'non-list'})")
-    except Exception as e:
-        verification.append(f"Reload failed: {e}")
+    # Verify from running count + hash of bytes written (no JSON reload)
+    if writer.count != len(entries):
+        verification.append(f"Write count mismatch (expected {len(entries)}, wrote {writer.count})")
+    with stage('verify'):
+        hash_error = writer.verify()
+    if hash_error:
+        verification.append(hash_error)
     ver_msg = ("\n" + "\n".join(verification)) if verification else ""
     print(f"Exported {len(entries)} rows from sheet '{ws.Name}' -> {json_path}{ver_msg}")
-    try:
-        extra = ("\n" + "\n".join(verification)) if verification else ""
-        icon = 48 if verification else 64  # warning vs info
-        excel.Application.MsgBox(f"Export complete: {len(entries)} rows written.{extra}", icon, "Prophecies Export")
-    except Exception:
-        pass
+    with stage('ref_index'):
+        emit_ref_index(json_path, entries)
+    if store:
+        with stage('store'):
+            emit_store(json_path, entries)
+    extra = ("\n" + "\n".join(verification)) if verification else ""
+    icon = 48 if verification else 64  # warning vs info
+    with stage('message'):
+        backend.message(f"Export complete: {len(entries)} rows written.{extra}", icon, "Prophecies Export")
 
 # ------------------ Main ------------------
 
 
-def main():
-    install_logging_hooks()
+def emit_profile(args, prof: prophecies_profile.Profiler):
+    report = prof.report(mode=args.mode, backend=args.backend, diff=args.diff)
+    for line in prophecies_profile.format_report(report):
+        print(line)
+    path = args.profile or os.path.join(os.path.dirname(os.path.abspath(args.json)), 'prophecies_bridge.profile.json')
+    try:
+        prophecies_profile.write_report(path, report)
+        print(f"Profile report -> {path}")
+    except OSError as e:
+        print(f"WARN: Could not write profile report ({e})", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(description="Excel / JSON prophecy bridge")
-    ap.add_argument('--mode', choices=['transform', 'import', 'export'], default='transform')
-    ap.add_argument('--json', required=True, help='Path to prophecies.json')
+    ap.add_argument('--mode', choices=['transform', 'import', 'export', 'validate'], default='transform')
+    ap.add_argument('--json', help='Path to prophecies.json (required, except with --serve)')
     ap.add_argument('--workbook', help='(Optional) Workbook path (not strictly needed when called from button)')
-    args = ap.parse_args()
-
-    if args.mode == 'transform':
-        op_transform(args.json)
-    elif args.mode == 'import':
-        op_import(args.json)
-    elif args.mode == 'export':
-        op_export(args.json)
+    ap.add_argument('--backend', choices=sorted(BACKENDS), default='com', help='com: live Excel via win32com (default); xlsx: read/write the --workbook file directly (no Excel needed)')
+    ap.add_argument('--diff', action='store_true', help='import/export: only touch rows / records changed since last sync (keyed on prophecyRef)')
+    ap.add_argument('--workers', type=int, default=1, help='transform: worker processes (0 = CPU count; default 1 = in-process)')
+    ap.add_argument('--chunk-size', type=int, default=TRANSFORM_CHUNK, help=f'transform --workers: characters of JSON per worker task (default {TRANSFORM_CHUNK})')
+    ap.add_argument('--validation-report', metavar='REPORT.json', help='export / validate: also write every violation (row, field, code, severity, message) as JSON')
+    ap.add_argument('--strict', action='store_true', help='export / validate: rows without a usable prophecy_ref (empty, or a status word) are errors, not warnings')
+    ap.add_argument('--no-cache', action='store_true', help='import: do not use the content-hash cache next to --json (<name>.cache.sqlite)')
+    ap.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES, help=f'import: entries kept in the cache, least recently used evicted first (default {DEFAULT_MAX_ENTRIES})')
+    ap.add_argument('--no-store', action='store_true', help='export: do not write the indexed SQLite copy next to --json (<name>.db, prophecies_db.py)')
+    ap.add_argument('--log-file', help='Also append the run log to this rotating file (written in the background)')
+    ap.add_argument('--profile', nargs='?', const='', metavar='REPORT.json',
+                    help='Time each stage and count COM calls per call site; JSON report to REPORT.json '
+                         '(default: prophecies_bridge.profile.json next to --json), summary to the Logs sheet')
+    ap.add_argument('--serve', action='store_true',
+                    help='Run as a long-lived server for prophecies_client.py (prophecies_server.py); '
+                         '--json, if given, is loaded up front')
+    ap.add_argument('--watch', action='store_true',
+                    help='Keep running and sync on change (prophecies_watch.py): workbook saved -> export --diff, '
+                         '--json changed -> import --diff; needs --workbook')
+    ap.add_argument('--debounce', type=float, default=1.0, metavar='SECONDS',
+                    help='--watch: sync once a changed file has been quiet this long (default 1.0)')
+    ap.add_argument('--poll-interval', type=float, default=0.5, metavar='SECONDS',
+                    help='--watch: seconds between file checks (default 0.5)')
+    return ap
+
+
+def run(args: argparse.Namespace, excel_factory=None):
+    """Execute one parsed command line; excel_factory supplies a warm Excel object (--serve)."""
+    if args.profile is not None:
+        prophecies_profile.enable()
+    try:
+        with stage(args.mode):
+            if args.mode == 'transform':
+                op_transform(args.json, args.workers or os.cpu_count() or 1, max(1, args.chunk_size))
+            elif args.mode == 'import':
+                with stage('open_backend'):
+                    backend = open_backend(args.backend, args.workbook, excel_factory)
+                cache = None if args.no_cache else open_import_cache(args.json, args.cache_size)
+                try:
+                    op_import(args.json, diff=args.diff, backend=backend, cache=cache)
+                finally:
+                    close_import_cache(cache)
+            elif args.mode == 'export':
+                with stage('open_backend'):
+                    backend = open_backend(args.backend, args.workbook, excel_factory)
+                op_export(args.json, diff=args.diff, backend=backend, report_path=args.validation_report,
+                          store=not args.no_store, strict=args.strict)
+            elif args.mode == 'validate':
+                op_validate(args.json, args.validation_report, args.strict)
+    finally:
+        # Also on sys.exit() paths, so slow failures can be profiled too
+        if args.profile is not None:
+            emit_profile(args, prophecies_profile.disable())
+
+
+def main(argv: Optional[List[str]] = None):
+    log = install_logging_hooks()
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.serve:
+        import prophecies_server
+        log.fallback_file = os.path.join(os.path.abspath(os.path.dirname(args.json or '.')), 'prophecies_bridge.log')
+        prophecies_server.serve(args.json)
+        return
+    if not args.json:
+        ap.error('--json is required')
+    if args.watch and not args.workbook:
+        ap.error('--watch needs --workbook (the file whose saves trigger an export)')
+    if args.log_file:
+        log.file = prophecies_log.RotatingFile(args.log_file)
+    # Logs sheet in the calling workbook; without Excel the log lands next to the JSON instead
+    log.excel_target = args.backend == 'com'
+    log.fallback_file = os.path.join(os.path.dirname(os.path.abspath(args.json)), 'prophecies_bridge.log')
+    if args.watch:
+        import prophecies_watch
+        prophecies_watch.watch(args)
     else:
-        ap.error('Unknown mode')
-
-    # Attempt to flush log buffer to Excel (only if Excel accessible)
-    flush_logs_to_excel()
+        run(args)
 
+    # Final flush (Logs sheet in one Range write, or the log file) on the writer thread
+    log.close()
 
-# main() invocation moved to end so logging helpers are defined first
 
 # --------------- Utility (placed at end to avoid earlier clutter) ---------------
 
@@ -540,79 +1224,9 @@ def normalize_json_path(path: str) -> str:
 # --------------- Logging capture & Excel log sheet ---------------
 
 
-LOG_BUFFER: list[str] = []
-_ORIG_STDOUT = sys.stdout
-_ORIG_STDERR = sys.stderr
-_ORIG_EXIT = sys.exit
-
-
-class _TeeStream:
-    def __init__(self, orig, is_err: bool):
-        self._orig = orig
-        self._is_err = is_err
-
-    def write(self, data):
-        try:
-            self._orig.write(data)
-        except Exception:
-            pass
-        if data:
-            # Split to handle multi-line writes
-            for line in data.splitlines():
-                if line.strip():
-                    prefix = 'ERR ' if self._is_err else 'OUT '
-                    LOG_BUFFER.append(prefix + line.rstrip())
-
-    def flush(self):
-        try:
-            self._orig.flush()
-        except Exception:
-            pass
-
-
-def install_logging_hooks():
-    # Avoid double installation
-    if getattr(sys, '_prophecy_logger_installed', False):
-        return
-    sys.stdout = _TeeStream(sys.stdout, False)  # type: ignore
-    sys.stderr = _TeeStream(sys.stderr, True)   # type: ignore
-
-    def _exit_with_logs(code=0):
-        try:
-            flush_logs_to_excel()
-        except Exception:
-            pass
-        _ORIG_EXIT(code)
-
-    sys.exit = _exit_with_logs  # type: ignore
-    sys._prophecy_logger_installed = True  # type: ignore
-
-
-def flush_logs_to_excel():
-    # Only meaningful if Excel is running and workbook active
-    try:
-        import win32com.client  # type: ignore
-        excel = win32com.client.Dispatch("Excel.Application")
-        wb = excel.ActiveWorkbook
-        if wb is None:
-            return
-        # Get or create log sheet
-        try:
-            ws = wb.Worksheets(LOG_SHEET)
-        except Exception:
-            ws = wb.Worksheets.Add()
-            ws.Name = LOG_SHEET
-        # Clear sheet
-        ws.Cells.Clear()
-        ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ws.Cells(1, 1).Value = f"Bridge Logs - {ts}"
-        ws.Cells(1, 1).Font.Bold = True
-        # Write each log line starting row 3 for spacing
-        for idx, line in enumerate(LOG_BUFFER, start=3):
-            ws.Cells(idx, 1).Value = line
-    except Exception:
-        # Silently ignore; logging is auxiliary
-        return
+def install_logging_hooks() -> prophecies_log.LogSession:
+    """Bounded, leveled capture of stdout / stderr (prophecies_log.py); flushed off the main thread."""
+    return prophecies_log.install(capacity=LOG_CAPACITY)
 
 
 if __name__ == '__main__':
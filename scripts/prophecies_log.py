@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Bounded, leveled run log for prophecies_excel_bridge.py with a background writer.
+
+stdout / stderr are teed into a ring buffer of LogRecords (oldest records are dropped once
+`capacity` is reached, with a count kept), so a long batch run never grows memory without
+bound. The foreground only appends to the ring; all I/O happens on a daemon writer thread:
+
+  * with a log file: new records are appended every `interval` seconds to a rotating file
+    (<name>, <name>.1 ... <name>.<backups>, each at most `max_bytes`);
+  * at close: the ring is written to the workbook's Logs sheet in one Range(...).Value
+    assignment (COM initialised on the writer thread). When Excel is not reachable the
+    records go to the log file instead.
+
+close() waits at most `timeout` seconds for that final flush; it also runs at interpreter
+exit, so sys.exit() paths are covered without wrapping sys.exit.
+
+Usage:
+  session = install(capacity=5000)
+  session.log('WARN', 'something odd')      # print() to stdout / stderr is captured too
+  session.excel_target = True                # write the Logs sheet at close
+  session.fallback_file = 'prophecies_bridge.log'
+"""
+from __future__ import annotations
+import atexit
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+from typing import Callable, Deque, List, NamedTuple, Optional
+
+LOG_SHEET = "Logs"
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARN': 30, 'ERROR': 40}
+DEFAULT_CAPACITY = 5000
+DEFAULT_INTERVAL = 0.5
+DEFAULT_MAX_BYTES = 1 << 20
+DEFAULT_BACKUPS = 3
+CLOSE_TIMEOUT = 5.0
+
+
+class LogRecord(NamedTuple):
+    seq: int
+    ts: float
+    level: str
+    message: str
+
+    def format(self) -> str:
+        stamp = datetime.datetime.fromtimestamp(self.ts).strftime('%H:%M:%S')
+        return f"{stamp} {self.level:<5} {self.message}"
+
+
+def infer_level(line: str, is_err: bool) -> str:
+    """Level for a captured print(): the bridge prefixes stderr lines with ERROR: / WARN:."""
+    head = line.lstrip()[:8].upper()
+    if head.startswith('WARN'):
+        return 'WARN'
+    if head.startswith('ERROR') or is_err:
+        return 'ERROR'
+    return 'INFO'
+
+
+class RingLog:
+    """Thread-safe bounded record buffer; seq numbers let the writer take only new records."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, min_level: str = 'DEBUG'):
+        self.capacity = capacity
+        self.min_level = LEVELS[min_level]
+        self._records: Deque[LogRecord] = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.changed = threading.Event()
+
+    def append(self, level: str, message: str):
+        if LEVELS.get(level, 20) < self.min_level:
+            return
+        with self._lock:
+            self._seq += 1
+            self._records.append(LogRecord(self._seq, time.time(), level, message))
+        self.changed.set()
+
+    @property
+    def total(self) -> int:
+        return self._seq
+
+    @property
+    def dropped(self) -> int:
+        with self._lock:
+            return self._seq - len(self._records)
+
+    def since(self, seq: int) -> List[LogRecord]:
+        with self._lock:
+            if not self._records or self._records[-1].seq <= seq:
+                return []
+            skip = max(0, seq - self._records[0].seq + 1)
+            return list(self._records)[skip:]
+
+    def snapshot(self) -> List[LogRecord]:
+        return self.since(0)
+
+
+# ------------------ Sinks ------------------
+
+
+class RotatingFile:
+    """Append-only text log rotated by size: path -> path.1 -> ... -> path.<backups>."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, records: List[LogRecord]):
+        if not records:
+            return
+        text = ''.join(r.format() + '\n' for r in records).encode('utf-8')
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(text) > self.max_bytes:
+            self._rotate()
+        with open(self.path, 'ab') as f:
+            f.write(text)
+
+
+def write_excel_sheet(excel, records: List[LogRecord], dropped: int = 0) -> bool:
+    """Replace the Logs sheet of the active workbook with the records in one Range write."""
+    wb = excel.ActiveWorkbook
+    if wb is None:
+        return False
+    try:
+        ws = wb.Worksheets(LOG_SHEET)
+    except Exception:
+        ws = wb.Worksheets.Add()
+        ws.Name = LOG_SHEET
+    ts = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [[f"Bridge Logs - {ts}"], [f"({dropped} earlier lines dropped)" if dropped else '']]
+    rows += [[r.format()] for r in records]
+    ws.UsedRange.Clear()
+    ws.Range(ws.Cells(1, 1), ws.Cells(len(rows), 1)).Value = rows
+    ws.Cells(1, 1).Font.Bold = True
+    return True
+
+
+def _dispatch_excel():
+    import pythoncom  # type: ignore  # COM must be initialised on the thread that uses it
+    import win32com.client  # type: ignore
+    pythoncom.CoInitialize()
+    return win32com.client.Dispatch("Excel.Application")
+
+
+# ------------------ Session ------------------
+
+
+class _TeeStream:
+    def __init__(self, orig, is_err: bool, ring: RingLog):
+        self._orig = orig
+        self._is_err = is_err
+        self._ring = ring
+
+    def write(self, data):
+        try:
+            self._orig.write(data)
+        except Exception:
+            pass
+        if data:
+            for line in data.splitlines():
+                if line.strip():
+                    self._ring.append(infer_level(line, self._is_err), line.rstrip())
+        return len(data) if data else 0
+
+    def flush(self):
+        try:
+            self._orig.flush()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._orig, name)
+
+
+class LogSession:
+    """Ring buffer + writer thread; created by install()."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, log_file: Optional[str] = None,
+                 interval: float = DEFAULT_INTERVAL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS, excel_factory: Callable = _dispatch_excel):
+        self.ring = RingLog(capacity)
+        self.interval = interval
+        self.file = RotatingFile(log_file, max_bytes, backups) if log_file else None
+        self.fallback_file: Optional[str] = None
+        self.excel_target = False
+        self.excel_factory = excel_factory
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.result: Optional[str] = None   # 'excel' / 'file' / None after close()
+        self._written = 0
+        self._stop = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='bridge-log-writer', daemon=True)
+        self._thread.start()
+
+    def log(self, level: str, message: str):
+        self.ring.append(level, message)
+
+    def _drain_file(self):
+        if self.file is None:
+            return
+        records = self.ring.since(self._written)
+        if records:
+            self._written = records[-1].seq
+            self.file.write(records)
+
+    def _finish(self):
+        self._drain_file()
+        if self.excel_target:
+            try:
+                if write_excel_sheet(self.excel_factory(), self.ring.snapshot(), self.ring.dropped):
+                    self.result = 'excel'
+                    return
+            except Exception:
+                pass  # Excel gone / no pywin32: fall through to the file
+        if self.file is not None:
+            self.result = 'file'
+        elif self.fallback_file and self.ring.total:
+            RotatingFile(self.fallback_file, self.max_bytes, self.backups).write(self.ring.snapshot())
+            self.result = 'file'
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.ring.changed.wait(self.interval)
+            if self._stop.is_set():
+                break
+            self.ring.changed.clear()
+            try:
+                self._drain_file()
+            except OSError:
+                pass  # logging is auxiliary
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> Optional[str]:
+        """Stop the writer after its final flush; waits at most `timeout` seconds."""
+        if not self._closed:
+            self._closed = True
+            self._stop.set()
+            self.ring.changed.set()
+            self._thread.join(timeout)
+        return self.result
+
+
+_SESSION: Optional[LogSession] = None
+
+
+def install(**kwargs) -> LogSession:
+    """Tee stdout / stderr into a new session (once per process) and close it at exit."""
+    global _SESSION
+    if _SESSION is not None:
+        return _SESSION
+    _SESSION = LogSession(**kwargs)
+    sys.stdout = _TeeStream(sys.stdout, False, _SESSION.ring)  # type: ignore
+    sys.stderr = _TeeStream(sys.stderr, True, _SESSION.ring)   # type: ignore
+    atexit.register(_SESSION.close)
+    return _SESSION
+
+
+def session() -> Optional[LogSession]:
+    return _SESSION
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Stage timings and COM call counts for prophecies_excel_bridge.py (--profile).
+
+Stages are nested wall-clock spans ("export/read_entries"); repeated spans are summed. COM
+traffic is counted by ComProxy, a transparent wrapper around the Excel Application object:
+every property get, property set and method call made through it (and through the objects it
+hands out: workbook, worksheets, ranges, fonts, columns) is tallied per call site, e.g.
+"Worksheet.Cells()", "Range.Value=" or "Columns.AutoFit()". Call counts depend only on the
+code path and the sheet contents, so against excel_fake they are exact and can gate
+regressions; wall times are reported alongside for humans.
+
+Profiling is off unless enable() was called; stage() and wrap() are then no-ops.
+
+Usage:
+  prof = enable()
+  with stage('import'):
+      backend = ComBackend(wrap(excel, 'Application'))
+      ...
+  report = prof.report(mode='import')
+"""
+from __future__ import annotations
+import contextlib
+import inspect
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional
+
+# Object kind handed out by a given call site, so counters read like the Excel object model
+_CHILD_KIND = {
+    'ActiveWorkbook': 'Workbook', 'Application': 'Application', 'Worksheets()': 'Worksheet',
+    'Worksheets[]': 'Worksheet', 'Add()': 'Worksheet', 'Cells()': 'Range', 'Range()': 'Range',
+    'UsedRange': 'Range', 'End()': 'Range', 'Rows()': 'Range', 'Columns()': 'Column', 'Rows': 'Rows',
+    'Columns': 'Columns', 'Worksheets': 'Worksheets', 'Font': 'Font',
+}
+_PLAIN = (str, bytes, int, float, bool, type(None), tuple, list, dict)
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, ComProxy) else value
+
+
+class ComProxy:
+    """Counting pass-through for a COM object; results that are COM objects are wrapped too."""
+
+    __slots__ = ('_target', '_kind', '_counter')
+
+    def __init__(self, target, kind: str, counter: Counter):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_kind', kind)
+        object.__setattr__(self, '_counter', counter)
+
+    def _wrap(self, value, site: str):
+        if isinstance(value, _PLAIN) or isinstance(value, ComProxy):
+            return value
+        return ComProxy(value, _CHILD_KIND.get(site, site.rstrip('()[]')), self._counter)
+
+    def _invoke(self, fn, site: str, args, kwargs):
+        self._counter[f"{self._kind}.{site}" if site != '()' else f"{self._kind}()"] += 1
+        result = fn(*(_unwrap(a) for a in args), **{k: _unwrap(v) for k, v in kwargs.items()})
+        return self._wrap(result, f"{self._kind}()" if site == '()' else site)
+
+    def __getattr__(self, name: str):
+        value = getattr(self._target, name)
+        if inspect.ismethod(value) or inspect.isbuiltin(value) or inspect.isfunction(value):
+            return lambda *args, **kwargs: self._invoke(value, f"{name}()", args, kwargs)
+        self._counter[f"{self._kind}.{name}"] += 1
+        return self._wrap(value, name)
+
+    def __setattr__(self, name: str, value):
+        self._counter[f"{self._kind}.{name}="] += 1
+        setattr(self._target, name, _unwrap(value))
+
+    def __call__(self, *args, **kwargs):
+        return self._invoke(self._target, '()', args, kwargs)
+
+    def __iter__(self):
+        self._counter[f"{self._kind}.__iter__"] += 1
+        for item in self._target:
+            yield self._wrap(item, f"{self._kind}[]")
+
+    def __eq__(self, other):
+        return self._target == _unwrap(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return f"<ComProxy {self._kind}: {self._target!r}>"
+
+
+class Profiler:
+    def __init__(self):
+        self.com: Counter = Counter()
+        self._stack: List[str] = []
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._t0 = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        path = '/'.join(self._stack + [name])
+        # Registered on entry so the report lists stages in the order they started
+        rec = self._stages.setdefault(path, {'ms': 0.0, 'count': 0, 'com_calls': 0})
+        self._stack.append(name)
+        calls0 = sum(self.com.values())
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._stack.pop()
+            rec['ms'] += elapsed * 1000
+            rec['count'] += 1
+            rec['com_calls'] += sum(self.com.values()) - calls0
+
+    def wrap(self, obj, kind: str):
+        return obj if obj is None or isinstance(obj, ComProxy) else ComProxy(obj, kind, self.com)
+
+    def report(self, **meta) -> Dict[str, Any]:
+        return {
+            **meta,
+            'total_ms': round((time.perf_counter() - self._t0) * 1000, 3),
+            'stages': [{'stage': k, 'ms': round(v['ms'], 3), 'count': v['count'], 'com_calls': v['com_calls']}
+                       for k, v in self._stages.items()],
+            'com': {'total': sum(self.com.values()), 'by_site': dict(sorted(self.com.items()))},
+        }
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    """Human-readable lines (these also end up on the Logs sheet)."""
+    lines = [f"Profile ({report.get('mode', '')}): {report['total_ms']:.1f} ms, {report['com']['total']} COM calls"]
+    for s in report['stages']:
+        indent = '  ' * s['stage'].count('/')
+        name = s['stage'].rsplit('/', 1)[-1]
+        lines.append(f"  {indent}{name:<{30 - len(indent)}} {s['ms']:>10.2f} ms {s['com_calls']:>7} COM")
+    for site, n in sorted(report['com']['by_site'].items(), key=lambda kv: -kv[1]):
+        lines.append(f"    {site:<34} {n:>7}")
+    return lines
+
+
+def write_report(path: str, report: Dict[str, Any]):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+_ACTIVE: Optional[Profiler] = None
+
+
+def enable() -> Profiler:
+    global _ACTIVE
+    _ACTIVE = Profiler()
+    return _ACTIVE
+
+
+def disable() -> Optional[Profiler]:
+    global _ACTIVE
+    prof, _ACTIVE = _ACTIVE, None
+    return prof
+
+
+def active() -> Optional[Profiler]:
+    return _ACTIVE
+
+
+def stage(name: str):
+    return _ACTIVE.stage(name) if _ACTIVE is not None else contextlib.nullcontext()
+
+
+def wrap(obj, kind: str):
+    return _ACTIVE.wrap(obj, kind) if _ACTIVE is not None else obj
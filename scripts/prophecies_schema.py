@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Compiled validation of prophecy rows against the bridge schema, with a row-indexed report.
+
+The schema is the sheet layout of prophecies_excel_bridge.py (COLUMNS) and the hierarchical
+JSON it maps to. RowValidator is compiled once per header row: every known column gets its
+position and its checker, so validating a row is a fixed sequence of index lookups and set
+probes with no per-row dict (values are read into one reused buffer). Sheet blocks are
+validated as they are parsed; JSON entries are validated through the bridge's flatten
+function (row_from_entry), the same way prophecies_diff compares them.
+
+Checks (severity, code):
+  error    duplicate_ref        prophecy_ref already used by an earlier row
+  error    bad_type             nested object / list where a text cell is expected
+  warning  missing_ref          row has content but no prophecy_ref / id      (error when strict)
+  warning  ref_is_status        prophecy_ref / id holds a status word (columns shifted)  (error when strict)
+  warning  id_mismatch          id and prophecy_ref both set and different
+  warning  unknown_ref          a reference with no book / chapter from the canonical book table
+  warning  ref_free_text        reference parsed, but free text was ignored ("(applied)")
+  warning  unknown_status       status outside the status vocabulary
+  warning  status_in_category   a category cell holds a status word
+  warning  missing_summary      no English prophecy summary
+  warning  missing_translation  only one language of a bilingual pair is filled in
+
+Every violation is collected (nothing stops at the first class); the bridge aborts an export
+only when the report has errors. A half-filled editing row (no ref yet) therefore does not block
+an export unless the bridge runs with --strict.
+"""
+from __future__ import annotations
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from bible_refs import lookup_book, parse_ref
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# Sheet column -> JSON path (see the schema in prophecies_excel_bridge.py's docstring)
+SCHEMA: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('id', ('id',)),
+    ('summary_prophecy_en', ('summary', 'en', 'prophecy')),
+    ('summary_fulfillment_en', ('summary', 'en', 'fulfillment')),
+    ('summary_prophecy_de', ('summary', 'de', 'prophecy')),
+    ('summary_fulfillment_de', ('summary', 'de', 'fulfillment')),
+    ('category_en', ('category', 'en')),
+    ('status', ('status',)),
+    ('category_de', ('category', 'de')),
+    ('prophecy_ref', ('prophecyRef',)),
+    ('biblical_ref', ('fulfillment', 'biblicalRef')),
+    ('external_ref_en', ('fulfillment', 'externalRef', 'en')),
+    ('external_ref_de', ('fulfillment', 'externalRef', 'de')),
+    ('notes_en', ('notes', 'en')),
+    ('notes_de', ('notes', 'de')),
+)
+FIELD_NAMES = tuple(name for name, _ in SCHEMA)
+FIELD_PATHS = dict(SCHEMA)
+BILINGUAL_PAIRS = (('summary_prophecy_en', 'summary_prophecy_de'),
+                   ('summary_fulfillment_en', 'summary_fulfillment_de'),
+                   ('category_en', 'category_de'))
+
+# Status vocabulary: '/'-joined terms, each optionally qualified "(typological)"
+STATUS_TERMS = frozenset({'fulfilled', 'partial', 'ongoing', 'future', 'fulfilled in christ'})
+_QUALIFIER = re.compile(r'\s*\([^)]*\)$')
+_STATUS_CACHE: Dict[str, bool] = {}
+
+
+def is_status(value: str) -> bool:
+    """True for a status from the vocabulary, case-insensitive ("Fulfilled / Ongoing", "Fulfilled (typological)")."""
+    known = _STATUS_CACHE.get(value)
+    if known is None:
+        parts = [_QUALIFIER.sub('', p.strip()) for p in value.lower().split('/')]
+        known = bool(value.strip()) and all(p in STATUS_TERMS for p in parts)
+        if len(_STATUS_CACHE) < 4096:
+            _STATUS_CACHE[value] = known
+    return known
+
+
+def status_terms(value: str) -> List[str]:
+    """Lower-cased terms of a status without qualifiers ("Fulfilled / Ongoing (partly)" -> ['fulfilled', 'ongoing'])."""
+    return [t for t in (_QUALIFIER.sub('', p.strip()) for p in value.lower().split('/')) if t]
+
+
+# Plain "Book C:V-C:V, V; C:V #2" lists are checked with one regex per segment and a book table
+# lookup; anything else (free text, whole books, suffixes) goes through bible_refs.parse_ref.
+_SPEC = r'\d+(?::\d+)?(?:\s*[-–—]\s*\d+(?::\d+)?)?'
+_SEGMENT = re.compile(rf'\s*(?:(?P<book>(?:[1-3]\s)?[^\W\d_]+\.?(?:\s[^\W\d_]+\.?){{0,3}})\s+)?{_SPEC}(?:\s*,\s*{_SPEC})*(?:\s+#\d+)?\s*')
+_BOOK_KNOWN: Dict[str, bool] = {}
+
+
+def _plain_ref_ok(ref: str) -> bool:
+    first = True
+    for segment in ref.split(';'):
+        m = _SEGMENT.fullmatch(segment)
+        if m is None:
+            return False
+        book = m.group('book')
+        if book is None:
+            if first:
+                return False
+        else:
+            known = _BOOK_KNOWN.get(book)
+            if known is None:
+                known = _BOOK_KNOWN[book] = lookup_book(book) is not None
+            if not known:
+                return False
+        first = False
+    return True
+
+
+@lru_cache(maxsize=65536)
+def ref_issue(ref: str) -> Optional[Tuple[str, str]]:
+    """(code, message) for a reference list that does not fully resolve, else None."""
+    if _plain_ref_ok(ref):
+        return None
+    parsed = parse_ref(ref)
+    if not parsed.ranges:
+        return 'unknown_ref', f"no book / chapter recognised in {ref!r}"
+    if parsed.unparsed:
+        return 'ref_free_text', f"ignored text {' '.join(parsed.unparsed)!r} in {ref!r}"
+    return None
+
+
+class Violation(NamedTuple):
+    row: int
+    field: str
+    code: str
+    severity: str
+    message: str
+
+
+def _row_spans(rows: Sequence[int]) -> str:
+    spans: List[List[int]] = []
+    for r in rows:
+        if spans and r == spans[-1][1] + 1:
+            spans[-1][1] = r
+        else:
+            spans.append([r, r])
+    return ', '.join(str(a) if a == b else f"{a}-{b}" for a, b in spans)
+
+
+class ValidationReport:
+    """All violations of one validation pass, in row order."""
+
+    def __init__(self):
+        self.violations: List[Violation] = []
+        self.rows = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def add(self, row: int, field: str, code: str, severity: str, message: str):
+        self.violations.append(Violation(row, field, code, severity, message))
+        if severity == ERROR:
+            self.errors += 1
+        else:
+            self.warnings += 1
+
+    @property
+    def ok(self) -> bool:
+        return self.errors == 0
+
+    def by_code(self) -> Dict[Tuple[str, str], List[Violation]]:
+        out: Dict[Tuple[str, str], List[Violation]] = {}
+        for v in self.violations:
+            out.setdefault((v.severity, v.code), []).append(v)
+        return out
+
+    def summary(self) -> str:
+        return f"{self.errors} error(s), {self.warnings} warning(s) in {self.rows} row(s)"
+
+    def format(self, detail: int = 5) -> List[str]:
+        """Errors first; per code the affected rows and the first `detail` messages."""
+        lines = [f"Validation: {self.summary()}"]
+        groups = sorted(self.by_code().items(), key=lambda kv: (kv[0][0] != ERROR, kv[0][1]))
+        for (severity, code), items in groups:
+            rows = sorted({v.row for v in items})
+            lines.append(f"  {'ERROR' if severity == ERROR else 'WARN'} {code} x{len(items)}: rows {_row_spans(rows)}")
+            for v in items[:detail]:
+                lines.append(f"    row {v.row} {v.field}: {v.message}")
+            if len(items) > detail:
+                lines.append(f"    ... {len(items) - detail} more")
+        return lines
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'rows': self.rows,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'by_code': dict(sorted(Counter(f"{v.severity}:{v.code}" for v in self.violations).items())),
+            'violations': [v._asdict() for v in self.violations],
+        }
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+
+def _cell(value) -> Any:
+    if value is None:
+        return ''
+    if value.__class__ is str:
+        return value.strip()
+    if isinstance(value, (dict, list, tuple)):
+        return value  # flagged as bad_type
+    return str(value).strip()
+
+
+class RowValidator:
+    """Validator compiled for one header layout (normalized header names, first occurrence wins)."""
+
+    def __init__(self, norm_headers: Sequence[str], strict: bool = False):
+        positions: Dict[str, int] = {}
+        for i, h in enumerate(norm_headers):
+            if h and h not in positions:
+                positions[h] = i
+        self.width = len(norm_headers)
+        # (row position, buffer slot) for every schema column present in this layout
+        self._cols = [(positions[name], slot) for slot, name in enumerate(FIELD_NAMES) if name in positions]
+        self._buf: List[Any] = [''] * len(FIELD_NAMES)
+        slot = {name: i for i, name in enumerate(FIELD_NAMES)}
+        self._id, self._ref = slot['id'], slot['prophecy_ref']
+        self._status, self._biblical = slot['status'], slot['biblical_ref']
+        self._summary = slot['summary_prophecy_en']
+        self._categories = (slot['category_en'], slot['category_de'])
+        self._pairs = [(slot[a], slot[b]) for a, b in BILINGUAL_PAIRS if a in positions and b in positions]
+        self._seen: Dict[str, int] = {}
+        self._key_severity = ERROR if strict else WARNING  # missing_ref / ref_is_status
+
+    def _check_duplicate(self, row_number: int, key: str, report: ValidationReport):
+        first = self._seen.setdefault(key, row_number)
+        if first != row_number:
+            report.add(row_number, 'prophecy_ref', 'duplicate_ref', ERROR, f"{key!r} already in row {first}")
+
+    def check(self, row_number: int, row: Sequence[Any], report: ValidationReport) -> bool:
+        """Validate one non-blank row into report; returns False when it added an error."""
+        buf = self._buf
+        n = len(row)
+        for pos, slot in self._cols:
+            buf[slot] = _cell(row[pos]) if pos < n else ''
+        report.rows += 1
+        errors_before = report.errors
+        for pos, slot in self._cols:
+            if buf[slot].__class__ is not str:
+                report.add(row_number, FIELD_NAMES[slot], 'bad_type', ERROR,
+                           f"expected text, got {type(buf[slot]).__name__}")
+                buf[slot] = ''
+        rid, ref = buf[self._id], buf[self._ref]
+        key = ref or rid
+        if not key:
+            report.add(row_number, 'prophecy_ref', 'missing_ref', self._key_severity, 'no prophecy_ref / id')
+        elif is_status(key):
+            report.add(row_number, 'prophecy_ref' if ref else 'id', 'ref_is_status', self._key_severity,
+                       f"{key!r} is a status; are the columns shifted?")
+            # A status-valued id is blanked on import; a status-valued prophecy_ref reaches the JSON
+            # as the entry's key, so it still has to be unique
+            if ref:
+                self._check_duplicate(row_number, ref, report)
+        else:
+            self._check_duplicate(row_number, key, report)
+            issue = ref_issue(key)
+            if issue:
+                report.add(row_number, 'prophecy_ref', issue[0], WARNING, issue[1])
+            if rid and ref and rid != ref and not is_status(rid):
+                report.add(row_number, 'id', 'id_mismatch', WARNING, f"id {rid!r} differs from prophecy_ref {ref!r}")
+        biblical = buf[self._biblical]
+        if biblical:
+            issue = ref_issue(biblical)
+            if issue:
+                report.add(row_number, 'biblical_ref', issue[0], WARNING, issue[1])
+        status = buf[self._status]
+        if status and not is_status(status):
+            report.add(row_number, 'status', 'unknown_status', WARNING, f"{status!r} is not in the status vocabulary")
+        for slot in self._categories:
+            if buf[slot] and is_status(buf[slot]):
+                hint = ' (status column empty: columns shifted?)' if not status else ''
+                report.add(row_number, FIELD_NAMES[slot], 'status_in_category', WARNING,
+                           f"category {buf[slot]!r} is a status{hint}")
+        if not buf[self._summary]:
+            report.add(row_number, 'summary_prophecy_en', 'missing_summary', WARNING, 'no English prophecy summary')
+        for a, b in self._pairs:
+            if bool(buf[a]) != bool(buf[b]):
+                missing = b if buf[a] else a
+                report.add(row_number, FIELD_NAMES[missing], 'missing_translation', WARNING,
+                           f"{FIELD_NAMES[a if missing == b else b]} is set, {FIELD_NAMES[missing]} is empty")
+        return report.errors == errors_before
+
+
+def validate_rows(rows: Iterable[Sequence[Any]], norm_headers: Sequence[str], first_row: int = 2,
+                  strict: bool = False) -> ValidationReport:
+    """Validate rows laid out per norm_headers; row numbers start at first_row (sheet row 2 after the header)."""
+    validator = RowValidator(norm_headers, strict)
+    report = ValidationReport()
+    for ri, row in enumerate(rows, start=first_row):
+        if all(v in (None, '') for v in row[:validator.width]):
+            continue
+        validator.check(ri, row, report)
+    return report
+
+
+def validate_entries(entries: Iterable[Dict[str, Any]], flatten: Callable[[Dict[str, Any]], Sequence[Any]],
+                     columns: Sequence[str] = FIELD_NAMES, first_row: int = 2, strict: bool = False) -> ValidationReport:
+    """Validate hierarchical entries through flatten (row_from_entry, laid out as columns).
+
+    Row numbers are the sheet rows the entries import to (first_row for the first entry).
+    """
+    return validate_rows((flatten(e) for e in entries), columns, first_row, strict)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Long-running bridge server: prophecies_excel_bridge.py --serve.
+
+Serves prophecies_client.py requests one at a time on the main thread (COM objects stay on the
+thread that created them). Between commands it keeps warm what a one-shot run rebuilds per click:
+
+  * the interpreter and every bridge module (imports);
+  * the Excel Application object (one Dispatch; re-attached if Excel was restarted), also used
+    to write the Logs sheet instead of a second Dispatch on the log writer thread;
+  * parsed datasets (prophecies_cache.FileMemo: the migrated entries / cached import of each JSON
+    file, reused while the file's mtime / size / inode are unchanged).
+
+Each command's output is streamed to the client as it is printed and kept in a per-command
+RingLog, which ends up on the Logs sheet (or prophecies_bridge.log next to the JSON when Excel is
+not reachable), as in a one-shot run. SystemExit from a command becomes the client's exit code.
+
+Requests ({'op': ...}): 'run' (argv + cwd), 'status', 'stop'. Responses are ('out', text),
+('err', text) and a final ('exit', code).
+"""
+from __future__ import annotations
+import contextlib
+import io
+import json
+import os
+import secrets
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import traceback
+from multiprocessing.connection import Listener
+from typing import Any, Callable, Dict, Optional
+
+import prophecies_cache
+import prophecies_excel_bridge as bridge
+import prophecies_log
+from prophecies_client import PROTOCOL, is_private, read_state, request, state_dir, state_path
+
+COMMAND_LOG_CAPACITY = bridge.LOG_CAPACITY
+
+
+class WarmExcel:
+    """One Excel Application object for the server's lifetime; re-attached when it went stale."""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.excel = None
+        self.attaches = 0
+
+    def get(self):
+        if self.excel is not None:
+            try:
+                self.excel.ActiveWorkbook  # cheap liveness probe (raises once Excel was closed)
+                return self.excel
+            except Exception:
+                self.excel = None
+        self.excel = self.factory()
+        self.attaches += 1
+        return self.excel
+
+
+class _ClientStream:
+    """stdout / stderr for one command: relayed to the client and kept for the Logs sheet."""
+
+    def __init__(self, conn, kind: str, ring: prophecies_log.RingLog):
+        self._conn = conn
+        self._kind = kind
+        self._ring = ring
+        self.connected = True
+
+    def write(self, data):
+        if not data:
+            return 0
+        if self.connected:
+            try:
+                self._conn.send((self._kind, data))
+            except (OSError, EOFError):
+                self.connected = False  # client gone (window closed): finish the command anyway
+        for line in data.splitlines():
+            if line.strip():
+                self._ring.append(prophecies_log.infer_level(line, self._kind == 'err'), line.rstrip())
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def _address():
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\prophecies-bridge-{secrets.token_hex(8)}', 'AF_PIPE', None
+    # Private directory: only this user can reach the socket at all
+    sock_dir = tempfile.mkdtemp(prefix='prophecies-bridge-')
+    return os.path.join(sock_dir, 'bridge.sock'), 'AF_UNIX', sock_dir
+
+
+def _private_dir(path: str) -> Optional[str]:
+    """Create path (mode 0700) if needed; returns why it cannot hold the state file, or None."""
+    with contextlib.suppress(FileExistsError):
+        os.mkdir(path, 0o700)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        return f"{path} is not a directory"
+    if not is_private(st):
+        return f"{path} is not private to this user (owner / mode)"
+    return None
+
+
+def _write_state(path: str, state: Dict[str, Any]):
+    # mkstemp creates the file exclusively (mode 0600), so a planted file or symlink is never opened
+    fd, tmp = tempfile.mkstemp(prefix='.prophecies-bridge-', suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+class BridgeServer:
+    def __init__(self, excel_factory: Optional[Callable[[], Any]] = None, state_file: Optional[str] = None):
+        self.excel = WarmExcel(excel_factory or bridge.connect_excel)
+        self.state_file = state_file or state_path()
+        self.memo = prophecies_cache.enable_memo()
+        self.commands = 0
+        self.started = time.time()
+        self._stop = False
+
+    # ---- one command ----
+
+    def _flush_log(self, args, ring: prophecies_log.RingLog):
+        # Same targets as a one-shot run's LogSession, written synchronously with the warm Excel
+        records = ring.snapshot()
+        if not records:
+            return
+        if args is not None and getattr(args, 'log_file', None):
+            prophecies_log.RotatingFile(args.log_file).write(records)
+        if args is not None and args.backend == 'com':
+            try:
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                    if prophecies_log.write_excel_sheet(self.excel.get(), records, ring.dropped):
+                        return
+            except BaseException:
+                pass  # Excel not reachable (connect_excel exits): fall through to the file
+        json_path = getattr(args, 'json', None) if args is not None else None
+        directory = os.path.dirname(os.path.abspath(json_path)) if json_path else os.getcwd()
+        try:
+            prophecies_log.RotatingFile(os.path.join(directory, 'prophecies_bridge.log')).write(records)
+        except OSError:
+            pass
+
+    def run_command(self, conn, argv, cwd: str) -> int:
+        ring = prophecies_log.RingLog(COMMAND_LOG_CAPACITY)
+        out, err = _ClientStream(conn, 'out', ring), _ClientStream(conn, 'err', ring)
+        args = None
+        code = 0
+        prev_cwd = os.getcwd()
+        try:
+            os.chdir(cwd)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                try:
+                    parser = bridge.build_parser()
+                    parser.prog = 'prophecies_excel_bridge.py'  # not the server's argv[0] in usage / errors
+                    args = parser.parse_args(argv)
+                    if args.serve or args.watch:
+                        print("ERROR: --serve / --watch cannot be sent to a running server", file=sys.stderr)
+                        code = 2
+                    elif not args.json:
+                        print("ERROR: --json is required", file=sys.stderr)
+                        code = 2
+                    else:
+                        bridge.run(args, self.excel.get)
+                except SystemExit as e:
+                    if isinstance(e.code, int) or e.code is None:
+                        code = e.code or 0
+                    else:
+                        print(e.code, file=sys.stderr)
+                        code = 1
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+            self._flush_log(args, ring)
+        finally:
+            os.chdir(prev_cwd)
+            self.commands += 1
+        return code
+
+    def handle(self, conn):
+        try:
+            message = conn.recv()
+        except (OSError, EOFError):
+            return
+        op = message.get('op') if isinstance(message, dict) else None
+        if op == 'run':
+            code = self.run_command(conn, message.get('argv') or [], message.get('cwd') or os.getcwd())
+        elif op == 'status':
+            conn.send(('out', f"Bridge server pid {os.getpid()}: {self.commands} command(s), "
+                              f"up {time.time() - self.started:.0f}s, dataset memo {self.memo.hits} hit(s) / "
+                              f"{self.memo.misses} load(s), Excel attached {self.excel.attaches}x\n"))
+            code = 0
+        elif op == 'stop':
+            self._stop = True
+            code = 0
+        else:
+            conn.send(('err', f"Unknown request {op!r}\n"))
+            code = 2
+        try:
+            conn.send(('exit', code))
+        except (OSError, EOFError):
+            pass
+
+    # ---- lifecycle ----
+
+    def preload(self, json_path: str):
+        try:
+            entries = bridge.migrated_entries(json_path)
+            print(f"Preloaded {len(entries)} entries from {json_path}")
+        except Exception as e:
+            print(f"WARN: Could not preload {json_path} ({e})", file=sys.stderr)
+
+    def serve_forever(self):
+        if request({'op': 'status'}, out=io.StringIO(), state_file=self.state_file) is not None:
+            print(f"ERROR: A bridge server is already running (state file {self.state_file})", file=sys.stderr)
+            sys.exit(1)
+        if os.path.dirname(self.state_file) == state_dir():
+            problem = _private_dir(state_dir())
+            if problem:
+                print(f"ERROR: Refusing to write the bridge state: {problem}", file=sys.stderr)
+                sys.exit(1)
+        address, family, sock_dir = _address()
+        authkey = secrets.token_bytes(32)
+        listener = Listener(address, family, authkey=authkey)
+        try:
+            _write_state(self.state_file, {'protocol': PROTOCOL, 'address': address, 'family': family,
+                                           'authkey': authkey.hex(), 'pid': os.getpid()})
+            print(f"Bridge server listening ({family}, pid {os.getpid()}); state in {self.state_file}")
+            while not self._stop:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError):
+                    continue
+                except Exception as e:
+                    # Failed handshake (wrong key): drop the connection, keep serving
+                    print(f"WARN: Rejected connection ({e})", file=sys.stderr)
+                    continue
+                with conn:
+                    self.handle(conn)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            state = read_state(self.state_file)
+            if state is not None and state.get('pid') == os.getpid():
+                with contextlib.suppress(OSError):
+                    os.remove(self.state_file)
+            if sock_dir:
+                shutil.rmtree(sock_dir, ignore_errors=True)
+            prophecies_cache.disable_memo()
+            print(f"Bridge server stopped after {self.commands} command(s)")
+
+
+def serve(json_path: Optional[str] = None, excel_factory: Optional[Callable[[], Any]] = None,
+          state_file: Optional[str] = None):
+    server = BridgeServer(excel_factory, state_file)
+    if json_path:
+        server.preload(json_path)
+    server.serve_forever()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Constant-memory JSON array reading / writing for prophecies.json sized files.
+
+iter_json_array() yields the elements of a top-level JSON array one at a time
+using JSONDecoder.raw_decode over a sliding text buffer, so only the current
+element (plus one read chunk) is held in memory. iter_json_array_text() yields the
+same elements as raw JSON text without decoding them (bracket / string scan only),
+so the decoding can be handed to worker processes. iter_indented_chunks() does the same for
+files in the indent=2 layout at a fraction of the cost: it cuts the array body into
+~chunk_chars pieces on lines that close a top-level element, without looking at elements.
+
+JsonArrayWriter streams elements to a temp file next to the target and atomically
+renames it on success. The output is byte-identical to
+json.dump(list, f, ensure_ascii=False, indent=2). A running count and SHA-256 of
+the bytes written replace the old "reload and count" verification.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Any, Iterator, Optional
+
+CHUNK_SIZE = 1 << 16
+_WS = ' \t\n\r'
+_NUM_TAIL = '0123456789.eE+-'
+# Everything up to the next structural bracket, skipping whole strings (which may contain brackets)
+_SKIP = re.compile(r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(r'[^,\]}\s]+')
+# indent=2 layout: strings cannot hold raw newlines, so this line only closes a top-level element
+_TOP_CLOSE = re.compile(r'\n  [}\]]')
+_INDENTED_HEAD = re.compile(r'\[\r?\n  [{\[]')
+
+
+class _Buffer:
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop consumed prefix so the buffer never grows beyond ~one element + one chunk
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_ws(self):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.text) or not self.fill():
+                return
+
+    def peek(self) -> str:
+        self.skip_ws()
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        self.skip_ws()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Possibly an element split across chunks: read more and retry
+                if self.fill():
+                    continue
+                raise
+            # A number cut at the buffer edge ("2." / "2.5e") may continue in the next chunk
+            if isinstance(value, (int, float)) and not self.eof and (end == len(self.text) or self.text[end] in _NUM_TAIL) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def _value_end(self) -> int:
+        """End offset of the value at pos, or -1 when it runs past the buffer."""
+        text, pos = self.text, self.pos
+        first = text[pos]
+        if first == '"':
+            m = _STRING.match(text, pos)
+            return m.end() if m else -1
+        if first not in '{[':
+            end = _SCALAR.match(text, pos).end()
+            return -1 if end == len(text) and not self.eof else end
+        depth = 0
+        i = pos
+        while i < len(text):
+            ch = text[i]
+            if ch in '{[':
+                depth += 1
+            elif ch in '}]':
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            else:
+                return -1  # string cut at the buffer edge
+            i = _SKIP.match(text, i + 1).end()
+        return -1
+
+    def scan(self) -> str:
+        """Raw text of the next value. Only brackets and strings are checked; decoding validates the rest."""
+        self.skip_ws()
+        while True:
+            end = self._value_end() if self.pos < len(self.text) else -1
+            if end >= 0:
+                value = self.text[self.pos:end]
+                self.pos = end
+                return value
+            if not self.fill():
+                raise json.JSONDecodeError("Unterminated value", self.text, self.pos)
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield elements of the top-level array in path; a non-array root is yielded as a single element.
+
+    Raises json.JSONDecodeError on malformed input (elements before the error have already been yielded).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = _Buffer(f, chunk_size)
+        if buf.peek() != '[':
+            print("WARN: JSON root not list; wrapping")
+            yield buf.decode(decoder)
+            return
+        buf.pos += 1
+        if buf.peek() == ']':
+            return
+        while True:
+            yield buf.decode(decoder)
+            sep = buf.peek()
+            if sep == ',':
+                buf.pos += 1
+            elif sep == ']':
+                return
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf.text, buf.pos)
+
+
+def is_indented_array(path: str) -> bool:
+    """True when path starts like json.dump(list_of_objects, indent=2) / JsonArrayWriter output."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return _INDENTED_HEAD.match(f.read(8)) is not None
+
+
+def iter_json_array_text(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Like iter_json_array, but yields each element's raw JSON text undecoded.
+
+    json.loads of a yielded string equals the element iter_json_array yields. Malformed
+    elements are not detected here (only unbalanced brackets / strings and bad separators).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = _Buffer(f, chunk_size)
+        if buf.peek() != '[':
+            print("WARN: JSON root not list; wrapping")
+            yield buf.scan()
+            return
+        buf.pos += 1
+        if buf.peek() == ']':
+            return
+        while True:
+            yield buf.scan()
+            sep = buf.peek()
+            if sep == ',':
+                buf.pos += 1
+            elif sep == ']':
+                return
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf.text, buf.pos)
+
+
+def iter_indented_chunks(path: str, chunk_chars: int = 1 << 20) -> Iterator[str]:
+    """Body of an indent=2 top-level array as pieces of >= chunk_chars characters.
+
+    Every piece is a ','-separated run of whole elements, so json.loads('[' + piece + ']')
+    yields them and the pieces in order cover the whole array. Cuts are made after a line
+    that closes a top-level element ('\\n  }' / '\\n  ]' followed by ',' or the closing ']').
+    That is exact for the indent=2 layout; in a hand-edited layout such a line can close a
+    nested value instead, and the piece ending there is unbalanced (a cut is never inside a
+    string) and fails to decode. Callers therefore treat a JSONDecodeError from a piece as
+    "rescan with iter_json_array_text", never as corrupt data.
+    """
+    read_size = max(2 * chunk_chars, CHUNK_SIZE)
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read(read_size)
+        if _INDENTED_HEAD.match(text) is None:
+            raise json.JSONDecodeError("Expecting an indent=2 array", text, 0)
+        pos = 1
+        search = pos + chunk_chars
+        eof = False
+
+        def fill() -> bool:
+            nonlocal text, pos, search
+            more = f.read(read_size)
+            if not more:
+                return False
+            search -= pos
+            text = text[pos:] + more
+            pos = 0
+            return True
+
+        while True:
+            if not eof and len(text) - pos < read_size:
+                eof = not fill()
+            m = _TOP_CLOSE.search(text, search)
+            j = m.end() if m else len(text)
+            while j < len(text) and text[j] in _WS:
+                j += 1
+            if j >= len(text):
+                if not eof and fill():
+                    continue
+                # Fewer than chunk_chars left: everything up to the closing bracket
+                tail = text[pos:].rstrip()
+                if not tail.endswith(']'):
+                    raise json.JSONDecodeError("Expecting ']'", text, len(text))
+                if tail[:-1].strip():
+                    yield tail[:-1]
+                return
+            if text[j] == ',':
+                yield text[pos:m.end()]
+                pos = j + 1
+                search = pos + chunk_chars
+            elif text[j] == ']':
+                yield text[pos:m.end()]
+                return
+            else:
+                search = m.end()  # closed a nested value (not the indent=2 layout after all)
+
+
+_encode_str = json.encoder.encode_basestring  # ensure_ascii=False flavour (C accelerated)
+
+
+def dumps_indented(obj: Any, indent: str = '') -> str:
+    """json.dumps(obj, ensure_ascii=False, indent=2) with the nesting already at indent.
+
+    json falls back to its pure-Python encoder whenever indent is set; this walks
+    dicts/lists itself and leaves strings and scalars to the C encoder, which is
+    several times faster on prophecy entries while producing identical text.
+    """
+    if isinstance(obj, str):
+        return _encode_str(obj)
+    if isinstance(obj, dict):
+        if not obj:
+            return '{}'
+        if not all(isinstance(k, str) for k in obj):
+            # Non-string keys need json's key coercion rules
+            return json.dumps(obj, ensure_ascii=False, indent=2).replace('\n', '\n' + indent)
+        inner = indent + '  '
+        return '{\n' + ',\n'.join(f"{inner}{_encode_str(k)}: {dumps_indented(v, inner)}" for k, v in obj.items()) + '\n' + indent + '}'
+    if isinstance(obj, (list, tuple)):
+        if not obj:
+            return '[]'
+        inner = indent + '  '
+        return '[\n' + ',\n'.join(inner + dumps_indented(v, inner) for v in obj) + '\n' + indent + ']'
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def file_sha256(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _target_mode(path: str) -> int:
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+class JsonArrayWriter:
+    """Context manager: stream entries to path atomically.
+
+    with JsonArrayWriter(path) as w:
+        for e in entries:
+            w.write(e)
+    w.count / w.sha256 / w.changed are available after the block. With
+    skip_if_unchanged=True the target is left untouched (changed=False) when the new
+    content hashes identical to the existing file. On an exception the temp file is
+    discarded and the target is never modified.
+    """
+
+    def __init__(self, path: str, skip_if_unchanged: bool = False, fsync: bool = True):
+        self.path = path
+        self.skip_if_unchanged = skip_if_unchanged
+        self.fsync = fsync
+        self.count = 0
+        self.sha256 = ''
+        self.changed = False
+        self._hash = hashlib.sha256()
+        self._f = None
+        self._tmp = ''
+
+    def __enter__(self) -> 'JsonArrayWriter':
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self._tmp = tempfile.mkstemp(prefix='.' + os.path.basename(self.path) + '.', suffix='.tmp', dir=directory)
+        self._f = os.fdopen(fd, 'wb')
+        # mkstemp creates 0600 files; keep the target's mode (or the umask default) across the rename
+        os.chmod(self._tmp, _target_mode(self.path))
+        return self
+
+    def _emit(self, text: str):
+        data = text.encode('utf-8')
+        self._hash.update(data)
+        self._f.write(data)
+
+    def write(self, entry: Any):
+        # Same layout json.dump(list, indent=2) produces
+        self._emit(('[\n  ' if self.count == 0 else ',\n  ') + dumps_indented(entry, '  '))
+        self.count += 1
+
+    def write_encoded(self, text: str, count: int):
+        """Append count elements already encoded as dumps_indented(entry, '  ') and joined with ',\\n  '."""
+        if count:
+            self._emit(('[\n  ' if self.count == 0 else ',\n  ') + text)
+            self.count += count
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._emit('\n]' if self.count else '[]')
+                self._f.flush()
+                if self.fsync:
+                    os.fsync(self._f.fileno())
+            self._f.close()
+            if exc_type is not None:
+                return False
+            self.sha256 = self._hash.hexdigest()
+            if self.skip_if_unchanged and file_sha256(self.path) == self.sha256:
+                return False
+            os.replace(self._tmp, self.path)
+            self.changed = True
+            return False
+        finally:
+            if os.path.exists(self._tmp):
+                try:
+                    os.remove(self._tmp)
+                except OSError as e:
+                    print(f"WARN: Could not remove temp file {self._tmp}: {e}", file=sys.stderr)
+
+    def verify(self) -> Optional[str]:
+        """Re-hash the file on disk (streaming, no JSON parse); returns an error string or None."""
+        on_disk = file_sha256(self.path)
+        if on_disk != self.sha256:
+            return f"Hash mismatch after write (expected {self.sha256[:12]}, got {(on_disk or 'missing')[:12]})"
+        return None
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Watch mode: prophecies_excel_bridge.py --watch --json prophecies.json --workbook BibleProphecies.xlsm
+
+Polls the JSON file and the workbook file (os.stat mtime / size / inode every --poll-interval
+seconds; stdlib only, so it behaves the same on Windows, network drives and Linux) and runs the
+incremental sync for the side that changed:
+
+  workbook saved  -> export --diff  (sheet -> JSON: only changed records; JSON untouched if none)
+  JSON changed    -> import --diff  (JSON -> sheet: only edited / new / deleted rows)
+
+Bursts are coalesced: nothing runs until every changed file has been unchanged for --debounce
+seconds, then one sync covers all of it. Feedback loops are cut by content hash: the sha256 of
+both files is recorded after each sync, and a change whose bytes match the recorded hash (the
+watcher's own write, a re-save of identical content, a touch) is dropped without a sync. When
+both files changed within one window the watcher does not pick a winner; it reports the
+conflict, takes both files as they are as the new baseline and leaves it to a manual Import or
+Export.
+
+With --backend com the workbook file only signals that Excel saved: export reads the open
+workbook's sheet and import writes into it (saving stays with the user, as with the buttons).
+With --backend xlsx both directions read and write the file itself.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+import traceback
+from typing import Any, Callable, List, Optional
+
+import prophecies_excel_bridge as bridge
+from prophecies_cache import file_signature
+from prophecies_server import WarmExcel
+from prophecies_stream import file_sha256
+
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+def _content_sha(path: str) -> Optional[str]:
+    try:
+        return file_sha256(path)
+    except OSError:
+        return None  # mid-save (Excel replaces the file) or locked: treated as not settled yet
+
+
+class WatchedFile:
+    def __init__(self, path: str, label: str):
+        self.path = path
+        self.label = label
+        self.sig = file_signature(path)
+        self.synced = _content_sha(path)  # bytes the other side was last synced with
+        self.changed_at: Optional[float] = None  # last signature change not yet handled
+
+    def poll(self, now: float):
+        sig = file_signature(self.path)
+        if sig != self.sig:
+            self.sig = sig
+            self.changed_at = now
+
+    @property
+    def pending(self) -> bool:
+        return self.changed_at is not None
+
+    def waiting(self, now: float, debounce: float) -> bool:
+        # A missing file (deleted, or between Excel's delete and rename) waits for its next change
+        return self.pending and self.sig is not None and now - self.changed_at < debounce
+
+    def baseline(self, sig=None, sha: Optional[str] = None):
+        """Treat the given (default: current) contents as synced."""
+        self.sig = sig if sig is not None else file_signature(self.path)
+        self.synced = sha if sha is not None else _content_sha(self.path)
+        self.changed_at = None
+
+
+class Watcher:
+    def __init__(self, args: argparse.Namespace, excel_factory: Optional[Callable[[], Any]] = None,
+                 debounce: float = DEFAULT_DEBOUNCE):
+        self.args = args
+        self.debounce = debounce
+        self.json = WatchedFile(os.path.abspath(bridge.normalize_json_path(args.json)), 'JSON')
+        self.workbook = WatchedFile(os.path.abspath(bridge.normalize_json_path(args.workbook)), 'workbook')
+        # One Excel attach for the whole session (COM); the xlsx backend opens the file per sync
+        self.excel = WarmExcel(excel_factory or bridge.connect_excel) if args.backend == 'com' else None
+        self.syncs = 0
+        self.ignored = 0
+        self.conflicts = 0
+
+    def _run(self, mode: str) -> bool:
+        ns = argparse.Namespace(**vars(self.args))
+        ns.mode, ns.diff, ns.watch = mode, True, False
+        try:
+            bridge.run(ns, self.excel.get if self.excel is not None else None)
+            return True
+        except SystemExit as e:
+            if e.code in (None, 0):
+                return True
+            print(f"WARN: {mode} failed (exit {e.code}); still watching", file=sys.stderr)
+        except Exception:
+            traceback.print_exc()
+            print(f"WARN: {mode} failed; still watching", file=sys.stderr)
+        return False
+
+    def step(self, now: float) -> Optional[str]:
+        """One poll; returns the mode that was synced ('import' / 'export'), if any."""
+        files = (self.json, self.workbook)
+        for f in files:
+            f.poll(now)
+        # Wait until every file that moved has been quiet for the debounce window
+        if not any(f.pending for f in files) or any(f.waiting(now, self.debounce) for f in files):
+            return None
+        changed: List[WatchedFile] = []
+        for f in files:
+            if not f.pending or f.sig is None:
+                continue
+            sha = _content_sha(f.path)
+            if sha is None:
+                continue  # vanished / locked since the last poll: retried on the next change
+            if sha == f.synced:
+                self.ignored += 1  # own write or identical re-save
+                f.baseline(f.sig, sha)
+            else:
+                changed.append(f)
+        if not changed:
+            return None
+        if len(changed) == 2:
+            self.conflicts += 1
+            print("WARN: JSON and workbook both changed; not syncing either way. "
+                  "Run Import or Export by hand to decide which edit wins.", file=sys.stderr)
+            for f in changed:
+                f.baseline()
+            return None
+        source = changed[0]
+        mode = 'export' if source is self.workbook else 'import'
+        print(f"{source.label} changed ({os.path.basename(source.path)}) -> {mode} --diff")
+        read_sig, read_sha = source.sig, _content_sha(source.path)
+        ok = self._run(mode)
+        self.syncs += 1
+        # Files a sync may write (export: the JSON; import: the workbook with xlsx, the JSON on a
+        # legacy upgrade) take their new bytes as the baseline, so their change events are dropped.
+        # The workbook an export only read keeps the bytes it was read at, so a save made during
+        # the sync still triggers the next export.
+        if mode == 'export':
+            self.workbook.baseline(read_sig, read_sha)
+            self.json.baseline()
+        else:
+            self.json.baseline()
+            self.workbook.baseline()
+        return mode if ok else None
+
+    def watch_forever(self, interval: float = DEFAULT_POLL_INTERVAL):
+        print(f"Watching {self.json.path} and {self.workbook.path} "
+              f"(debounce {self.debounce:g}s, poll {interval:g}s, backend {self.args.backend}); Ctrl+C stops")
+        try:
+            while True:
+                self.step(time.monotonic())
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        print(f"Watch stopped: {self.syncs} sync(s), {self.ignored} own / unchanged write(s) ignored, "
+              f"{self.conflicts} conflict(s)")
+
+
+def watch(args: argparse.Namespace, excel_factory: Optional[Callable[[], Any]] = None):
+    Watcher(args, excel_factory, max(0.0, args.debounce)).watch_forever(max(0.05, args.poll_interval))
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""File-based .xlsx / .xlsm access for the prophecies bridge (no Excel / COM required).
+
+Reading streams the worksheet XML through expat straight out of the zip (constant
+memory, roughly 3x faster than openpyxl's read-only mode on a 50k-row sheet).
+Writing streams a replacement <sheetData> for the target worksheet part into a copy
+of the zip package, so every other part (VBA project, form-control buttons on the
+settings sheet, other sheets, styles) is carried over untouched. openpyxl's
+write-only mode cannot do that: it always produces a brand new workbook.
+Only the standard library is needed.
+
+Formatting on the rewritten sheet: each column keeps the style of its original header
+cell (row 1) and of its first styled data cell (all other rows), and column widths,
+freeze panes and the autoFilter (resized to the new data) are kept. Merged ranges are
+dropped. The COM path's format_sheet (bold header, AutoFit, width cap) is not applied,
+so a sheet this module creates from scratch has no formatting at all.
+
+XlsxWorkbook exposes the small COM-like surface that _resolve_sheet relies on
+(Worksheets(name), iteration, Worksheets.Add(), ws.Name, ws.Cells(1, c).Value), so
+sheet resolution follows exactly the same rules as the COM path.
+"""
+from __future__ import annotations
+import os
+import re
+import sys
+import tempfile
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+WORKSHEET_REL_TYPE = NS_REL + '/worksheet'
+WORKSHEET_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+
+EMPTY_SHEET_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><dimension ref="A1"/><sheetData/></worksheet>'
+).encode('utf-8')
+
+# Characters not allowed in XML 1.0 documents
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_SHEETDATA_RE = re.compile(rb'<sheetData\s*/>|<sheetData\b[^>]*>.*?</sheetData>', re.S)
+_DIMENSION_RE = re.compile(rb'<dimension\b[^>]*/>')
+_AUTOFILTER_REF_RE = re.compile(rb'(<autoFilter\b[^>]*?\bref=")[^"]*(")')
+_MERGECELLS_RE = re.compile(rb'<mergeCells\b[^>]*?(?:/>|>.*?</mergeCells>)', re.S)
+_ROW_RE = re.compile(rb'<row\b([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_CELL_RE = re.compile(rb'<c\b([^>]*?)/?>')
+_ROW_ATTR_RE = re.compile(rb'\br="(\d+)"')
+_CELL_ATTR_RE = re.compile(rb'\b([rs])="([^"]*)"')
+
+
+def column_letter(ci: int) -> str:
+    s = ''
+    while ci:
+        ci, rem = divmod(ci - 1, 26)
+        s = chr(65 + rem) + s
+    return s
+
+
+def _escape(text: str) -> str:
+    text = _ILLEGAL_XML.sub('', text)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _cell_xml(ref: str, v: Any, style: Optional[str] = None) -> str:
+    s = f' s="{style}"' if style else ''
+    if isinstance(v, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(v)}</v></c>'
+    if isinstance(v, (int, float)):
+        return f'<c r="{ref}"{s}><v>{v!r}</v></c>'
+    text = str(v)
+    space = ' xml:space="preserve"' if text[:1].isspace() or text[-1:].isspace() else ''
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{_escape(text)}</t></is></c>'
+
+
+ColumnStyles = Tuple[Dict[int, str], Dict[int, str]]
+
+
+def column_styles(sheet_data: bytes, sample_rows: int = 16) -> ColumnStyles:
+    """(header, body) style ids by 0-based column, taken from an existing <sheetData>.
+
+    Row 1 gives the header styles; the first sample_rows rows below it give each
+    column's body style (first styled cell wins).
+    """
+    header: Dict[int, str] = {}
+    body: Dict[int, str] = {}
+    r = 0
+    for m in _ROW_RE.finditer(sheet_data):
+        rm = _ROW_ATTR_RE.search(m.group(1))
+        r = int(rm.group(1)) if rm else r + 1
+        if r > sample_rows + 1:
+            break
+        target = header if r == 1 else body
+        ci = -1
+        for c in _CELL_RE.finditer(m.group(2) or b''):
+            attrs = dict(_CELL_ATTR_RE.findall(c.group(1)))
+            ci = _col_index(attrs[b'r'].decode('ascii')) - 1 if b'r' in attrs else ci + 1
+            style = attrs.get(b's', b'').decode('ascii')
+            if style and style != '0':
+                target.setdefault(ci, style)
+    return header, body
+
+
+def iter_sheet_data_xml(rows: Iterable[Sequence[Any]], first_row: int = 1, styles: Optional[ColumnStyles] = None) -> Iterable[str]:
+    """Yield <sheetData> XML in row-sized pieces (cells with None / '' are omitted).
+
+    styles, from column_styles(), sets each cell's style id: header styles on row 1,
+    body styles below it.
+    """
+    letters: List[str] = []
+    header, body = styles or ({}, {})
+    yield '<sheetData>'
+    for ri, row in enumerate(rows, start=first_row):
+        while len(letters) < len(row):
+            letters.append(column_letter(len(letters) + 1))
+        col_style = header if ri == 1 else body
+        cells = ''.join(_cell_xml(f'{letters[ci]}{ri}', v, col_style.get(ci)) for ci, v in enumerate(row) if v is not None and v != '')
+        if cells:
+            yield f'<row r="{ri}">{cells}</row>'
+    yield '</sheetData>'
+
+
+# ------------------ Streaming reader ------------------
+
+_CHUNK = 1 << 16
+
+
+def _col_index(ref: str) -> int:
+    n = 0
+    for ch in ref:
+        if '0' <= ch <= '9':
+            break
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _local(name: str) -> str:
+    # expat reports "namespace-uri local" with namespace_separator=' '
+    return name.rpartition(' ')[2]
+
+
+def read_shared_strings(z: zipfile.ZipFile) -> List[str]:
+    try:
+        f = z.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    out: List[str] = []
+    buf: List[str] = []
+    state = {'in_t': False, 'skip': 0}
+
+    def start(name, attrs):
+        local = _local(name)
+        if local == 'si':
+            buf.clear()
+        elif local == 't':
+            state['in_t'] = True
+        elif local == 'rPh':  # phonetic runs are not part of the value
+            state['skip'] += 1
+
+    def end(name):
+        local = _local(name)
+        if local == 'si':
+            out.append(''.join(buf))
+        elif local == 't':
+            state['in_t'] = False
+        elif local == 'rPh':
+            state['skip'] -= 1
+
+    def chars(data):
+        if state['in_t'] and not state['skip']:
+            buf.append(data)
+
+    p = expat.ParserCreate(namespace_separator=' ')
+    p.buffer_text = True
+    p.StartElementHandler, p.EndElementHandler, p.CharacterDataHandler = start, end, chars
+    with f:
+        p.ParseFile(f)
+    return out
+
+
+def iter_sheet_rows(z: zipfile.ZipFile, part: str, ncols: int, shared: Sequence[str], max_row: Optional[int] = None) -> Iterator[Tuple[int, tuple]]:
+    """Yield (row_number, values[:ncols]) for every <row> in a worksheet part, streaming."""
+    ready: List[Tuple[int, tuple]] = []
+    buf: List[str] = []
+    st: Dict[str, Any] = {'r': 0, 'vals': None, 'ci': 0, 't': None, 'text': False, 'skip': 0}
+
+    def start(name, attrs):
+        local = _local(name)
+        if local == 'c':
+            ref = attrs.get('r')
+            st['ci'] = _col_index(ref) if ref else st['ci'] + 1
+            st['t'] = attrs.get('t')
+            buf.clear()
+        elif local in ('v', 't'):
+            st['text'] = True
+        elif local == 'row':
+            st['r'] = int(attrs.get('r') or st['r'] + 1)
+            st['vals'] = [None] * ncols
+            st['ci'] = 0
+        elif local == 'rPh':
+            st['skip'] += 1
+
+    def end(name):
+        local = _local(name)
+        if local == 'c':
+            ci = st['ci']
+            if 0 < ci <= ncols and buf:
+                text = ''.join(buf)
+                t = st['t']
+                if t == 's':
+                    v: Any = shared[int(text)]
+                elif t == 'b':
+                    v = text == '1'
+                elif t in ('inlineStr', 'str', 'e', 'd'):  # d: ISO 8601 date, kept as text
+                    v = text
+                else:
+                    v = _number(text)
+                st['vals'][ci - 1] = v
+        elif local in ('v', 't'):
+            st['text'] = False
+        elif local == 'row':
+            ready.append((st['r'], tuple(st['vals'])))
+        elif local == 'rPh':
+            st['skip'] -= 1
+
+    def chars(data):
+        if st['text'] and not st['skip']:
+            buf.append(data)
+
+    p = expat.ParserCreate(namespace_separator=' ')
+    p.buffer_text = True
+    p.StartElementHandler, p.EndElementHandler, p.CharacterDataHandler = start, end, chars
+    with z.open(part) as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            p.Parse(chunk, not chunk)
+            for item in ready:
+                if max_row is not None and item[0] > max_row:
+                    return
+                yield item
+            ready.clear()
+            if not chunk:
+                return
+
+
+class _Cell:
+    def __init__(self, value: Any):
+        self.Value = value
+
+
+class XlsxSheet:
+    def __init__(self, book: 'XlsxWorkbook', name: str, part: Optional[str]):
+        self._book = book
+        self._name = name
+        self.part = part  # zip member name, e.g. xl/worksheets/sheet3.xml (None until saved for new sheets)
+        self._pending: Optional[List[Sequence[Any]]] = None
+        self._header: Optional[tuple] = None
+
+    @property
+    def Name(self) -> str:
+        return self._name
+
+    @Name.setter
+    def Name(self, value: str):
+        self._name = value
+
+    @property
+    def dirty(self) -> bool:
+        return self._pending is not None
+
+    def Cells(self, r: int, c: int) -> _Cell:
+        if r == 1:
+            if self._header is None:
+                self._header = next(iter(self._iter_rows(max_row=1)), ())
+            row = self._header
+        else:
+            block = self.read_block(max(c, 1))
+            row = block[r - 1] if r - 1 < len(block) else ()
+        return _Cell(row[c - 1] if c - 1 < len(row) else None)
+
+    def _iter_rows(self, max_row: Optional[int] = None, max_col: Optional[int] = None):
+        if self._pending is not None:
+            rows = self._pending if max_row is None else self._pending[:max_row]
+            for row in rows:
+                yield tuple(row[:max_col]) if max_col else tuple(row)
+            return
+        if self.part is None:
+            return
+        ncols = max_col or 16384
+        with zipfile.ZipFile(self._book.path) as z:
+            expected = 1
+            for r, values in iter_sheet_rows(z, self.part, ncols, self._book.shared_strings(z), max_row):
+                # Rows without cells are omitted from the XML; keep physical row positions
+                while expected < r:
+                    yield (None,) * ncols
+                    expected += 1
+                yield values
+                expected = r + 1
+
+    def read_block(self, ncols: int) -> List[tuple]:
+        """Return rows 1..last used row, each padded / cut to ncols values."""
+        block = []
+        for row in self._iter_rows(max_col=ncols):
+            row = tuple(row)
+            if len(row) < ncols:
+                row = row + (None,) * (ncols - len(row))
+            block.append(row)
+        # Drop trailing blank rows (stale <dimension> refs can report a larger used range)
+        while block and all(v in (None, '') for v in block[-1]):
+            block.pop()
+        return block
+
+    def write_block(self, matrix: Sequence[Sequence[Any]]):
+        """Replace the whole sheet content with matrix (row 1 = header); written on save()."""
+        self._pending = [list(r) for r in matrix]
+        self._header = None
+
+
+class _Worksheets:
+    def __init__(self, book: 'XlsxWorkbook'):
+        self._book = book
+
+    def __call__(self, name: str) -> XlsxSheet:
+        for ws in self._book._sheets:
+            if ws.Name == name:
+                return ws
+        raise KeyError(name)
+
+    def __iter__(self):
+        return iter(list(self._book._sheets))
+
+    def Add(self) -> XlsxSheet:
+        ws = XlsxSheet(self._book, f"Sheet{len(self._book._sheets) + 1}", None)
+        ws._pending = []
+        self._book._sheets.insert(0, ws)
+        return ws
+
+
+class XlsxWorkbook:
+    """Workbook file opened for streaming reads and part-level streaming writes."""
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            print(f"ERROR: Workbook not found: {path}", file=sys.stderr)
+            sys.exit(1)
+        self.path = path
+        self._shared: Optional[List[str]] = None
+        self._sheets: List[XlsxSheet] = []
+        with zipfile.ZipFile(path) as z:
+            self._workbook_part = 'xl/workbook.xml'
+            rels = ET.fromstring(z.read('xl/_rels/workbook.xml.rels'))
+            targets: Dict[str, str] = {}
+            for rel in rels.findall(f'{{{NS_PKG_REL}}}Relationship'):
+                target = rel.get('Target', '')
+                targets[rel.get('Id', '')] = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+            wb = ET.fromstring(z.read(self._workbook_part))
+            for sh in wb.iter(f'{{{NS_MAIN}}}sheet'):
+                self._sheets.append(XlsxSheet(self, sh.get('name', ''), targets.get(sh.get(f'{{{NS_REL}}}id', ''))))
+
+    @property
+    def Worksheets(self) -> _Worksheets:
+        return _Worksheets(self)
+
+    def shared_strings(self, z: zipfile.ZipFile) -> List[str]:
+        if self._shared is None:
+            self._shared = read_shared_strings(z)
+        return self._shared
+
+    def close(self):
+        # Nothing held open between reads; kept for symmetry with the COM backend
+        self._shared = None
+
+    # ------------------ Saving ------------------
+
+    def save(self, path: Optional[str] = None):
+        """Stream dirty sheets into a copy of the package, then atomically replace the target."""
+        dirty = [ws for ws in self._sheets if ws.dirty]
+        target = path or self.path
+        if not dirty and target == self.path:
+            return
+        with zipfile.ZipFile(self.path) as zin:
+            names = set(zin.namelist())
+            patches = self._register_new_sheets(zin, names)
+            fd, tmp = tempfile.mkstemp(prefix='.xlsx-', suffix='.tmp', dir=os.path.dirname(os.path.abspath(target)))
+            os.close(fd)
+            try:
+                with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zout:
+                    sheet_parts = {ws.part: ws for ws in dirty}
+                    for info in zin.infolist():
+                        if info.filename in sheet_parts:
+                            self._stream_sheet(zout, info.filename, zin.read(info.filename), sheet_parts.pop(info.filename))
+                        elif info.filename in patches:
+                            zout.writestr(info, patches.pop(info.filename))
+                        else:
+                            zout.writestr(info, zin.read(info.filename))
+                    for part, ws in sheet_parts.items():  # newly added sheets
+                        self._stream_sheet(zout, part, EMPTY_SHEET_XML, ws)
+                os.replace(tmp, target)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        for ws in dirty:
+            ws._pending = None
+            ws._header = None
+
+    def _register_new_sheets(self, zin: zipfile.ZipFile, names: set) -> Dict[str, bytes]:
+        new = [ws for ws in self._sheets if ws.part is None]
+        if not new:
+            return {}
+        wb_xml = zin.read(self._workbook_part).decode('utf-8')
+        rels_xml = zin.read('xl/_rels/workbook.xml.rels').decode('utf-8')
+        ct_xml = zin.read('[Content_Types].xml').decode('utf-8')
+        sheet_ids = [int(x) for x in re.findall(r'sheetId="(\d+)"', wb_xml)]
+        rel_ids = [int(x) for x in re.findall(r'Id="rId(\d+)"', rels_xml)]
+        n = 1
+        for ws in new:
+            while f'xl/worksheets/sheet{n}.xml' in names:
+                n += 1
+            ws.part = f'xl/worksheets/sheet{n}.xml'
+            names.add(ws.part)
+            sid = max(sheet_ids, default=0) + 1
+            rid = max(rel_ids, default=0) + 1
+            sheet_ids.append(sid)
+            rel_ids.append(rid)
+            wb_xml = wb_xml.replace('</sheets>', f'<sheet name="{_escape(ws.Name)}" sheetId="{sid}" r:id="rId{rid}"/></sheets>', 1)
+            rels_xml = rels_xml.replace('</Relationships>', f'<Relationship Id="rId{rid}" Type="{WORKSHEET_REL_TYPE}" Target="worksheets/sheet{n}.xml"/></Relationships>', 1)
+            ct_xml = ct_xml.replace('</Types>', f'<Override PartName="/{ws.part}" ContentType="{WORKSHEET_CONTENT_TYPE}"/></Types>', 1)
+        return {self._workbook_part: wb_xml.encode('utf-8'), 'xl/_rels/workbook.xml.rels': rels_xml.encode('utf-8'), '[Content_Types].xml': ct_xml.encode('utf-8')}
+
+    @staticmethod
+    def _stream_sheet(zout: zipfile.ZipFile, part: str, original: bytes, ws: XlsxSheet):
+        rows = ws._pending or []
+        m = _SHEETDATA_RE.search(original)
+        head, tail = (original[:m.start()], original[m.end():]) if m else (original, b'')
+        styles = column_styles(m.group()) if m else None
+        width = max((len(r) for r in rows), default=1)
+        ref = f'A1:{column_letter(max(width, 1))}{max(len(rows), 1)}'.encode('ascii')
+        head = _DIMENSION_RE.sub(lambda _: b'<dimension ref="' + ref + b'"/>', head, count=1)
+        # The filter follows the new table; merged ranges belong to the old layout and would hide cells
+        tail = _AUTOFILTER_REF_RE.sub(lambda a: a.group(1) + ref + a.group(2), tail, count=1)
+        tail = _MERGECELLS_RE.sub(b'', tail, count=1)
+        info = zipfile.ZipInfo(part, date_time=(1980, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zout.open(info, 'w') as out:
+            out.write(head)
+            buf: List[str] = []
+            for piece in iter_sheet_data_xml(rows, styles=styles):
+                buf.append(piece)
+                if len(buf) >= 512:
+                    out.write(''.join(buf).encode('utf-8'))
+                    buf.clear()
+            out.write(''.join(buf).encode('utf-8'))
+            out.write(tail)
@@ -0,0 +1,10 @@
+"""pytest setup for the helper scripts: they import each other as top-level modules from scripts/.
+
+Run from the repository root:  python -m pytest scripts/tests
+"""
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
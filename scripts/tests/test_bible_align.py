@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import bible_align
+from bible_align import Alignment, write_alignment
+from bible_build import stage_repair
+from bible_corpus import CORPUS_FILE, write_corpus
+from bible_refs import verse_id
+
+VERSIONS = {
+    # John 1 has a non-string verse 2 (dropped by the repair stage) and Gen 1:2 is empty in 'b'
+    'a': [{'abbrev': 'gn', 'name': 'Genesis', 'chapters': [['a g1', 'a g2', 'a g3'], ['a g2.1']]},
+          {'abbrev': 'jo', 'name': 'John', 'chapters': [['a j1', None, 'a j3', 'a j4']]}],
+    'b': [{'abbrev': 'gn', 'name': 'Genesis', 'chapters': [['b g1', '', 'b g3']]},
+          {'abbrev': 'zz', 'name': 'Foo', 'chapters': [['b foo']]},
+          {'abbrev': 'jo', 'name': 'John', 'chapters': [['b j1', 'b j2', 'b j3', 'b j4']]}],
+    # Three verses in John 1 where the others have four: numbering cannot be trusted
+    'c': [{'abbrev': 'gn', 'name': 'Genesis', 'chapters': [['c g1', 'c g2', 'c g3']]},
+          {'abbrev': 'jo', 'name': 'John', 'chapters': [['c j1', 'c j2+3', 'c j4']]}],
+}
+
+
+@pytest.fixture
+def bibles(tmp_path):
+    index = [{'language': 'x', 'versions': [{'abbreviation': a} for a in [*VERSIONS, 'missing']]}]
+    (tmp_path / 'index.json').write_text(json.dumps(index), encoding='utf-8')
+    for abbr, books in VERSIONS.items():
+        src = tmp_path / f'{abbr}.json'
+        src.write_text(json.dumps(books), encoding='utf-8')
+        write_corpus(str(src), str(tmp_path / abbr / CORPUS_FILE), books=stage_repair(str(src)))
+    return tmp_path
+
+
+def test_build_report_and_skip(bibles):
+    report, written = write_alignment(str(bibles))
+    assert written
+    assert report['missing_versions'] == ['missing']
+    assert report['versions']['a']['dropped'] == 1
+    assert report['versions']['b']['merged'] == 1
+    assert report['versions']['b']['unknown_books'] == ['Foo']
+    assert report['versions']['c']['unaligned'] == 3
+    assert [s['ref'] for s in report['shifts']] == ['John 1']
+    assert write_alignment(str(bibles))[1] is False
+
+
+def test_parallel_lookup(bibles):
+    write_alignment(str(bibles))
+    with Alignment(os.path.join(str(bibles), bible_align.ALIGN_FILE)) as align:
+        assert align.parallel(verse_id(43, 1, 3)) == {'a': 'a j3', 'b': 'b j3', 'c': None}
+        assert align.parallel(verse_id(43, 1, 3), ['c'], positional=True) == {'c': 'c j4'}
+        assert align.locate(verse_id(43, 1, 2), ['a'])['a'] == ('dropped', None)
+        # The empty verse points at the verse that carries the text
+        assert align.locate(verse_id(1, 1, 2), ['b'])['b'][0] == 'merged'
+        assert align.parallel(verse_id(1, 1, 2), ['b']) == {'b': 'b g1'}
+        assert align.parallel(verse_id(1, 2, 1)) == {'a': 'a g2.1', 'b': None, 'c': None}
+        assert list(align.iter_ref('Gen 1:2-2:5')) == [verse_id(1, 1, 2), verse_id(1, 1, 3), verse_id(1, 2, 1)]
+
+
+def test_missing_corpus_is_reported(bibles):
+    write_alignment(str(bibles))
+    os.remove(bibles / 'a' / CORPUS_FILE)
+    with Alignment(os.path.join(str(bibles), bible_align.ALIGN_FILE)) as align:
+        with pytest.raises(FileNotFoundError, match='bible_build.py'):
+            align.parallel(verse_id(43, 1, 1))
@@ -0,0 +1,50 @@
+import json
+
+from bible_build import run_pipeline
+
+# Needs repair: BOM, trailing comma, a non-string verse, a book without chapters
+RAW = ('﻿[{"name": "Genesis", "abbrev": "gn", "chapters": [["In the beginning", 7, "And the earth"], ["Thus"]]},'
+       ' {"name": "Empty", "chapters": []},'
+       ' {"name": "Exodus", "abbrev": "ex", "chapters": [["Now these are the names"]]},]')
+
+
+def _bibles(tmp_path, language='English'):
+    (tmp_path / 'xx_test.json').write_text(RAW, encoding='utf-8')
+    _set_language(tmp_path, language)
+    return tmp_path
+
+
+def _set_language(bibles, language):
+    (bibles / 'index.json').write_text(json.dumps([{'language': language, 'versions': [{'name': 'Test', 'abbreviation': 'xx_test'}]}]),
+                                       encoding='utf-8')
+
+
+def _build(bibles):
+    summary = run_pipeline(str(bibles), jobs=1, quiet=True)
+    [version] = summary['versions']
+    assert version['status'] in ('built', 'skipped'), version
+    return version['stages']
+
+
+def test_split_matches_the_repaired_books(tmp_path):
+    bibles = _bibles(tmp_path)
+    _build(bibles)
+    fixed = json.loads((bibles / 'fixed' / 'xx_test.json').read_text(encoding='utf-8'))
+    meta = json.loads((bibles / 'xx_test' / 'meta.json').read_text(encoding='utf-8'))
+    assert [(b['name'], b['abbrev'], b['verseCounts']) for b in meta['books']] == [('Genesis', 'Gen', [2, 1]), ('Exodus', 'Exod', [1])]
+    assert [[len(ch) for ch in b['chapters']] for b in fixed] == [b['verseCounts'] for b in meta['books']]
+    index = json.loads((bibles / 'xx_test' / 'search-index.json').read_text(encoding='utf-8'))
+    assert index['verses'] == sum(map(sum, (b['verseCounts'] for b in meta['books']))) == 4 and index['mode'] == 'word'
+    book = json.loads((bibles / 'xx_test' / '01.json').read_text(encoding='utf-8'))
+    assert book['chapters'][0] == ['In the beginning', 'And the earth']
+
+
+def test_language_change_rebuilds_the_index_only(tmp_path):
+    bibles = _bibles(tmp_path)
+    _build(bibles)
+    assert set(_build(bibles).values()) == {'skipped'}
+    _set_language(bibles, 'Chinese')
+    stages = _build(bibles)
+    assert {s for s, t in stages.items() if t != 'skipped'} == {'index', 'stats'}
+    index = json.loads((bibles / 'xx_test' / 'search-index.json').read_text(encoding='utf-8'))
+    assert index['mode'] == 'ngram'
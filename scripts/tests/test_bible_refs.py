@@ -0,0 +1,51 @@
+import pytest
+
+from bible_refs import WHOLE, format_range, lookup_book, parse_ref, verse_id
+
+
+def _fmt(ref):
+    return [format_range(s, e) for s, e in parse_ref(ref).ranges]
+
+
+@pytest.mark.parametrize('ref, expected', [
+    ('Isa 53:7-8', ['Isa 53:7-8']),
+    ('Isa 52:13-53:12', ['Isa 52:13-53:12']),
+    ('Ezek 38-39', ['Ezek 38-39']),
+    ('Isa 23', ['Isa 23']),
+    ('Lam', ['Lam']),
+    ('Ezra-Nehemiah', ['Ezra-Neh']),
+    ('Acts 3:19-26; John 6:14; 7:40', ['Acts 3:19-26', 'John 6:14', 'John 7:40']),
+    ('Gal 3:8,16,29', ['Gal 3:8', 'Gal 3:16', 'Gal 3:29']),
+    ('II Kings 2:11', ['2Kgs 2:11']),
+    ('(Rom 1:17; Gal 3:11)', ['Rom 1:17', 'Gal 3:11']),
+    # One-chapter books: a lone number is a verse of chapter 1
+    ('Jude 14', ['Jude 1:14']),
+    ('Obad 21', ['Obad 1:21']),
+    ('Jude 14-15', ['Jude 1:14-15']),
+    ('Phlm 10', ['Phlm 1:10']),
+    ('Obad 1:1-21', ['Obad 1:1-21']),
+    ('Jude 1', ['Jude 1']),
+])
+def test_parse_ref(ref, expected):
+    assert _fmt(ref) == expected
+
+
+def test_verse_ids():
+    assert parse_ref('John 3:16').ranges == ((verse_id(43, 3, 16), verse_id(43, 3, 16)),)
+    assert parse_ref('Ps 23').ranges == ((verse_id(19, 23, 1), verse_id(19, 23, WHOLE)),)
+    assert lookup_book('Revelations') == 66 and lookup_book('1st Kings') == 11
+
+
+def test_free_text_ends_segment():
+    parsed = parse_ref('Isa 7:14 applied to John the Baptist')
+    assert _fmt('Isa 7:14 applied to John the Baptist') == ['Isa 7:14']
+    assert parsed.unparsed == ('applied',)
+
+
+def test_book_reference_after_free_text_is_kept():
+    assert _fmt('Gen 3:15 (cf. Rom 16:20)') == ['Gen 3:15', 'Rom 16:20']
+    assert _fmt('Gen 3:15 cf. Rom 16:20; Rev 12:9') == ['Gen 3:15', 'Rom 16:20', 'Rev 12:9']
+
+
+def test_skipped_numbers_are_reported():
+    assert parse_ref('Matt 1:23 see verse 5').unparsed == ('see', '5')
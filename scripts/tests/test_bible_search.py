@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from bible_search import BibleSearch, linear_search, write_index
+
+WORD_BIBLE = [
+    {'abbrev': 'gn', 'name': 'Genesis', 'chapters': [
+        ['In the beginning God created the heaven and the earth.',
+         'And the earth was without form, and void; and darkness was upon the face of the deep.',
+         'And God said, Let there be light: and there was light.'],
+        ['Thus the heavens and the earth were finished, and all the host of them.']]},
+    {'abbrev': 'jo', 'name': 'John', 'chapters': [
+        ['In the beginning was the Word, and the Word was with God, and the Word was God.',
+         'The same was in the beginning with God.',
+         'And the light shineth in darkness; and the darkness comprehended it not.']]},
+]
+CJK_BIBLE = [
+    {'abbrev': 'gn', 'name': '創世記', 'chapters': [['起初，神創造天地。', '地是空虛混沌，淵面黑暗。', '神說：要有光，就有了光。']]},
+]
+QUERIES = [
+    ('light', 'all', False), ('God light', 'all', False), ('God light', 'any', False),
+    ('the beginning', 'phrase', False), ('heaven', 'all', False), ('dark', 'all', False),
+    ('God', 'all', True), ('god', 'all', True), ('word', 'all', False), ('missing', 'any', False),
+]
+
+
+def _engine(tmp_path, books, layout):
+    path = tmp_path / 'x.json'
+    path.write_text(json.dumps(books, ensure_ascii=False), encoding='utf-8')
+    out_dir, _, _ = write_index(str(path), str(tmp_path / 'x'), mmap_layout=(layout == 'mmap'), books=books)
+    return BibleSearch.load(out_dir, str(path), layout=layout)
+
+
+@pytest.mark.parametrize('layout', ['json', 'mmap'])
+@pytest.mark.parametrize('query, mode, case_sensitive', QUERIES)
+def test_index_matches_linear_scan(tmp_path, layout, query, mode, case_sensitive):
+    engine = _engine(tmp_path, WORD_BIBLE, layout)
+    result = engine.search(query, mode, case_sensitive)
+    expected = linear_search(WORD_BIBLE, query, mode, case_sensitive)
+    assert dict(result.rows) == expected
+    assert result.total == sum(expected.values())
+
+
+def test_book_scope(tmp_path):
+    engine = _engine(tmp_path, WORD_BIBLE, 'json')
+    result = engine.search('beginning', book=2)
+    assert [vid for vid, _ in result.rows] == [2001001, 2001002]
+    assert result.per_book == {'John': 2}
+
+
+@pytest.mark.parametrize('query', ['光', '神', '混沌', '天地'])
+def test_ngram_index_matches_linear_scan(tmp_path, query):
+    engine = _engine(tmp_path, CJK_BIBLE, 'json')
+    assert engine.mode == 'ngram'
+    assert dict(engine.search(query).rows) == linear_search(CJK_BIBLE, query)
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+import prophecies_excel_bridge as bridge
+from bench_bridge import synthetic_hierarchical, synthetic_legacy, write_dataset
+from excel_fake import FakeExcel
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _import(path):
+    excel = FakeExcel()
+    _quiet(bridge.op_import, str(path), backend=bridge.ComBackend(excel))
+    return excel
+
+
+@pytest.mark.parametrize('rows', [1, 50])
+def test_roundtrip_is_lossless(tmp_path, rows):
+    src = tmp_path / 'prophecies.json'
+    write_dataset(str(src), synthetic_hierarchical(rows))
+    excel = _import(src)
+    out = tmp_path / 'exported.json'
+    out.write_text('[]', encoding='utf-8')
+    _quiet(bridge.op_export, str(out), backend=bridge.ComBackend(excel), store=False)
+    assert json.loads(out.read_text(encoding='utf-8')) == json.loads(src.read_text(encoding='utf-8'))
+
+
+def test_com_calls_do_not_grow_with_rows(tmp_path):
+    calls = {}
+    for rows in (20, 400):
+        src = tmp_path / f'p{rows}.json'
+        write_dataset(str(src), synthetic_hierarchical(rows))
+        excel = _import(src)
+        imported = excel.counter.total
+        excel.counter.reset()
+        _quiet(bridge.op_export, str(src), backend=bridge.ComBackend(excel), store=False)
+        calls[rows] = (imported, excel.counter.total)
+    assert calls[20] == calls[400]
+
+
+def test_export_reads_the_sheet_in_one_block():
+    excel = FakeExcel()
+    ws = bridge.ComBackend(excel).resolve_sheet(create_if_missing=True)
+    bridge.write_entries(ws, synthetic_hierarchical(300), excel)
+    excel.counter.reset()
+    entries, report = bridge.export_entries(ws)
+    assert len(entries) == 300 and report.ok
+    assert excel.counter.by_name['Range.Value.get'] == 1
+
+
+def test_duplicate_ref_aborts_export(tmp_path):
+    entries = synthetic_hierarchical(10)
+    entries[7] = dict(entries[7], prophecyRef=entries[2]['prophecyRef'], id=entries[2]['prophecyRef'])
+    excel = FakeExcel()
+    ws = bridge.ComBackend(excel).resolve_sheet(create_if_missing=True)
+    bridge.write_entries(ws, entries, excel)
+    out = tmp_path / 'out.json'
+    out.write_text('[]', encoding='utf-8')
+    with pytest.raises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+        _quiet(bridge.op_export, str(out), backend=bridge.ComBackend(excel), store=False)
+    assert out.read_text(encoding='utf-8') == '[]'
+
+
+def test_legacy_rows_migrate():
+    migrated = [bridge.legacy_row_to_new(o) for o in synthetic_legacy(5)]
+    assert all(e['prophecyRef'] and e['id'] == e['prophecyRef'] for e in migrated)
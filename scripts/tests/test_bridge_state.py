@@ -0,0 +1,57 @@
+import json
+import os
+import sys
+
+import pytest
+
+import prophecies_client as client
+import prophecies_server as server
+
+posix_only = pytest.mark.skipif(sys.platform == 'win32', reason='POSIX owner / mode checks')
+STATE = {'protocol': client.PROTOCOL, 'address': '/nowhere', 'family': 'AF_UNIX', 'authkey': '00', 'pid': 1}
+
+
+def test_write_state_is_private_and_readable(tmp_path):
+    path = tmp_path / 'state.json'
+    server._write_state(str(path), STATE)
+    assert client.read_state(str(path)) == STATE
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert [p.name for p in tmp_path.iterdir()] == ['state.json']
+
+
+@posix_only
+def test_write_state_replaces_a_planted_symlink(tmp_path):
+    target = tmp_path / 'elsewhere'
+    target.write_text('keep')
+    path = tmp_path / 'state.json'
+    path.symlink_to(target)
+    server._write_state(str(path), STATE)
+    assert target.read_text() == 'keep'
+    assert not path.is_symlink()
+
+
+@posix_only
+def test_read_state_rejects_shared_or_linked_files(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text(json.dumps(STATE))
+    os.chmod(path, 0o644)
+    assert client.read_state(str(path)) is None
+    os.chmod(path, 0o600)
+    link = tmp_path / 'link.json'
+    link.symlink_to(path)
+    assert client.read_state(str(link)) is None
+    assert client.read_state(str(path)) == STATE
+
+
+@posix_only
+def test_default_location_is_a_private_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv(client.STATE_ENV, raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(client.tempfile, 'gettempdir', lambda: str(tmp_path))
+    assert os.path.dirname(client.state_path()) == client.state_dir()
+    assert server._private_dir(client.state_dir()) is None
+    assert os.stat(client.state_dir()).st_mode & 0o777 == 0o700
+    os.chmod(client.state_dir(), 0o755)
+    assert 'not private' in server._private_dir(client.state_dir())
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert client.state_path() == str(tmp_path / 'prophecies-bridge.json')
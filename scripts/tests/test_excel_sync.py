@@ -0,0 +1,82 @@
+import contextlib
+import io
+
+import prophecies_excel_bridge as bridge
+from bench_bridge import synthetic_hierarchical
+from excel_fake import FakeExcel
+from prophecies_diff import diff_entries, entry_key
+
+
+def _filled(entries):
+    excel = FakeExcel()
+    backend = bridge.ComBackend(excel)
+    ws = backend.resolve_sheet(create_if_missing=True)
+    bridge.write_entries(ws, entries, excel)
+    excel.counter.reset()
+    return excel, backend, ws
+
+
+def _sheet_keys(ws):
+    entries, _ = bridge.export_entries(ws)
+    return [entry_key(e) for e in entries]
+
+
+def _edited(entries):
+    # Insert at the top, in the middle (next to a deletion) and at the end; update one entry
+    new = [dict(e) for e in entries]
+    new[5] = dict(new[5], category={'en': 'Edited', 'de': 'Bearbeitet'})
+    del new[10:12]
+    extra = synthetic_hierarchical(len(entries) + 3, seed=99)[-3:]
+    for i, e in enumerate(extra):
+        e['prophecyRef'] = e['id'] = f'Obad 1:{i + 1}'
+    new.insert(0, extra[0])
+    new.insert(11, extra[1])
+    new.append(extra[2])
+    return new
+
+
+def test_diff_import_keeps_json_order():
+    entries = synthetic_hierarchical(30)
+    excel, backend, ws = _filled(entries)
+    new = _edited(entries)
+    d = bridge.sync_sheet_rows(ws, new, excel)
+    assert (len(d.inserted), len(d.updated), len(d.deleted), d.reordered) == (3, 1, 2, False)
+    assert _sheet_keys(ws) == [entry_key(e) for e in new]
+    # The next export --diff sees no change at all
+    exported, _ = bridge.export_entries(ws)
+    assert not diff_entries(new, exported, flatten=bridge.row_from_entry)
+
+
+def test_diff_import_is_row_local():
+    entries = synthetic_hierarchical(200)
+    excel, _, ws = _filled(entries)
+    new = [dict(e) for e in entries]
+    new[100] = dict(new[100], category={'en': 'Edited', 'de': 'Bearbeitet'})
+    bridge.sync_sheet_rows(ws, new, excel)
+    # One block read plus one row write, independent of the sheet size
+    assert excel.counter.by_name['Range.Value.set'] == 1
+    assert excel.counter.by_name['Range.Value.get'] <= 2
+
+
+def test_sync_block_matches_com():
+    entries = synthetic_hierarchical(30)
+    excel, _, ws = _filled(entries)
+    block = bridge.read_sheet_block(ws)
+    new = _edited(entries)
+    _, new_block = bridge.sync_block(block, new)
+    bridge.sync_sheet_rows(ws, new, excel)
+    # Empty cells read back as None where the block holds ''
+    assert bridge.read_sheet_block(ws) == [tuple(v if v != '' else None for v in r) for r in new_block]
+
+
+def test_reorder_falls_back_to_full_write(tmp_path):
+    entries = synthetic_hierarchical(20)
+    excel, backend, ws = _filled(entries)
+    path = tmp_path / 'prophecies.json'
+    reordered = entries[1:] + entries[:1]
+    bridge.write_json_entries(str(path), reordered)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        bridge.op_import(str(path), diff=True, backend=backend)
+    assert 'rewriting the whole sheet' in out.getvalue()
+    assert _sheet_keys(ws) == [entry_key(e) for e in reordered]
@@ -0,0 +1,69 @@
+import pytest
+
+import prophecies_excel_bridge as bridge
+from prophecies_schema import ERROR, WARNING, validate_rows
+
+
+def _row(**cells):
+    return [cells.get(c, '') for c in bridge.COLUMNS]
+
+
+BLOCK = [
+    list(bridge.COLUMNS),
+    _row(id='Isa 7:14', prophecy_ref='Isa 7:14', summary_prophecy_en='A virgin will conceive', status='Fulfilled'),
+    _row(summary_prophecy_en='Half-filled editing row'),
+    _row(id='Fulfilled', summary_prophecy_en='Shifted columns'),
+]
+
+
+def _codes(report):
+    return {(v.row, v.code, v.severity) for v in report.violations}
+
+
+def test_rows_without_ref_warn_by_default():
+    entries, report = bridge.entries_from_block(BLOCK)
+    assert report.ok and len(entries) == 3
+    assert {(3, 'missing_ref', WARNING), (4, 'ref_is_status', WARNING)} <= _codes(report)
+
+
+def test_strict_makes_them_errors():
+    _, report = bridge.entries_from_block(BLOCK, strict=True)
+    assert not report.ok
+    assert {(3, 'missing_ref', ERROR), (4, 'ref_is_status', ERROR)} <= _codes(report)
+
+
+def test_duplicates_always_abort():
+    report = validate_rows(BLOCK[1:] + [BLOCK[1]], bridge.COLUMNS)
+    assert (5, 'duplicate_ref', ERROR) in _codes(report)
+    assert not report.ok
+
+
+@pytest.mark.parametrize('strict, aborted', [(False, False), (True, True)])
+def test_export_with_half_filled_row(tmp_path, strict, aborted):
+    from excel_fake import FakeExcel
+    excel = FakeExcel()
+    excel.ActiveWorkbook.add_sheet(bridge.PRIMARY_SHEET, rows=BLOCK)
+    path = tmp_path / 'prophecies.json'
+    path.write_text('[]', encoding='utf-8')
+    if aborted:
+        with pytest.raises(SystemExit):
+            bridge.op_export(str(path), backend=bridge.ComBackend(excel), store=False, strict=strict)
+    else:
+        bridge.op_export(str(path), backend=bridge.ComBackend(excel), store=False, strict=strict)
+        assert 'Half-filled editing row' in path.read_text(encoding='utf-8')
+
+
+def test_duplicate_status_valued_refs_abort():
+    block = [list(bridge.COLUMNS),
+             _row(prophecy_ref='Fulfilled', summary_prophecy_en='First shifted row'),
+             _row(prophecy_ref='Fulfilled', summary_prophecy_en='Second shifted row')]
+    _, report = bridge.entries_from_block(block)
+    assert not report.ok
+    assert {(2, 'ref_is_status', WARNING), (3, 'ref_is_status', WARNING), (3, 'duplicate_ref', ERROR)} <= _codes(report)
+
+
+def test_status_valued_ids_are_not_duplicates():
+    # The import blanks a status-valued id, so such rows have no key to collide on (as before)
+    block = [list(bridge.COLUMNS), _row(id='Fulfilled', summary_prophecy_en='a'), _row(id='Fulfilled', summary_prophecy_en='b')]
+    _, report = bridge.entries_from_block(block)
+    assert report.ok
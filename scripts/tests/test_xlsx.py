@@ -0,0 +1,71 @@
+import os
+import re
+import shutil
+import zipfile
+
+import prophecies_excel_bridge as bridge
+from prophecies_xlsx import NS_MAIN, NS_PKG_REL, NS_REL, WORKSHEET_CONTENT_TYPE, WORKSHEET_REL_TYPE, XlsxWorkbook
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHEET = (
+    f'<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><dimension ref="A1:C3"/>'
+    '<sheetData>'
+    '<row r="1"><c r="A1" s="1" t="inlineStr"><is><t>id</t></is></c><c r="B1" s="1" t="inlineStr"><is><t>when</t></is></c>'
+    '<c r="C1" s="1" t="inlineStr"><is><t>note</t></is></c></row>'
+    '<row r="2"><c r="A2"><v>1</v></c><c r="B2" s="2" t="d"><v>2024-05-01T00:00:00</v></c><c r="C2" s="4" t="inlineStr"><is><t>a</t></is></c></row>'
+    '<row r="3"><c r="A3" s="5"><v>2</v></c></row>'
+    '</sheetData><autoFilter ref="A1:C3"/><mergeCells count="1"><mergeCell ref="A5:C5"/></mergeCells></worksheet>'
+)
+
+
+def _workbook(path):
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr('[Content_Types].xml', '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                   f'<Override PartName="/xl/worksheets/sheet1.xml" ContentType="{WORKSHEET_CONTENT_TYPE}"/></Types>')
+        z.writestr('xl/workbook.xml', f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><sheets>'
+                   '<sheet name="data" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels', f'<Relationships xmlns="{NS_PKG_REL}">'
+                   f'<Relationship Id="rId1" Type="{WORKSHEET_REL_TYPE}" Target="worksheets/sheet1.xml"/></Relationships>')
+        z.writestr('xl/worksheets/sheet1.xml', SHEET)
+
+
+def _cells(xml):
+    return dict(re.findall(r'<c r="([A-Z]+\d+)"((?: s="\d+")?)', xml))
+
+
+def test_date_cells_read_as_text(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    _workbook(path)
+    block = XlsxWorkbook(str(path)).Worksheets('data').read_block(3)
+    assert block[1] == (1, '2024-05-01T00:00:00', 'a')
+
+
+def test_rewrite_keeps_column_styles_and_resizes_filter(tmp_path):
+    path = tmp_path / 'book.xlsx'
+    _workbook(path)
+    wb = XlsxWorkbook(str(path))
+    wb.Worksheets('data').write_block([['id', 'when', 'note'], [1, 'x', 'y'], [2, 'z', None], [3, None, 'w']])
+    wb.save()
+    xml = zipfile.ZipFile(path).read('xl/worksheets/sheet1.xml').decode('utf-8')
+    cells = _cells(xml)
+    assert [cells[c] for c in ('A1', 'B1', 'C1')] == [' s="1"'] * 3
+    # Body style: first styled cell of the column (A3 for column A)
+    assert [cells[c] for c in ('A2', 'B2', 'C2', 'A4', 'C4')] == [' s="5"', ' s="2"', ' s="4"', ' s="5"', ' s="4"']
+    assert '<dimension ref="A1:C4"/>' in xml and '<autoFilter ref="A1:C4"/>' in xml
+    assert 'mergeCell' not in xml
+
+
+def test_export_to_template_keeps_bold_header(tmp_path):
+    path = tmp_path / 'BibleProphecies.xlsm'
+    shutil.copy(os.path.join(HERE, 'BibleProphecies.xlsm'), path)
+    backend = bridge.XlsxBackend(str(path))
+    ws = backend.resolve_sheet(create_if_missing=False)
+    before = _cells(zipfile.ZipFile(path).read(ws.part).decode('utf-8'))
+    entries, _ = backend.read_entries(ws)
+    backend.write_entries(ws, entries[:5])
+    backend.save()
+    xml = zipfile.ZipFile(path).read(ws.part).decode('utf-8')
+    after = _cells(xml)
+    assert all(after[f'{col}1'] == before[f'{col}1'] for col in 'ABCDEFGHIJKLM')
+    assert '<autoFilter ref="A1:N6"' in xml